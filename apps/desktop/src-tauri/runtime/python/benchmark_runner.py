@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import gc
+import importlib
+import io
+import json
+import platform
+import sys
+import tempfile
+import textwrap
+import time
+import tracemalloc
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, List, Optional
+
+BENCHMARK_API_MODES = ("dict", "vector")
+BENCHMARK_SAMPLE_TIME_MS = 1000
+BENCHMARK_STATS_INTERVAL_MS = 24 * 60 * 60 * 1000
+BENCHMARK_PHASES = ("cycle", "read", "control", "write", "publish")
+BENCHMARK_REGRESSION_METRICS = (
+    ("cycles_per_s", "higher"),
+    ("phases.cycle.p50_ms", "lower"),
+    ("phases.cycle.p99_ms", "lower"),
+    ("phases.control.p99_ms", "lower"),
+    ("phases.publish.p99_ms", "lower"),
+    ("allocations.peak_bytes_per_cycle", "lower"),
+    ("allocations.allocated_blocks_per_cycle", "lower"),
+    ("allocations.retained_blocks_per_cycle", "lower"),
+    ("telemetry.bytes_per_cycle", "lower"),
+)
+
+DRIVER_SOURCE = """
+from array import array
+
+
+class BenchmarkDriver:
+    def __init__(self, context):
+        self.context = context
+        self.sensor_ids = list(context.plant.sensors.ids)
+        self.tick = 0
+
+    def connect(self):
+        return True
+
+    def stop(self):
+        return True
+
+    def read(self):
+        self.tick += 1
+        return {
+            "sensors": {sensor_id: float(self.tick + index) for index, sensor_id in enumerate(self.sensor_ids)},
+            "actuators": {},
+        }
+
+    def write(self, outputs):
+        return True
+"""
+
+VECTOR_DRIVER_SOURCE = DRIVER_SOURCE + """
+
+    def read_vector(self):
+        self.tick += 1
+        return array("d", [float(self.tick + index) for index in range(len(self.sensor_ids))]), None
+"""
+
+CONTROLLER_SOURCE = """
+class BenchmarkController:
+    def __init__(self, context):
+        self.context = context
+        self.pairs = list(zip(context.controller.input_variable_ids, context.controller.output_variable_ids))
+
+    def compute(self, snapshot):
+        sensors = snapshot["sensors"]
+        return {output_id: 0.5 * sensors.get(input_id, 0.0) for input_id, output_id in self.pairs}
+"""
+
+VECTOR_CONTROLLER_SOURCE = CONTROLLER_SOURCE + """
+
+    def compute_vector(self, snapshot):
+        return [0.5 * value for value in snapshot.inputs]
+"""
+
+
+class CountingStream(io.RawIOBase):
+    def __init__(self) -> None:
+        self.bytes_written = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        size = len(memoryview(data).cast("B"))
+        self.bytes_written += size
+        return size
+
+
+def load_runner_module(runner_path: Path) -> ModuleType:
+    runtime_dir = runner_path.resolve().parent
+    if not (runtime_dir / "runner_engine.py").is_file():
+        raise RuntimeError(f"Falha ao carregar runner em '{runner_path}'")
+    if str(runtime_dir) not in sys.path:
+        sys.path.insert(0, str(runtime_dir))
+    return importlib.import_module("runner_engine")
+
+
+def write_plugin(root: Path, name: str, source: str) -> Path:
+    plugin_dir = root / name
+    plugin_dir.mkdir(parents=True, exist_ok=True)
+    (plugin_dir / "main.py").write_text(textwrap.dedent(source).strip() + "\n", encoding="utf-8")
+    return plugin_dir
+
+
+def build_raw_bootstrap(root: Path, options: argparse.Namespace) -> Dict[str, Any]:
+    vector_api = options.api == "vector"
+    driver_dir = write_plugin(root, "benchmark_driver", VECTOR_DRIVER_SOURCE if vector_api else DRIVER_SOURCE)
+    controller_dir = write_plugin(
+        root,
+        "benchmark_controller",
+        VECTOR_CONTROLLER_SOURCE if vector_api else CONTROLLER_SOURCE,
+    )
+    variables: List[Dict[str, Any]] = []
+    for index in range(options.variables):
+        variables.append({"id": f"sensor_{index}", "name": f"Sensor {index}", "type": "sensor", "unit": "C"})
+        variables.append({"id": f"actuator_{index}", "name": f"Actuator {index}", "type": "atuador", "unit": "%"})
+
+    controllers: List[Dict[str, Any]] = []
+    for controller_index in range(options.controllers):
+        loops = range(controller_index, options.variables, options.controllers)
+        controllers.append(
+            {
+                "id": f"ctrl_{controller_index}",
+                "plugin_id": "benchmark_controller",
+                "plugin_name": "Benchmark Controller",
+                "plugin_dir": str(controller_dir),
+                "source_file": "main.py",
+                "class_name": "BenchmarkController",
+                "name": f"Controller {controller_index}",
+                "controller_type": "P",
+                "input_variable_ids": [f"sensor_{index}" for index in loops],
+                "output_variable_ids": [f"actuator_{index}" for index in loops],
+                "params": {"kp": {"type": "number", "value": 0.5, "label": "Kp"}},
+            }
+        )
+
+    runtime_dir = root / "runtime"
+    return {
+        "driver": {
+            "plugin_id": "benchmark_driver",
+            "plugin_name": "Benchmark Driver",
+            "plugin_dir": str(driver_dir),
+            "source_file": "main.py",
+            "class_name": "BenchmarkDriver",
+            "config": {},
+        },
+        "controllers": controllers,
+        "plant": {
+            "id": "plant_benchmark",
+            "name": "Plant Benchmark",
+            "variables": variables,
+            "setpoints": {f"sensor_{index}": float(index) for index in range(options.variables)},
+        },
+        "runtime": {
+            "id": "rt_benchmark",
+            "timing": {
+                "owner": "runtime",
+                "clock": "monotonic",
+                "strategy": "deadline",
+                "sample_time_ms": BENCHMARK_SAMPLE_TIME_MS,
+            },
+            "supervision": {"owner": "rust", "startup_timeout_ms": 12000, "shutdown_timeout_ms": 4000},
+            "paths": {
+                "runtime_dir": str(runtime_dir),
+                "venv_python_path": sys.executable,
+                "runner_path": str(options.runner),
+                "bootstrap_path": str(runtime_dir / "bootstrap.json"),
+            },
+            "stats": {"interval_ms": BENCHMARK_STATS_INTERVAL_MS},
+        },
+    }
+
+
+def with_telemetry_encoding(bootstrap: Any, encoding: str) -> Any:
+    telemetry = dataclasses.replace(bootstrap.runtime.telemetry, encoding=encoding)
+    return dataclasses.replace(bootstrap, runtime=dataclasses.replace(bootstrap.runtime, telemetry=telemetry))
+
+
+def run_back_to_back(engine: Any, cycles: int) -> None:
+    for _ in range(cycles):
+        engine.next_cycle_deadline = time.monotonic()
+        engine.run_cycle()
+
+
+def gc_collections() -> int:
+    return sum(generation["collections"] for generation in gc.get_stats())
+
+
+def take_allocation_snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+
+def count_allocated_blocks(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot) -> int:
+    return sum(stat.count_diff for stat in after.compare_to(before, "traceback") if stat.count_diff > 0)
+
+
+def run_benchmark(runner: ModuleType, options: argparse.Namespace) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        bootstrap = with_telemetry_encoding(
+            runner.normalize_bootstrap(build_raw_bootstrap(Path(tmp_dir), options)),
+            options.encoding,
+        )
+        engine = runner.PlantRuntimeEngine(bootstrap)
+        sink = CountingStream()
+        protocol_stdout = io.TextIOWrapper(io.BufferedWriter(sink), encoding="utf-8", write_through=True)
+        protocol = importlib.import_module("runner_protocol")
+        previous_stdout = protocol.PROTOCOL_STDOUT
+        protocol.PROTOCOL_STDOUT = protocol_stdout
+        try:
+            engine.start()
+            run_back_to_back(engine, options.warmup)
+            engine.reset_stats()
+            protocol_stdout.flush()
+            bytes_before = sink.bytes_written
+            gc.collect()
+            collections_before = gc_collections()
+            blocks_before = sys.getallocatedblocks()
+
+            started_at = time.perf_counter()
+            run_back_to_back(engine, options.cycles)
+            elapsed_s = time.perf_counter() - started_at
+
+            blocks_after = sys.getallocatedblocks()
+            collections_after = gc_collections()
+            protocol_stdout.flush()
+            telemetry_bytes = sink.bytes_written - bytes_before
+            phases = engine.cycle_profiler.snapshot()["phases"]
+
+            peak_bytes: List[int] = []
+            allocated_blocks: List[int] = []
+            tracemalloc.start()
+            try:
+                for _ in range(options.allocation_cycles):
+                    before = take_allocation_snapshot()
+                    current_bytes, _peak = tracemalloc.get_traced_memory()
+                    tracemalloc.reset_peak()
+                    run_back_to_back(engine, 1)
+                    peak_bytes.append(tracemalloc.get_traced_memory()[1] - current_bytes)
+                    allocated_blocks.append(count_allocated_blocks(before, take_allocation_snapshot()))
+            finally:
+                tracemalloc.stop()
+        finally:
+            engine.stop()
+            protocol.PROTOCOL_STDOUT = previous_stdout
+
+    return {
+        "config": {
+            "variables": options.variables,
+            "controllers": options.controllers,
+            "cycles": options.cycles,
+            "warmup": options.warmup,
+            "allocation_cycles": options.allocation_cycles,
+            "encoding": options.encoding,
+            "api": options.api,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+        },
+        "metrics": {
+            "cycles_per_s": options.cycles / elapsed_s if elapsed_s > 0 else 0.0,
+            "phases": {phase: phases[phase] for phase in BENCHMARK_PHASES if phase in phases},
+            "allocations": {
+                "peak_bytes_per_cycle": sum(peak_bytes) / len(peak_bytes) if peak_bytes else 0.0,
+                "allocated_blocks_per_cycle": (
+                    sum(allocated_blocks) / len(allocated_blocks) if allocated_blocks else 0.0
+                ),
+                "retained_blocks_per_cycle": (blocks_after - blocks_before) / options.cycles,
+                "gc_collections_per_1000_cycles": (collections_after - collections_before) * 1000.0 / options.cycles,
+            },
+            "telemetry": {
+                "bytes_per_cycle": telemetry_bytes / options.cycles,
+                "bytes_total": telemetry_bytes,
+            },
+        },
+    }
+
+
+def resolve_metric(metrics: Dict[str, Any], path: str) -> Optional[float]:
+    value: Any = metrics
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return float(value) if isinstance(value, (int, float)) else None
+
+
+def compare_with_baseline(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float,
+) -> List[Dict[str, Any]]:
+    if baseline.get("config") != results["config"]:
+        raise RuntimeError("Baseline foi gerado com outra configuração de benchmark")
+
+    comparison: List[Dict[str, Any]] = []
+    for path, better in BENCHMARK_REGRESSION_METRICS:
+        current = resolve_metric(results["metrics"], path)
+        previous = resolve_metric(baseline.get("metrics") or {}, path)
+        if current is None or previous is None:
+            continue
+        relative = previous != 0
+        change = (current - previous) / previous if relative else current - previous
+        worse_by = -change if better == "higher" else change
+        comparison.append(
+            {
+                "metric": path,
+                "baseline": previous,
+                "current": current,
+                "change": change,
+                "relative": relative,
+                "regressed": worse_by > tolerance,
+            }
+        )
+    return comparison
+
+
+def run() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runner", type=Path, default=Path(__file__).with_name("runner.py"))
+    parser.add_argument("--variables", type=int, default=16)
+    parser.add_argument("--controllers", type=int, default=4)
+    parser.add_argument("--cycles", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=500)
+    parser.add_argument("--allocation-cycles", type=int, default=200)
+    parser.add_argument("--encoding", choices=("json", "binary", "delta"), default="json")
+    parser.add_argument("--api", choices=BENCHMARK_API_MODES, default="dict")
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args()
+    if args.variables < 1 or args.controllers < 1 or args.cycles < 1:
+        parser.error("--variables, --controllers e --cycles devem ser positivos")
+    if args.controllers > args.variables:
+        parser.error("--controllers não pode ser maior que --variables")
+
+    runner = load_runner_module(args.runner)
+    results = run_benchmark(runner, args)
+    regressed = False
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        try:
+            results["comparison"] = compare_with_baseline(results, baseline, args.tolerance)
+        except RuntimeError as exc:
+            sys.stderr.write(f"{exc}\n")
+            return 2
+        regressed = any(item["regressed"] for item in results["comparison"])
+        for item in results["comparison"]:
+            if item["regressed"]:
+                change = f"{item['change']:+.1%}" if item["relative"] else f"{item['change']:+.6g}"
+                sys.stderr.write(
+                    f"Regressão em {item['metric']}: {item['baseline']:.6g} -> {item['current']:.6g} ({change})\n"
+                )
+
+    rendered = json.dumps(results, indent=2, ensure_ascii=False) + "\n"
+    if args.output is not None:
+        args.output.write_text(rendered, encoding="utf-8")
+    sys.stdout.write(rendered)
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(run())
@@ -0,0 +1,3676 @@
+from __future__ import annotations
+
+import contextlib
+import functools
+import json
+import math
+import queue
+import sys
+import threading
+import time
+import traceback
+from array import array
+from collections import deque
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from types import CodeType, MappingProxyType, ModuleType
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Collection,
+    ContextManager,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Protocol,
+    TypeAlias,
+    cast,
+)
+
+from runner_protocol import (
+    JSONValue,
+    JsonObject,
+    PublishMetrics,
+    copy_protocol_context,
+    emit,
+    format_exception_message,
+    log_error,
+    log_exception,
+)
+
+if TYPE_CHECKING:
+    import asyncio
+    import concurrent.futures
+
+    from runner_profiler import StackSampler
+    from runner_recorder import ColumnarRecorder
+    from runner_transports import (
+        BinaryTelemetryEncoder,
+        DeltaTelemetryEncoder,
+        TelemetryDisplayDecimator,
+        TelemetryEncoder,
+        TelemetryRingWriter,
+    )
+    from runner_workers import ProcessControllerWorker
+
+
+SensorPayload: TypeAlias = Mapping[str, float]
+ActuatorPayload: TypeAlias = Mapping[str, float]
+ControllerOutputPayload: TypeAlias = Dict[str, float]
+DRIVER_REQUIRED_METHODS = ("connect", "stop", "read")
+DRIVER_WRITE_METHOD = "write"
+DRIVER_VECTOR_READ_METHOD = "read_vector"
+PLUGIN_BYTECODE_CACHE_DIR = "plugin-cache"
+PLUGIN_CODE_CACHE: Dict[str, tuple[str, CodeType]] = {}
+PLUGIN_CODE_CACHE_LOCK = threading.Lock()
+PLUGIN_CODE_CACHE_MAX_ENTRIES = 64
+CONTROLLER_REQUIRED_METHODS = ("compute",)
+CONTROLLER_VECTOR_COMPUTE_METHOD = "compute_vector"
+CONTROLLER_BATCH_COMPUTE_METHOD = "compute_batch"
+CONTROLLER_PARAMS_CHANGED_METHOD = "on_params_changed"
+CONTROLLER_READ_ONLY_SNAPSHOT_ATTR = "snapshot_read_only"
+CONTROLLER_EXECUTION_MODES = ("inline", "process")
+CONTROLLER_DEADLINE_FALLBACKS = ("hold", "zero")
+CONTROLLER_WORKER_JOIN_TIMEOUT_S = 2.0
+CONTROL_DEFAULT_DEADLINE_FRACTION = 0.5
+
+DRIVER_IO_MODES = ("sync", "thread")
+DRIVER_IO_JOIN_TIMEOUT_S = 2.0
+
+TIMING_STRATEGIES = ("deadline", "hybrid")
+DEFAULT_SPIN_WINDOW_MS = 2.0
+TELEMETRY_ENCODINGS = ("json", "binary", "delta")
+TELEMETRY_PUBLISHERS = ("inline", "thread")
+TELEMETRY_OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "block")
+TELEMETRY_PUBLISHER_JOIN_TIMEOUT_S = 2.0
+TELEMETRY_TRANSPORTS = ("stdout", "ring")
+BINARY_FRAME_MAGIC = b"\x00"
+BINARY_TELEMETRY_SCALARS = (
+    "timestamp",
+    "effective_dt_ms",
+    "cycle_duration_ms",
+    "read_duration_ms",
+    "control_duration_ms",
+    "write_duration_ms",
+    "publish_duration_ms",
+    "late_by_ms",
+    "uptime_s",
+    "cycle_late",
+    "dropped_telemetry_frames",
+    "start_jitter_ms",
+    "sensor_age_ms",
+    "written_cycle_id",
+    "publish_serialize_ms",
+    "publish_write_ms",
+    "publish_flush_ms",
+    "publish_bytes",
+    "configured_sample_time_ms",
+    "jitter_mean_ms",
+    "jitter_max_ms",
+    "jitter_std_ms",
+)
+TELEMETRY_CYCLE_PHASE = "publish_telemetry"
+STATS_PHASE_FIELDS = (
+    ("cycle", "cycle_duration_ms"),
+    ("read", "read_duration_ms"),
+    ("control", "control_duration_ms"),
+    ("write", "write_duration_ms"),
+    ("publish", "publish_duration_ms"),
+    ("publish_serialize", "publish_serialize_ms"),
+    ("publish_write", "publish_write_ms"),
+    ("publish_flush", "publish_flush_ms"),
+    ("start_jitter", "start_jitter_ms"),
+    ("late", "late_by_ms"),
+)
+STATS_PERCENTILES = (("p50_ms", 50.0), ("p95_ms", 95.0), ("p99_ms", 99.0), ("p999_ms", 99.9))
+STATS_EXACT_MICROS = 32
+STATS_SUB_BUCKET_BITS = 4
+PROFILE_DEFAULT_DURATION_S = 10.0
+PROFILE_DEFAULT_INTERVAL_MS = 5.0
+
+
+@dataclass
+class VariableSpec:
+    id: str
+    name: str
+    type: str
+    unit: str
+    setpoint: float
+    pv_min: float
+    pv_max: float
+    linked_sensor_ids: List[str]
+
+
+@dataclass
+class IOGroup:
+    ids: List[str]
+    count: int
+    variables: List[VariableSpec]
+    variables_by_id: Dict[str, VariableSpec]
+
+
+@dataclass
+class PlantContext:
+    id: str
+    name: str
+    variables: List[VariableSpec]
+    variables_by_id: Dict[str, VariableSpec]
+    sensors: IOGroup
+    actuators: IOGroup
+    setpoints: Dict[str, float]
+
+    def apply_setpoints(self, next_setpoints: Dict[str, float]) -> None:
+        self.setpoints = dict(next_setpoints)
+        for variable_id, variable in self.variables_by_id.items():
+            if variable_id in self.setpoints:
+                variable.setpoint = self.setpoints[variable_id]
+        for variable in self.variables:
+            if variable.id in self.setpoints:
+                variable.setpoint = self.setpoints[variable.id]
+
+
+@dataclass(frozen=True)
+class RuntimeTiming:
+    owner: str
+    clock: str
+    strategy: str
+    sample_time_ms: int
+    spin_window_ms: float = DEFAULT_SPIN_WINDOW_MS
+
+    @property
+    def wake_margin_s(self) -> float:
+        if self.strategy == "hybrid":
+            return self.spin_window_ms / 1000.0
+        return 0.0
+
+
+@dataclass(frozen=True)
+class RuntimeSupervision:
+    owner: str
+    startup_timeout_ms: int
+    shutdown_timeout_ms: int
+
+
+@dataclass(frozen=True)
+class RuntimePaths:
+    runtime_dir: str
+    venv_python_path: str
+    runner_path: str
+    bootstrap_path: str
+
+
+@dataclass(frozen=True)
+class RuntimeTelemetry:
+    encoding: str = "json"
+    batch_max_cycles: int = 1
+    batch_window_ms: int = 0
+    publisher: str = "inline"
+    queue_size: int = 256
+    overflow_policy: str = "drop_oldest"
+    transport: str = "stdout"
+    ring_capacity: int = 4096
+    ring_notify_ms: int = 100
+    display_rate_hz: float = 0.0
+    keyframe_cycles: int = 100
+
+    @property
+    def batches_telemetry(self) -> bool:
+        return self.batch_max_cycles > 1
+
+
+@dataclass(frozen=True)
+class RuntimeRecorder:
+    enabled: bool = False
+    chunk_cycles: int = 1024
+    queue_chunks: int = 8
+    compression_level: int = 1
+
+
+@dataclass(frozen=True)
+class RuntimeStats:
+    interval_ms: int = 0
+
+
+@dataclass(frozen=True)
+class RuntimeControl:
+    parallel_groups: bool = False
+    max_workers: int = 4
+    join_deadline_ms: float = 0.0
+
+
+@dataclass(frozen=True)
+class RuntimeDriverIO:
+    mode: str = "sync"
+
+
+@dataclass(frozen=True)
+class RuntimeContext:
+    id: str
+    timing: RuntimeTiming
+    supervision: RuntimeSupervision
+    paths: RuntimePaths
+    telemetry: RuntimeTelemetry = field(default_factory=RuntimeTelemetry)
+    control: RuntimeControl = field(default_factory=RuntimeControl)
+    driver_io: RuntimeDriverIO = field(default_factory=RuntimeDriverIO)
+    recorder: RuntimeRecorder = field(default_factory=RuntimeRecorder)
+    stats: RuntimeStats = field(default_factory=RuntimeStats)
+
+
+@dataclass(frozen=True)
+class DriverMetadata:
+    plugin_id: str
+    plugin_name: str
+    plugin_dir: str
+    source_file: str
+    class_name: str
+    config: Dict[str, JSONValue]
+
+
+@dataclass
+class ControllerParamSpec:
+    key: str
+    type: str
+    value: JSONValue
+    label: str
+
+
+@dataclass(frozen=True)
+class ControllerExecution:
+    mode: str = "inline"
+    deadline_ms: float = 0.0
+    fallback: str = "hold"
+
+
+@dataclass
+class ControllerMetadata:
+    id: str
+    plugin_id: str
+    plugin_name: str
+    plugin_dir: str
+    source_file: str
+    class_name: str
+    name: str
+    controller_type: str
+    active: bool
+    input_variable_ids: List[str]
+    output_variable_ids: List[str]
+    params: Dict[str, ControllerParamSpec]
+    execution: ControllerExecution = field(default_factory=ControllerExecution)
+
+
+@dataclass(frozen=True)
+class ControllerPublicMetadata:
+    id: str
+    name: str
+    controller_type: str
+    input_variable_ids: List[str]
+    output_variable_ids: List[str]
+    params: Dict[str, ControllerParamSpec]
+
+    def serialize(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "controller_type": self.controller_type,
+            "input_variable_ids": list(self.input_variable_ids),
+            "output_variable_ids": list(self.output_variable_ids),
+            "params": serialize_controller_params(self.params),
+        }
+
+
+@dataclass(frozen=True)
+class DriverPluginContext:
+    config: Dict[str, JSONValue]
+    plant: PlantContext
+
+
+@dataclass(frozen=True)
+class ControllerPluginContext:
+    controller: ControllerPublicMetadata
+    plant: PlantContext
+
+
+@dataclass(frozen=True)
+class RuntimeBootstrap:
+    driver: DriverMetadata
+    controllers: List[ControllerMetadata]
+    plant: PlantContext
+    runtime: RuntimeContext
+
+
+@dataclass(frozen=True)
+class CycleDurations:
+    read_duration_ms: float = 0.0
+    control_duration_ms: float = 0.0
+    write_duration_ms: float = 0.0
+    controller_durations_ms: Dict[str, float] = field(default_factory=dict)
+    sensor_age_ms: Optional[float] = 0.0
+    written_cycle_id: Optional[int] = None
+
+
+class IndexedValues(Mapping[str, float]):
+    __slots__ = ("ids", "index", "values")
+
+    def __init__(self, ids: List[str], index: Dict[str, int], values: array) -> None:
+        self.ids = ids
+        self.index = index
+        self.values = values
+
+    def __getitem__(self, key: str) -> float:
+        return self.values[self.index[key]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.index
+
+
+@dataclass(frozen=True)
+class VectorSnapshot:
+    cycle_id: int
+    timestamp: float
+    dt_s: float
+    sensors: array
+    actuators: array
+    setpoints: array
+    inputs: array
+
+
+class PlantVectorLayout:
+    def __init__(self, plant: PlantContext) -> None:
+        self.plant = plant
+        self.sensor_ids = list(plant.sensors.ids)
+        self.actuator_ids = list(plant.actuators.ids)
+        self.sensor_index = {variable_id: index for index, variable_id in enumerate(self.sensor_ids)}
+        self.actuator_index = {variable_id: index for index, variable_id in enumerate(self.actuator_ids)}
+        self.setpoints_source: Optional[Dict[str, float]] = None
+        self.setpoints_vector = array("d")
+
+    def sensors_view(self, values: array) -> IndexedValues:
+        return IndexedValues(self.sensor_ids, self.sensor_index, values)
+
+    def actuators_view(self, values: array) -> IndexedValues:
+        return IndexedValues(self.actuator_ids, self.actuator_index, values)
+
+    def pack_sensors(self, sensors: Mapping[str, float]) -> array:
+        if isinstance(sensors, IndexedValues) and sensors.ids is self.sensor_ids:
+            return sensors.values
+        return array("d", [sensors.get(variable_id, math.nan) for variable_id in self.sensor_ids])
+
+    def pack_actuators(self, actuators: Mapping[str, float]) -> array:
+        if isinstance(actuators, IndexedValues) and actuators.ids is self.actuator_ids:
+            return actuators.values
+        return array("d", [actuators.get(variable_id, math.nan) for variable_id in self.actuator_ids])
+
+    def setpoints_for_sensors(self) -> array:
+        if self.setpoints_source is not self.plant.setpoints:
+            self.setpoints_source = self.plant.setpoints
+            self.setpoints_vector = array(
+                "d",
+                [self.plant.setpoints.get(variable_id, math.nan) for variable_id in self.sensor_ids],
+            )
+        return self.setpoints_vector
+
+
+@dataclass(frozen=True)
+class ControllerBatch:
+    cycle_id: int
+    timestamp: float
+    dt_s: float
+    controllers: List[Any]
+    controller_ids: List[str]
+    sensors: Any
+    actuators: Any
+    inputs: Any
+    setpoints: Any
+
+
+class VectorControllerBinding:
+    def __init__(self, layout: PlantVectorLayout, controller: ControllerMetadata) -> None:
+        self.layout = layout
+        self.input_variable_ids = list(controller.input_variable_ids)
+        self.output_variable_ids = list(controller.output_variable_ids)
+        self.input_setpoints_source: Optional[Dict[str, float]] = None
+        self.input_setpoints_vector = array("d")
+        self.input_sources: List[tuple[bool, int]] = []
+        for variable_id in controller.input_variable_ids:
+            if variable_id in layout.sensor_index:
+                self.input_sources.append((True, layout.sensor_index[variable_id]))
+            elif variable_id in layout.actuator_index:
+                self.input_sources.append((False, layout.actuator_index[variable_id]))
+            else:
+                self.input_sources.append((True, -1))
+
+    def build(
+        self,
+        cycle_id: int,
+        cycle_started_at: float,
+        dt_ms: float,
+        sensors: array,
+        actuators: array,
+    ) -> VectorSnapshot:
+        return VectorSnapshot(
+            cycle_id=cycle_id,
+            timestamp=cycle_started_at,
+            dt_s=max(0.0, dt_ms / 1000.0),
+            sensors=sensors,
+            actuators=actuators,
+            setpoints=self.layout.setpoints_for_sensors(),
+            inputs=self.gather_inputs(sensors, actuators),
+        )
+
+    def gather_inputs(self, sensors: array, actuators: array) -> array:
+        return array(
+            "d",
+            [
+                math.nan if index < 0 else (sensors if is_sensor else actuators)[index]
+                for is_sensor, index in self.input_sources
+            ],
+        )
+
+    def input_setpoints(self) -> array:
+        setpoints = self.layout.plant.setpoints
+        if self.input_setpoints_source is not setpoints:
+            self.input_setpoints_source = setpoints
+            self.input_setpoints_vector = array(
+                "d",
+                [setpoints.get(variable_id, math.nan) for variable_id in self.input_variable_ids],
+            )
+        return self.input_setpoints_vector
+
+
+class JitterStats:
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean_ms = 0.0
+        self.m2 = 0.0
+        self.max_ms = 0.0
+
+    def record(self, value_ms: float) -> None:
+        self.count += 1
+        delta = value_ms - self.mean_ms
+        self.mean_ms += delta / self.count
+        self.m2 += delta * (value_ms - self.mean_ms)
+        self.max_ms = max(self.max_ms, value_ms)
+
+    @property
+    def std_ms(self) -> float:
+        if self.count < 2:
+            return 0.0
+        return math.sqrt(self.m2 / (self.count - 1))
+
+
+class LatencyHistogram:
+    def __init__(self) -> None:
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, value_ms: Optional[float]) -> None:
+        if value_ms is None or value_ms != value_ms:
+            return
+        bucket = latency_bucket(max(0, int(value_ms * 1000.0)))
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def percentile(self, percent: float) -> float:
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(self.count * percent / 100.0))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(latency_bucket_upper(bucket) / 1000.0, self.max_ms)
+        return self.max_ms
+
+    def summary(self) -> Dict[str, float]:
+        summary: Dict[str, float] = {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+        }
+        for name, percent in STATS_PERCENTILES:
+            summary[name] = self.percentile(percent)
+        summary["max_ms"] = self.max_ms
+        return summary
+
+
+def latency_bucket(micros: int) -> int:
+    if micros < STATS_EXACT_MICROS:
+        return micros
+    shift = micros.bit_length() - STATS_SUB_BUCKET_BITS - 1
+    return (shift << STATS_SUB_BUCKET_BITS) + (micros >> shift)
+
+
+def latency_bucket_upper(bucket: int) -> int:
+    if bucket < STATS_EXACT_MICROS:
+        return bucket
+    sub_buckets = 1 << STATS_SUB_BUCKET_BITS
+    shift = (bucket >> STATS_SUB_BUCKET_BITS) - 1
+    significand = (bucket & (sub_buckets - 1)) + sub_buckets
+    return ((significand + 1) << shift) - 1
+
+
+class CycleProfiler:
+    def __init__(self, sample_time_ms: int) -> None:
+        self.sample_time_ms = sample_time_ms
+        self.reset()
+
+    def reset(self) -> None:
+        self.phases: Dict[str, LatencyHistogram] = {}
+        self.controllers: Dict[str, LatencyHistogram] = {}
+        self.first_cycle_id: Optional[int] = None
+        self.last_cycle_id: Optional[int] = None
+        self.cycles = 0
+        self.publish_bytes_total = 0
+        self.publish_bytes_max = 0
+
+    def record(self, payload: Dict[str, Any]) -> None:
+        if self.first_cycle_id is None:
+            self.first_cycle_id = payload.get("cycle_id")
+        self.last_cycle_id = payload.get("cycle_id")
+        self.cycles += 1
+        publish_bytes = int(payload.get("publish_bytes") or 0)
+        self.publish_bytes_total += publish_bytes
+        self.publish_bytes_max = max(self.publish_bytes_max, publish_bytes)
+        for phase, field_name in STATS_PHASE_FIELDS:
+            self._phase(phase).record(payload.get(field_name))
+        effective_dt_ms = payload.get("effective_dt_ms")
+        if effective_dt_ms is not None:
+            self._phase("dt_error").record(abs(effective_dt_ms - self.sample_time_ms))
+        for controller_id, duration_ms in (payload.get("controller_durations_ms") or {}).items():
+            histogram = self.controllers.get(controller_id)
+            if histogram is None:
+                histogram = self.controllers[controller_id] = LatencyHistogram()
+            histogram.record(duration_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "first_cycle_id": self.first_cycle_id,
+            "last_cycle_id": self.last_cycle_id,
+            "phases": {phase: histogram.summary() for phase, histogram in self.phases.items()},
+            "controllers": {
+                controller_id: histogram.summary()
+                for controller_id, histogram in self.controllers.items()
+            },
+            "publish_bytes": {
+                "total": self.publish_bytes_total,
+                "mean": self.publish_bytes_total / self.cycles if self.cycles else 0.0,
+                "max": self.publish_bytes_max,
+            },
+        }
+
+    def _phase(self, phase: str) -> LatencyHistogram:
+        histogram = self.phases.get(phase)
+        if histogram is None:
+            histogram = self.phases[phase] = LatencyHistogram()
+        return histogram
+
+
+class DriverProtocol(Protocol):
+    def connect(self) -> bool: ...
+
+    def stop(self) -> bool: ...
+
+    def read(self) -> Dict[str, Dict[str, float]]: ...
+
+    def write(self, outputs: Dict[str, float]) -> bool | None: ...
+
+
+class ControllerProtocol(Protocol):
+    def compute(self, snapshot: Dict[str, Any]) -> Dict[str, float]: ...
+
+
+class ControllerSnapshotBuilder:
+    def __init__(
+        self,
+        plant: PlantContext,
+        controller_public_metadata: Dict[str, Any],
+        read_only: bool = False,
+    ) -> None:
+        self.plant = plant
+        self.read_only = read_only
+        self.controller_public_metadata = controller_public_metadata
+        self.controller_view = freeze_json_value(controller_public_metadata) if read_only else None
+        self.plant_summary = {"id": plant.id, "name": plant.name}
+        self.plant_view = MappingProxyType(dict(self.plant_summary))
+        self.setpoints_source: Optional[Dict[str, float]] = None
+        self.variable_templates: Dict[str, Dict[str, Any]] = {}
+        self.variables_view: Mapping[str, Any] = MappingProxyType({})
+
+    def build(
+        self,
+        cycle_id: int,
+        cycle_started_at: float,
+        dt_ms: float,
+        sensors: SensorPayload,
+        actuators: ActuatorPayload,
+    ) -> Dict[str, Any]:
+        self._refresh_variables()
+        if self.read_only:
+            return cast(
+                Dict[str, Any],
+                MappingProxyType(
+                    {
+                        "cycle_id": cycle_id,
+                        "timestamp": cycle_started_at,
+                        "dt_s": max(0.0, dt_ms / 1000.0),
+                        "plant": self.plant_view,
+                        "setpoints": MappingProxyType(self.plant.setpoints),
+                        "sensors": MappingProxyType(sensors),
+                        "actuators": MappingProxyType(actuators),
+                        "variables_by_id": self.variables_view,
+                        "controller": self.controller_view,
+                    }
+                ),
+            )
+
+        return {
+            "cycle_id": cycle_id,
+            "timestamp": cycle_started_at,
+            "dt_s": max(0.0, dt_ms / 1000.0),
+            "plant": dict(self.plant_summary),
+            "setpoints": dict(self.plant.setpoints),
+            "sensors": dict(sensors),
+            "actuators": dict(actuators),
+            "variables_by_id": {
+                variable_id: {
+                    **template,
+                    "linked_sensor_ids": list(template["linked_sensor_ids"]),
+                }
+                for variable_id, template in self.variable_templates.items()
+            },
+            "controller": clone_public_controller_metadata(self.controller_public_metadata),
+        }
+
+    def _refresh_variables(self) -> None:
+        if self.setpoints_source is self.plant.setpoints:
+            return
+
+        self.setpoints_source = self.plant.setpoints
+        self.variable_templates = {
+            variable_id: {
+                "id": variable.id,
+                "name": variable.name,
+                "type": variable.type,
+                "unit": variable.unit,
+                "setpoint": variable.setpoint,
+                "pv_min": variable.pv_min,
+                "pv_max": variable.pv_max,
+                "linked_sensor_ids": list(variable.linked_sensor_ids),
+            }
+            for variable_id, variable in self.plant.variables_by_id.items()
+        }
+        if self.read_only:
+            self.variables_view = cast(Mapping[str, Any], freeze_json_value(self.variable_templates))
+
+
+@dataclass
+class LoadedController:
+    metadata: ControllerMetadata
+    public_metadata: Dict[str, Any]
+    instance: ControllerProtocol
+    snapshot_builder: ControllerSnapshotBuilder
+    context: Optional[ControllerPluginContext] = None
+    vector_binding: Optional[VectorControllerBinding] = None
+    batch_binding: Optional[VectorControllerBinding] = None
+    process_worker: Optional[ProcessControllerWorker] = None
+
+
+@dataclass
+class ControllerBatchGroup:
+    members: List[LoadedController]
+
+
+@dataclass(frozen=True)
+class ControllerReloadPlan:
+    metadata: ControllerMetadata
+    current: Optional[LoadedController] = None
+    params_only: bool = False
+
+
+@dataclass
+class ControllerReloadResult:
+    version: int
+    controllers: List[ControllerMetadata]
+    plan: List[ControllerReloadPlan] = field(default_factory=list)
+    loaded: Optional[List[LoadedController]] = None
+    error: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class TelemetrySchema:
+    schema_id: int
+    sensor_ids: List[str]
+    actuator_ids: List[str]
+    setpoint_ids: List[str]
+    controller_ids: List[str]
+
+    def groups(self) -> List[tuple[str, List[str]]]:
+        return [
+            ("sensors", self.sensor_ids),
+            ("actuators", self.actuator_ids),
+            ("actuators_read", self.actuator_ids),
+            ("setpoints", self.setpoint_ids),
+            ("controller_outputs", self.actuator_ids),
+            ("written_outputs", self.actuator_ids),
+            ("controller_durations_ms", self.controller_ids),
+            ("controller_missed_deadlines", self.controller_ids),
+        ]
+
+    def has_same_layout(self, other: TelemetrySchema) -> bool:
+        return self.groups() == other.groups()
+
+    def serialize(self) -> Dict[str, Any]:
+        return {
+            "schema_id": self.schema_id,
+            "frame_magic": BINARY_FRAME_MAGIC[0],
+            "byte_order": "little",
+            "prefix": ["schema_id:u32", "cycle_id:u64"],
+            "scalars": list(BINARY_TELEMETRY_SCALARS),
+            "constants": {"phase": TELEMETRY_CYCLE_PHASE},
+            "groups": [
+                {"name": name, "ids": list(ids)}
+                for name, ids in self.groups()
+            ],
+        }
+
+
+class TelemetryPublisher:
+    def __init__(self, options: RuntimeTelemetry) -> None:
+        self.options = options
+        self.batch: List[Any] = []
+        self.batch_started_at: Optional[float] = None
+        self.dropped_frames = 0
+        self.metrics = PublishMetrics()
+        self.metrics_lock = threading.Lock()
+
+    def publish(
+        self,
+        payload: Dict[str, Any],
+        encoder: Optional[TelemetryEncoder],
+    ) -> None:
+        self._write_telemetry(payload, encoder)
+
+    def flush(self) -> None:
+        self._write_batch()
+
+    def flush_due_at(self) -> Optional[float]:
+        if self.options.batch_window_ms <= 0 or self.batch_started_at is None:
+            return None
+        return self.batch_started_at + (self.options.batch_window_ms / 1000.0)
+
+    def flush_expired(self, now: float) -> None:
+        if self._batch_window_expired(now):
+            self._write_batch()
+
+    def emit_event(self, msg_type: str, payload: Optional[Dict[str, Any]] = None) -> None:
+        self._write_event(msg_type, payload)
+
+    def close(self) -> None:
+        self._write_batch()
+
+    def record_metrics(self, metrics: Optional[PublishMetrics]) -> None:
+        if metrics is None:
+            return
+        with self.metrics_lock:
+            self.metrics.add(metrics)
+
+    def take_metrics(self) -> PublishMetrics:
+        with self.metrics_lock:
+            metrics = self.metrics
+            self.metrics = PublishMetrics()
+        return metrics
+
+    def _write_telemetry(
+        self,
+        payload: Dict[str, Any],
+        encoder: Optional[TelemetryEncoder],
+    ) -> None:
+        encode_started_at = time.monotonic()
+        item: Any = encoder.encode(payload) if encoder is not None else payload
+        if encoder is not None:
+            self.record_metrics(PublishMetrics(serialize_ms=(time.monotonic() - encode_started_at) * 1000.0))
+        if not self.options.batches_telemetry:
+            if self.options.encoding == "binary":
+                self.record_metrics(load_telemetry_transports().emit_frames([item]))
+            elif encoder is not None:
+                self.record_metrics(emit("telemetry_delta", item))
+            else:
+                self.record_metrics(emit("telemetry", item))
+            return
+
+        now = time.monotonic()
+        if not self.batch:
+            self.batch_started_at = now
+        self.batch.append(item)
+
+        if len(self.batch) >= self.options.batch_max_cycles or self._batch_window_expired(now):
+            self._write_batch()
+
+    def _write_batch(self) -> None:
+        if not self.batch:
+            return
+
+        batch = self.batch
+        self.batch = []
+        self.batch_started_at = None
+        if self.options.encoding == "binary":
+            self.record_metrics(load_telemetry_transports().emit_frames(batch))
+        else:
+            self.record_metrics(emit("telemetry_batch", {"items": batch}))
+
+    def _write_event(self, msg_type: str, payload: Optional[Dict[str, Any]]) -> None:
+        self._write_batch()
+        self.record_metrics(emit(msg_type, payload))
+
+    def _batch_window_expired(self, now: float) -> bool:
+        if self.options.batch_window_ms <= 0 or self.batch_started_at is None:
+            return False
+        return (now - self.batch_started_at) * 1000.0 >= self.options.batch_window_ms
+
+
+class ThreadedTelemetryPublisher(TelemetryPublisher):
+    def __init__(self, options: RuntimeTelemetry) -> None:
+        super().__init__(options)
+        self.pending: Deque[tuple[str, Any, Any]] = deque()
+        self.pending_telemetry = 0
+        self.condition = threading.Condition()
+        self.closed = False
+        self.thread = threading.Thread(
+            target=copy_protocol_context(),
+            args=(self._run,),
+            daemon=True,
+            name="telemetry-publisher",
+        )
+        self.thread.start()
+
+    def publish(
+        self,
+        payload: Dict[str, Any],
+        encoder: Optional[TelemetryEncoder],
+    ) -> None:
+        with self.condition:
+            if self.pending_telemetry >= self.options.queue_size:
+                if self.options.overflow_policy == "drop_newest":
+                    self.dropped_frames += 1
+                    return
+                if self.options.overflow_policy == "drop_oldest":
+                    self._drop_oldest_telemetry()
+                else:
+                    while self.pending_telemetry >= self.options.queue_size and not self.closed:
+                        self.condition.wait()
+            self.pending.append(("telemetry", snapshot_telemetry_payload(payload), encoder))
+            self.pending_telemetry += 1
+            self.condition.notify_all()
+
+    def flush(self) -> None:
+        self._enqueue("flush", None, None)
+
+    def flush_due_at(self) -> Optional[float]:
+        return None
+
+    def flush_expired(self, now: float) -> None:
+        return None
+
+    def emit_event(self, msg_type: str, payload: Optional[Dict[str, Any]] = None) -> None:
+        self._enqueue("event", msg_type, payload)
+
+    def close(self) -> None:
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.thread.join(timeout=TELEMETRY_PUBLISHER_JOIN_TIMEOUT_S)
+
+    def _enqueue(self, kind: str, first: Any, second: Any) -> None:
+        with self.condition:
+            self.pending.append((kind, first, second))
+            self.condition.notify_all()
+
+    def _drop_oldest_telemetry(self) -> None:
+        for index, (kind, _, _) in enumerate(self.pending):
+            if kind == "telemetry":
+                del self.pending[index]
+                self.pending_telemetry -= 1
+                self.dropped_frames += 1
+                return
+
+    def _batch_flush_timeout(self) -> Optional[float]:
+        deadline = super().flush_due_at()
+        if deadline is None:
+            return None
+        return max(0.0, deadline - time.monotonic())
+
+    def _run(self) -> None:
+        while True:
+            with self.condition:
+                if not self.pending and not self.closed:
+                    self.condition.wait(self._batch_flush_timeout())
+                if not self.pending and self.closed:
+                    break
+                operations = list(self.pending)
+                self.pending.clear()
+                self.pending_telemetry = 0
+                self.condition.notify_all()
+
+            try:
+                for kind, first, second in operations:
+                    if kind == "telemetry":
+                        self._write_telemetry(first, second)
+                    elif kind == "event":
+                        self._write_event(first, second)
+                    else:
+                        self._write_batch()
+                if self._batch_window_expired(time.monotonic()):
+                    self._write_batch()
+            except Exception as exc:  # noqa: BLE001
+                log_error(f"Falha ao publicar telemetria: {format_exception_message(exc)}")
+
+        try:
+            self._write_batch()
+        except Exception as exc:  # noqa: BLE001
+            log_error(f"Falha ao publicar telemetria: {format_exception_message(exc)}")
+
+
+def snapshot_telemetry_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        key: dict(value) if isinstance(value, Mapping) else value
+        for key, value in payload.items()
+    }
+
+
+def create_telemetry_publisher(options: RuntimeTelemetry) -> TelemetryPublisher:
+    if options.publisher == "thread":
+        return ThreadedTelemetryPublisher(options)
+    return TelemetryPublisher(options)
+
+
+@dataclass(frozen=True)
+class DriverSample:
+    sensors: SensorPayload
+    actuators: ActuatorPayload
+    completed_at: float
+
+
+class DriverIOWorker:
+    def __init__(
+        self,
+        read: Callable[[], Any],
+        normalize_read: Callable[[Any], tuple[SensorPayload, ActuatorPayload]],
+        write: Optional[Callable[[Dict[str, float]], Any]],
+    ) -> None:
+        self.read = read
+        self.normalize_read = normalize_read
+        self.write = write
+        self.condition = threading.Condition()
+        self.latest: Optional[DriverSample] = None
+        self.read_requested = False
+        self.pending_write: Optional[tuple[int, Dict[str, float]]] = None
+        self.acknowledged_write: Optional[tuple[int, Dict[str, float]]] = None
+        self.failures: Deque[str] = deque()
+        self.closing = False
+        self.isawaitable = load_inspect().isawaitable
+        self.thread = threading.Thread(
+            target=copy_protocol_context(),
+            args=(self._run,),
+            name="driver-io",
+            daemon=True,
+        )
+        self.thread.start()
+
+    def take_sample(self, timeout_s: float) -> Optional[DriverSample]:
+        with self.condition:
+            if self.latest is None:
+                self.read_requested = True
+                self.condition.notify_all()
+                self.condition.wait_for(lambda: self.latest is not None or self.closing, timeout_s)
+            return self.latest
+
+    def request_read(self) -> None:
+        with self.condition:
+            self.read_requested = True
+            self.condition.notify_all()
+
+    def submit_write(self, cycle_id: int, outputs: Mapping[str, float]) -> None:
+        with self.condition:
+            self.pending_write = (cycle_id, dict(outputs))
+            self.condition.notify_all()
+
+    def take_acknowledged_write(self) -> tuple[Optional[int], Dict[str, float]]:
+        with self.condition:
+            acknowledged = self.acknowledged_write
+            self.acknowledged_write = None
+        if acknowledged is None:
+            return None, {}
+        return acknowledged
+
+    def invalidate(self) -> None:
+        with self.condition:
+            self.latest = None
+
+    def drain_failures(self) -> List[str]:
+        with self.condition:
+            failures = list(self.failures)
+            self.failures.clear()
+        return failures
+
+    def close(self) -> None:
+        with self.condition:
+            self.closing = True
+            self.condition.notify_all()
+        self.thread.join(DRIVER_IO_JOIN_TIMEOUT_S)
+
+    def _run(self) -> None:
+        asyncio = load_asyncio()
+        loop = asyncio.new_event_loop()
+        try:
+            while True:
+                with self.condition:
+                    self.condition.wait_for(
+                        lambda: self.closing or self.read_requested or self.pending_write is not None
+                    )
+                    closing = self.closing
+                    pending_write = self.pending_write
+                    self.pending_write = None
+                    read_requested = self.read_requested and not closing
+                    self.read_requested = False
+
+                if pending_write is not None and self.write is not None:
+                    cycle_id, outputs = pending_write
+                    try:
+                        write_status = self._call(loop, self.write, outputs)
+                        coerce_optional_bool(
+                            "write",
+                            write_status,
+                            "Driver retornou False em write(outputs)",
+                            self._record_failure,
+                        )
+                        if write_status is not False:
+                            with self.condition:
+                                self.acknowledged_write = (cycle_id, outputs)
+                    except Exception as exc:  # noqa: BLE001
+                        log_error(traceback.format_exc())
+                        self._record_failure(f"Falha em escrita de driver: {exc}")
+
+                if closing:
+                    return
+                if read_requested:
+                    try:
+                        sensors, actuators = self.normalize_read(self._call(loop, self.read))
+                    except Exception as exc:  # noqa: BLE001
+                        log_error(traceback.format_exc())
+                        self._record_failure(f"Falha em leitura de driver: {exc}")
+                        continue
+                    with self.condition:
+                        self.latest = DriverSample(sensors, actuators, time.monotonic())
+                        self.condition.notify_all()
+        finally:
+            loop.close()
+
+    def _call(self, loop: asyncio.AbstractEventLoop, method: Callable[..., Any], *args: Any) -> Any:
+        result = method(*args)
+        if self.isawaitable(result):
+            return loop.run_until_complete(result)
+        return result
+
+    def _record_failure(self, message: str) -> None:
+        with self.condition:
+            self.failures.append(message)
+
+
+class PlantRuntimeEngine:
+    def __init__(self, bootstrap: RuntimeBootstrap) -> None:
+        self.bootstrap = bootstrap
+        self.runtime_id = bootstrap.runtime.id
+        self.plant_id = bootstrap.plant.id
+        self.sample_time_ms = bootstrap.runtime.timing.sample_time_ms
+        self.driver_instance: Optional[DriverProtocol] = None
+        self.controllers: List[LoadedController] = []
+        self.running = False
+        self.paused = False
+        self.should_exit = False
+        self.cycle_id = 0
+        self.runtime_started_at: Optional[float] = None
+        self.first_cycle_started_at: Optional[float] = None
+        self.last_cycle_started_at: Optional[float] = None
+        self.next_cycle_deadline: Optional[float] = None
+        self.paused_started_at: Optional[float] = None
+        self.paused_duration_s = 0.0
+        self.controller_reload_version = 0
+        self.controller_reload_results: "queue.Queue[ControllerReloadResult]" = queue.Queue()
+        self.controller_reload_listener: Optional[Callable[[], None]] = None
+        self.telemetry_encoder: Optional[BinaryTelemetryEncoder] = None
+        self.telemetry_delta_encoder: Optional[DeltaTelemetryEncoder] = None
+        self.telemetry_schema_dirty = True
+        self.telemetry_publisher: Optional[TelemetryPublisher] = None
+        self.telemetry_ring: Optional[TelemetryRingWriter] = None
+        self.telemetry_ring_notified_at: Optional[float] = None
+        self.telemetry_recorder: Optional[ColumnarRecorder] = None
+        self.telemetry_display: Optional[TelemetryDisplayDecimator] = None
+        self.vector_layout = PlantVectorLayout(bootstrap.plant)
+        self.driver_reads_vectors = False
+        self.controllers_use_vectors = False
+        self.controller_batches: Dict[str, ControllerBatchGroup] = {}
+        self.controller_groups: List[List[LoadedController]] = []
+        self.controller_pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self.controller_group_futures: Dict[int, concurrent.futures.Future[Any]] = {}
+        self.late_controller_groups: set[int] = set()
+        self.driver_io: Optional[DriverIOWorker] = None
+        self.jitter_stats = JitterStats()
+        self.cycle_profiler: Optional[CycleProfiler] = None
+        self.stats_published_at: Optional[float] = None
+        self.last_publish_duration_ms = 0.0
+        self.stack_sampler: Optional[StackSampler] = None
+        self.finishing_profiles: List[StackSampler] = []
+        self.startup_trace: Optional[StartupTrace] = None
+
+    def apply_init(self, bootstrap: RuntimeBootstrap) -> None:
+        self._clear_pending_controller_reload_results()
+        self.finish_profile(wait=True)
+        self._close_telemetry_ring(remove=True)
+        self._close_telemetry_recorder()
+        self._close_telemetry_publisher()
+        self._shutdown_controller_pool()
+        self._close_driver_io()
+        self.bootstrap = bootstrap
+        self.runtime_id = bootstrap.runtime.id
+        self.plant_id = bootstrap.plant.id
+        self.sample_time_ms = bootstrap.runtime.timing.sample_time_ms
+        self.driver_instance = None
+        self.controllers = []
+        self.running = False
+        self.paused = False
+        self.should_exit = False
+        self.cycle_id = 0
+        self.runtime_started_at = None
+        self.first_cycle_started_at = None
+        self.last_cycle_started_at = None
+        self.next_cycle_deadline = None
+        self.paused_started_at = None
+        self.paused_duration_s = 0.0
+        self.controller_reload_version = 0
+        self.telemetry_schema_dirty = True
+        self.telemetry_delta_encoder = None
+        self.telemetry_display = None
+        self.vector_layout = PlantVectorLayout(bootstrap.plant)
+        self.driver_reads_vectors = False
+        self.controllers_use_vectors = False
+        self.controller_batches = {}
+        self.controller_groups = []
+        self.jitter_stats = JitterStats()
+        self.cycle_profiler = None
+        self.stats_published_at = None
+        self.last_publish_duration_ms = 0.0
+
+    def start(self) -> None:
+        if self.driver_instance is None:
+            with startup_phase(self.startup_trace, "plugin_import"):
+                driver_cls = load_plugin_class(
+                    Path(self.bootstrap.driver.plugin_dir),
+                    self.bootstrap.driver.source_file,
+                    self.bootstrap.driver.class_name,
+                    DRIVER_REQUIRED_METHODS,
+                    "driver",
+                    self._plugin_cache_dir(),
+                )
+                driver_context = build_driver_plugin_context(self.bootstrap)
+                self.driver_instance = instantiate_plugin(
+                    driver_cls,
+                    driver_context,
+                    "driver",
+                )
+
+            if self.bootstrap.controllers and not callable(
+                getattr(self.driver_instance, DRIVER_WRITE_METHOD, None)
+            ):
+                raise RuntimeError(
+                    "Driver precisa implementar write(outputs) quando houver controladores ativos"
+                )
+
+            try:
+                with startup_phase(self.startup_trace, "driver_connect"):
+                    connected_result = self.driver_instance.connect()
+            except Exception as exc:  # noqa: BLE001
+                raise RuntimeError(
+                    f"Falha ao conectar driver '{self.bootstrap.driver.plugin_name}': {format_exception_message(exc)}"
+                ) from exc
+
+            connected = coerce_required_bool("connect", connected_result)
+            if not connected:
+                raise RuntimeError("Driver retornou False em connect()")
+
+            self.driver_reads_vectors = callable(
+                getattr(self.driver_instance, DRIVER_VECTOR_READ_METHOD, None)
+            )
+            self._start_driver_io()
+
+            with startup_phase(self.startup_trace, "plugin_import"):
+                controllers = self.bootstrap.controllers
+                self._ensure_driver_write_support(controllers)
+                self._install_controllers(controllers, self._load_controllers(controllers))
+
+        self.running = True
+        self.paused = False
+        now = time.monotonic()
+        if self.runtime_started_at is None:
+            self.runtime_started_at = now
+        self.first_cycle_started_at = None
+        self.next_cycle_deadline = now
+        self.last_cycle_started_at = None
+
+    def _start_driver_io(self) -> None:
+        driver = cast(Any, self.driver_instance)
+        if self.driver_reads_vectors:
+            read = getattr(driver, DRIVER_VECTOR_READ_METHOD)
+            layout = self.vector_layout
+            normalize_read: Callable[[Any], tuple[SensorPayload, ActuatorPayload]] = (
+                lambda raw: normalize_read_vector(raw, layout)
+            )
+        else:
+            read = driver.read
+            plant = self.bootstrap.plant
+            normalize_read = lambda raw: normalize_read_snapshot(raw, plant)  # noqa: E731
+        write = getattr(driver, DRIVER_WRITE_METHOD, None)
+        inspect = load_inspect()
+        driver_is_async = inspect.iscoroutinefunction(read) or inspect.iscoroutinefunction(write)
+        if self.bootstrap.runtime.driver_io.mode == "thread" or driver_is_async:
+            self.driver_io = DriverIOWorker(read, normalize_read, write if callable(write) else None)
+
+    def _close_driver_io(self) -> None:
+        if self.driver_io is not None:
+            self.driver_io.close()
+            self.driver_io = None
+
+    def _stop_loaded_controllers(self, controllers: List[LoadedController]) -> None:
+        for controller in controllers:
+            maybe_call_optional_stop(controller.instance, controller.metadata.name, self._report_warning)
+
+    def _clear_pending_controller_reload_results(self) -> None:
+        while True:
+            try:
+                result = self.controller_reload_results.get_nowait()
+            except queue.Empty:
+                break
+
+            if result.loaded is not None:
+                self._stop_loaded_controllers(result.loaded)
+
+    def _ensure_driver_write_support(
+        self,
+        controllers: List[ControllerMetadata],
+    ) -> None:
+        if controllers and self.driver_instance is not None and not callable(
+            getattr(self.driver_instance, DRIVER_WRITE_METHOD, None)
+        ):
+            raise RuntimeError(
+                "Driver precisa implementar write(outputs) quando houver controladores ativos"
+            )
+
+    def _plugin_cache_dir(self) -> Path:
+        return Path(self.bootstrap.runtime.paths.runtime_dir) / PLUGIN_BYTECODE_CACHE_DIR
+
+    def _load_controllers(
+        self,
+        controllers: List[ControllerMetadata],
+    ) -> List[LoadedController]:
+        loaded: List[LoadedController] = []
+        for controller_meta in controllers:
+            if controller_meta.execution.mode == "process":
+                loaded.append(self._load_process_controller(controller_meta))
+                continue
+
+            controller_cls = load_plugin_class(
+                Path(controller_meta.plugin_dir),
+                controller_meta.source_file,
+                controller_meta.class_name,
+                CONTROLLER_REQUIRED_METHODS,
+                f"controlador '{controller_meta.name}'",
+                self._plugin_cache_dir(),
+            )
+            context = build_controller_plugin_context(
+                controller_meta,
+                self.bootstrap.plant,
+            )
+            instance = instantiate_plugin(
+                controller_cls,
+                context,
+                f"controlador '{controller_meta.name}'",
+            )
+            public_metadata = build_public_controller_metadata(controller_meta).serialize()
+            loaded.append(
+                LoadedController(
+                    metadata=controller_meta,
+                    public_metadata=public_metadata,
+                    instance=cast(ControllerProtocol, instance),
+                    snapshot_builder=ControllerSnapshotBuilder(
+                        self.bootstrap.plant,
+                        public_metadata,
+                        read_only=getattr(instance, CONTROLLER_READ_ONLY_SNAPSHOT_ATTR, False) is True,
+                    ),
+                    context=context,
+                    vector_binding=(
+                        VectorControllerBinding(self.vector_layout, controller_meta)
+                        if callable(getattr(instance, CONTROLLER_VECTOR_COMPUTE_METHOD, None))
+                        else None
+                    ),
+                    batch_binding=(
+                        VectorControllerBinding(self.vector_layout, controller_meta)
+                        if callable(getattr(instance, CONTROLLER_BATCH_COMPUTE_METHOD, None))
+                        else None
+                    ),
+                )
+            )
+            maybe_call_optional_connect(loaded[-1].instance, controller_meta.name, self._report_warning)
+        return loaded
+
+    def _load_process_controller(self, controller_meta: ControllerMetadata) -> LoadedController:
+        public_metadata = build_public_controller_metadata(controller_meta).serialize()
+        worker = load_controller_workers().ProcessControllerWorker(controller_meta, self.vector_layout)
+        return LoadedController(
+            metadata=controller_meta,
+            public_metadata=public_metadata,
+            instance=cast(ControllerProtocol, worker),
+            snapshot_builder=ControllerSnapshotBuilder(self.bootstrap.plant, public_metadata),
+            process_worker=worker,
+        )
+
+    def _install_controllers(
+        self,
+        controllers: List[ControllerMetadata],
+        loaded: List[LoadedController],
+    ) -> None:
+        self._await_controller_groups()
+        kept = {id(controller.instance) for controller in loaded}
+        self._stop_loaded_controllers(
+            [controller for controller in self.controllers if id(controller.instance) not in kept]
+        )
+        self.bootstrap = RuntimeBootstrap(
+            driver=self.bootstrap.driver,
+            controllers=list(controllers),
+            plant=self.bootstrap.plant,
+            runtime=self.bootstrap.runtime,
+        )
+        self.controllers = loaded
+        self.controller_batches = build_controller_batches(loaded)
+        self.controller_groups = build_controller_groups(loaded, self.controller_batches)
+        control = self.bootstrap.runtime.control
+        if control.parallel_groups and len(self.controller_groups) > 1:
+            if self.controller_pool is None:
+                self.controller_pool = load_concurrent_futures().ThreadPoolExecutor(
+                    max_workers=control.max_workers,
+                    thread_name_prefix="controller-group",
+                )
+        else:
+            self._shutdown_controller_pool()
+        self.controllers_use_vectors = bool(self.controller_batches) or any(
+            controller.vector_binding is not None or controller.process_worker is not None
+            for controller in loaded
+        )
+        self.telemetry_schema_dirty = True
+
+    def describe_telemetry(self) -> Dict[str, Any]:
+        encoding = self.bootstrap.runtime.telemetry.encoding
+        descriptor: Dict[str, Any] = {"encoding": encoding}
+        if self.bootstrap.runtime.telemetry.display_rate_hz > 0:
+            descriptor["display_rate_hz"] = self.bootstrap.runtime.telemetry.display_rate_hz
+        if self.bootstrap.runtime.telemetry.transport == "ring":
+            ring = self._ensure_telemetry_ring(announce=False)
+            descriptor["transport"] = "ring"
+            descriptor["schema"] = ring.encoder.schema.serialize()
+            descriptor["ring"] = ring.describe()
+        elif encoding == "binary":
+            descriptor["schema"] = self._ensure_telemetry_encoder(announce=False).schema.serialize()
+        elif encoding == "delta":
+            descriptor["schema"] = self._ensure_delta_encoder(announce=False).describe()
+        return descriptor
+
+    def publish_telemetry(self, payload: Dict[str, Any]) -> None:
+        if self.bootstrap.runtime.telemetry.display_rate_hz > 0:
+            if self.telemetry_display is None:
+                self.telemetry_display = load_telemetry_transports().TelemetryDisplayDecimator(
+                    self.bootstrap.runtime.telemetry.display_rate_hz
+                )
+            display = self.telemetry_display.add(payload, time.monotonic())
+            if display is not None:
+                self.emit_event("telemetry_display", display)
+            if self.bootstrap.runtime.recorder.enabled:
+                return
+
+        if self.bootstrap.runtime.telemetry.transport == "ring":
+            ring = self._ensure_telemetry_ring(announce=True)
+            encode_started_at = time.monotonic()
+            ring.write(payload)
+            now = time.monotonic()
+            self._telemetry_publisher().record_metrics(
+                PublishMetrics(
+                    serialize_ms=(now - encode_started_at) * 1000.0,
+                    bytes_written=ring.encoder.record_size,
+                )
+            )
+            notify_s = self.bootstrap.runtime.telemetry.ring_notify_ms / 1000.0
+            if self.telemetry_ring_notified_at is None or now - self.telemetry_ring_notified_at >= notify_s:
+                self._notify_telemetry_head(now)
+            return
+
+        encoder: Optional[TelemetryEncoder] = None
+        if self.bootstrap.runtime.telemetry.encoding == "binary":
+            encoder = self._ensure_telemetry_encoder(announce=True)
+        elif self.bootstrap.runtime.telemetry.encoding == "delta":
+            encoder = self._ensure_delta_encoder(announce=True)
+        self._telemetry_publisher().publish(payload, encoder)
+
+    def record_telemetry(self, payload: Dict[str, Any]) -> None:
+        if not self.bootstrap.runtime.recorder.enabled:
+            return
+        recorder = self._ensure_telemetry_recorder()
+        if not recorder.record(payload):
+            self._warn_dropped_recorder_chunk(recorder)
+        self._report_recorder_failure(recorder)
+
+    def record_cycle_stats(self, payload: Dict[str, Any]) -> None:
+        interval_ms = self.bootstrap.runtime.stats.interval_ms
+        if interval_ms <= 0:
+            return
+        now = time.monotonic()
+        if self.cycle_profiler is None:
+            self.cycle_profiler = CycleProfiler(self.sample_time_ms)
+            self.stats_published_at = now
+        self.cycle_profiler.record(payload)
+        if self.stats_published_at is None or now - self.stats_published_at >= interval_ms / 1000.0:
+            self.publish_stats(now)
+
+    def publish_stats(self, now: float) -> None:
+        if self.cycle_profiler is None or self.cycle_profiler.first_cycle_id is None:
+            return
+        self.stats_published_at = now
+        self.emit_event("stats", self.cycle_profiler.snapshot())
+
+    def start_profile(self, duration_s: float, interval_ms: float) -> None:
+        if self.stack_sampler is not None:
+            self.emit_event("warning", {"message": "Já existe um perfil em andamento"})
+            return
+
+        file_labels: Dict[str, str] = {
+            str(Path(self.bootstrap.driver.plugin_dir) / self.bootstrap.driver.source_file): "driver",
+        }
+        instance_labels: Dict[int, str] = {}
+        for controller in self.controllers:
+            metadata = controller.metadata
+            label = f"controller:{metadata.id}"
+            file_labels.setdefault(str(Path(metadata.plugin_dir) / metadata.source_file), label)
+            instance_labels[id(controller.instance)] = label
+        sampler = load_profiler().start_stack_sampler(
+            Path(self.bootstrap.runtime.paths.runtime_dir) / f"profile-{self.plant_id}-{int(time.time())}.folded",
+            file_labels,
+            instance_labels,
+            duration_s,
+            interval_ms / 1000.0,
+        )
+        if sampler is None:
+            self.emit_event("warning", {"message": "Já existe um perfil em andamento neste processo"})
+            return
+        self.stack_sampler = sampler
+        self.emit_event(
+            "profile_started",
+            {"path": str(sampler.path), "duration_s": duration_s, "interval_ms": interval_ms},
+        )
+
+    def finish_profile(self, wait: bool = False) -> None:
+        if self.stack_sampler is not None:
+            sampler = self.stack_sampler
+            self.stack_sampler = None
+            sampler.stop()
+            self.finishing_profiles.append(sampler)
+        self._publish_finished_profiles(wait)
+
+    def _publish_finished_profiles(self, wait: bool) -> None:
+        pending: List[StackSampler] = []
+        for sampler in self.finishing_profiles:
+            summary = sampler.result(wait)
+            if summary is None:
+                pending.append(sampler)
+                continue
+            if sampler.failure is not None:
+                self._report_warning(sampler.failure)
+            self.emit_event("profile_finished", summary)
+        self.finishing_profiles = pending
+
+    def reset_stats(self) -> None:
+        if self.cycle_profiler is not None:
+            self.cycle_profiler.reset()
+        self.stats_published_at = time.monotonic()
+
+    def flush_telemetry(self) -> None:
+        if self.telemetry_recorder is not None:
+            if not self.telemetry_recorder.flush():
+                self._warn_dropped_recorder_chunk(self.telemetry_recorder)
+            self._report_recorder_failure(self.telemetry_recorder)
+        self._flush_telemetry_display()
+        if self.telemetry_ring is not None:
+            self._notify_telemetry_head(time.monotonic())
+        if self.telemetry_publisher is not None:
+            self.telemetry_publisher.flush()
+
+    def emit_event(self, msg_type: str, payload: Optional[Dict[str, Any]] = None) -> None:
+        self._telemetry_publisher().emit_event(msg_type, payload)
+
+    def _flush_telemetry_display(self) -> None:
+        if self.telemetry_display is None:
+            return
+        display = self.telemetry_display.take()
+        if display is not None:
+            self.emit_event("telemetry_display", display)
+
+    def _take_publish_metrics(self) -> PublishMetrics:
+        if self.telemetry_publisher is None:
+            return PublishMetrics()
+        return self.telemetry_publisher.take_metrics()
+
+    def controller_missed_deadlines(self) -> Dict[str, int]:
+        return {
+            controller.metadata.id: controller.process_worker.missed_deadlines
+            for controller in self.controllers
+            if controller.process_worker is not None
+        }
+
+    def dropped_telemetry_frames(self) -> int:
+        if self.telemetry_publisher is None:
+            return 0
+        return self.telemetry_publisher.dropped_frames
+
+    def _telemetry_publisher(self) -> TelemetryPublisher:
+        if self.telemetry_publisher is None:
+            self.telemetry_publisher = create_telemetry_publisher(self.bootstrap.runtime.telemetry)
+        return self.telemetry_publisher
+
+    def _close_telemetry_publisher(self) -> None:
+        if self.telemetry_publisher is None:
+            return
+        publisher = self.telemetry_publisher
+        self.telemetry_publisher = None
+        publisher.close()
+
+    def _ensure_telemetry_ring(self, announce: bool) -> TelemetryRingWriter:
+        encoder = self._ensure_telemetry_encoder(announce=False)
+        if self.telemetry_ring is not None and self.telemetry_ring.encoder is encoder:
+            return self.telemetry_ring
+
+        self._close_telemetry_ring(remove=True)
+        self.telemetry_ring = load_telemetry_transports().TelemetryRingWriter(
+            Path(self.bootstrap.runtime.paths.runtime_dir)
+            / f"telemetry-{self.plant_id}-{encoder.schema.schema_id}.ring",
+            encoder,
+            self.bootstrap.runtime.telemetry.ring_capacity,
+        )
+        if announce:
+            self.emit_event(
+                "telemetry_schema",
+                {**encoder.schema.serialize(), "ring": self.telemetry_ring.describe()},
+            )
+        return self.telemetry_ring
+
+    def _notify_telemetry_head(self, now: float) -> None:
+        if self.telemetry_ring is None:
+            return
+        self.telemetry_ring_notified_at = now
+        self.emit_event(
+            "telemetry_head",
+            {
+                "head": self.telemetry_ring.head,
+                "schema_id": self.telemetry_ring.encoder.schema.schema_id,
+            },
+        )
+
+    def _close_telemetry_ring(self, remove: bool = False) -> None:
+        if self.telemetry_ring is None:
+            return
+        ring = self.telemetry_ring
+        self.telemetry_ring = None
+        self.telemetry_ring_notified_at = None
+        failure = ring.close(remove=remove)
+        if failure is not None:
+            self._report_warning(failure)
+
+    def _ensure_telemetry_recorder(self) -> ColumnarRecorder:
+        encoder = self._ensure_telemetry_encoder(announce=False)
+        if self.telemetry_recorder is not None and self.telemetry_recorder.encoder is encoder:
+            return self.telemetry_recorder
+
+        self._close_telemetry_recorder()
+        self.telemetry_recorder = load_recorder().ColumnarRecorder(
+            Path(self.bootstrap.runtime.paths.runtime_dir)
+            / f"recording-{self.plant_id}-{encoder.schema.schema_id}.sncol",
+            encoder,
+            self.bootstrap.runtime.recorder,
+        )
+        self.emit_event(
+            "recording_started",
+            {
+                "path": str(self.telemetry_recorder.path),
+                "index_path": str(self.telemetry_recorder.index_path),
+                "schema_id": encoder.schema.schema_id,
+            },
+        )
+        return self.telemetry_recorder
+
+    def _warn_dropped_recorder_chunk(self, recorder: ColumnarRecorder) -> None:
+        self.emit_event(
+            "warning",
+            {
+                "message": (
+                    f"Gravação descartou um bloco de ciclos: fila do gravador cheia "
+                    f"({recorder.dropped_chunks} blocos descartados)"
+                )
+            },
+        )
+
+    def _close_telemetry_recorder(self) -> None:
+        if self.telemetry_recorder is None:
+            return
+        recorder = self.telemetry_recorder
+        self.telemetry_recorder = None
+        recorder.close()
+        self._report_recorder_failure(recorder)
+
+    def _report_recorder_failure(self, recorder: ColumnarRecorder) -> None:
+        failure = recorder.take_failure()
+        if failure is not None:
+            self._report_warning(failure)
+
+    def _ensure_delta_encoder(self, announce: bool) -> DeltaTelemetryEncoder:
+        schema = self._ensure_telemetry_encoder(announce=False).schema
+        if self.telemetry_delta_encoder is not None and self.telemetry_delta_encoder.schema is schema:
+            return self.telemetry_delta_encoder
+
+        self.telemetry_delta_encoder = load_telemetry_transports().DeltaTelemetryEncoder(
+            schema,
+            self.bootstrap.runtime.telemetry.keyframe_cycles,
+        )
+        if announce:
+            self.emit_event("telemetry_schema", self.telemetry_delta_encoder.describe())
+        return self.telemetry_delta_encoder
+
+    def _ensure_telemetry_encoder(self, announce: bool) -> BinaryTelemetryEncoder:
+        if self.telemetry_encoder is not None and not self.telemetry_schema_dirty:
+            return self.telemetry_encoder
+
+        previous = self.telemetry_encoder
+        schema = build_telemetry_schema(
+            self.bootstrap,
+            previous.schema.schema_id + 1 if previous is not None else 1,
+        )
+        self.telemetry_schema_dirty = False
+        if previous is not None and previous.schema.has_same_layout(schema):
+            return previous
+
+        self.telemetry_encoder = load_telemetry_transports().BinaryTelemetryEncoder(schema)
+        if announce:
+            self.emit_event("telemetry_schema", schema.serialize())
+        return self.telemetry_encoder
+
+    def pause(self) -> None:
+        self.flush_telemetry()
+        if not self.paused:
+            self.paused_started_at = time.monotonic()
+        self.paused = True
+        self.next_cycle_deadline = None
+        self.last_cycle_started_at = None
+
+    def resume(self) -> None:
+        if self.paused_started_at is not None:
+            paused_elapsed = max(0.0, time.monotonic() - self.paused_started_at)
+            self.paused_duration_s += paused_elapsed
+            if self.first_cycle_started_at is not None:
+                self.first_cycle_started_at += paused_elapsed
+            self.paused_started_at = None
+        self.paused = False
+        self.next_cycle_deadline = time.monotonic() + (self.sample_time_ms / 1000.0)
+        self.last_cycle_started_at = None
+        if self.driver_io is not None:
+            self.driver_io.invalidate()
+
+    def update_setpoints(self, setpoints: Dict[str, float]) -> None:
+        self.bootstrap.plant.apply_setpoints(setpoints)
+
+    def update_controllers(self, controllers: List[ControllerMetadata]) -> None:
+        if not self.running:
+            self.bootstrap = replace(self.bootstrap, controllers=list(controllers))
+            return
+        self._start_controller_reload(controllers)
+
+    def _start_controller_reload(
+        self,
+        controllers: List[ControllerMetadata],
+        rebuild: Collection[str] = (),
+    ) -> None:
+        self.controller_reload_version += 1
+        version = self.controller_reload_version
+        next_controllers = list(controllers)
+        plan = self._plan_controller_reload(next_controllers, rebuild)
+        thread = threading.Thread(
+            target=self._load_controllers_async,
+            args=(version, next_controllers, plan),
+            daemon=True,
+            name=f"controller-reload-{version}",
+        )
+        thread.start()
+
+    def request_shutdown(self) -> None:
+        self.should_exit = True
+        self.running = False
+
+    def next_wait_timeout(self) -> Optional[float]:
+        if self.should_exit:
+            return 0.0
+        deadline = self.next_wake_at()
+        if deadline is None:
+            return None
+        return max(0.0, deadline - time.monotonic())
+
+    def next_wake_at(self) -> Optional[float]:
+        deadlines = [
+            deadline
+            for deadline in (self.next_cycle_wake_at(), self.telemetry_flush_due_at())
+            if deadline is not None
+        ]
+        return min(deadlines) if deadlines else None
+
+    def next_cycle_wake_at(self) -> Optional[float]:
+        deadline = self.next_cycle_due_at()
+        if deadline is None:
+            return None
+        return deadline - self.bootstrap.runtime.timing.wake_margin_s
+
+    def telemetry_flush_due_at(self) -> Optional[float]:
+        if self.telemetry_publisher is None:
+            return None
+        return self.telemetry_publisher.flush_due_at()
+
+    def flush_expired_telemetry(self) -> None:
+        if self.telemetry_publisher is not None:
+            self.telemetry_publisher.flush_expired(time.monotonic())
+
+    def cycle_due(self) -> bool:
+        wake_at = self.next_cycle_wake_at()
+        return wake_at is not None and wake_at <= time.monotonic()
+
+    def next_cycle_due_at(self) -> Optional[float]:
+        if not self.running or self.paused:
+            return None
+        if self.next_cycle_deadline is None:
+            return time.monotonic()
+        return self.next_cycle_deadline
+
+    def run_cycle(self) -> None:
+        if not self.running or self.paused:
+            return
+
+        if self.next_cycle_deadline is None:
+            self.next_cycle_deadline = time.monotonic()
+
+        scheduled_at = self.next_cycle_deadline
+        wait_until_deadline(scheduled_at, self.bootstrap.runtime.timing)
+
+        cycle_started_at = time.monotonic()
+        start_jitter_ms = max(0.0, (cycle_started_at - scheduled_at) * 1000.0)
+        self.jitter_stats.record(start_jitter_ms)
+        self.cycle_id += 1
+        if self.first_cycle_started_at is None:
+            self.first_cycle_started_at = cycle_started_at
+        effective_dt_ms = self._resolve_effective_dt_ms(cycle_started_at)
+
+        sensors, actuators_read, durations, controller_outputs, written_outputs = self._execute_cycle(
+            cycle_started_at,
+            effective_dt_ms,
+        )
+
+        cycle_finished_at = time.monotonic()
+        cycle_duration_ms = (cycle_finished_at - cycle_started_at) * 1000.0
+
+        sample_step = self.sample_time_ms / 1000.0
+        planned_next_deadline = (self.next_cycle_deadline or cycle_started_at) + sample_step
+        late_by_ms = max(0.0, (cycle_finished_at - planned_next_deadline) * 1000.0)
+        cycle_late = late_by_ms > 0.0
+
+        publish_metrics = self._take_publish_metrics()
+        telemetry_payload = {
+            "timestamp": time.time(),
+            "cycle_id": self.cycle_id,
+            "configured_sample_time_ms": self.sample_time_ms,
+            "effective_dt_ms": effective_dt_ms,
+            "cycle_duration_ms": cycle_duration_ms,
+            "read_duration_ms": durations.read_duration_ms,
+            "control_duration_ms": durations.control_duration_ms,
+            "write_duration_ms": durations.write_duration_ms,
+            "publish_duration_ms": self.last_publish_duration_ms,
+            "publish_serialize_ms": publish_metrics.serialize_ms,
+            "publish_write_ms": publish_metrics.write_ms,
+            "publish_flush_ms": publish_metrics.flush_ms,
+            "publish_bytes": publish_metrics.bytes_written,
+            "cycle_late": cycle_late,
+            "late_by_ms": late_by_ms,
+            "phase": TELEMETRY_CYCLE_PHASE,
+            "uptime_s": self._resolve_uptime_s(cycle_started_at),
+            "sensors": sensors,
+            "actuators": written_outputs or actuators_read,
+            "actuators_read": actuators_read,
+            "setpoints": self.bootstrap.plant.setpoints,
+            "controller_outputs": controller_outputs,
+            "written_outputs": written_outputs,
+            "written_cycle_id": durations.written_cycle_id,
+            "controller_durations_ms": durations.controller_durations_ms,
+            "sensor_age_ms": durations.sensor_age_ms,
+            "dropped_telemetry_frames": self.dropped_telemetry_frames(),
+            "controller_missed_deadlines": self.controller_missed_deadlines(),
+            "start_jitter_ms": start_jitter_ms,
+            "jitter_mean_ms": self.jitter_stats.mean_ms,
+            "jitter_max_ms": self.jitter_stats.max_ms,
+            "jitter_std_ms": self.jitter_stats.std_ms,
+        }
+        publish_started_at = time.monotonic()
+        self.publish_telemetry(telemetry_payload)
+        self.record_telemetry(telemetry_payload)
+        self.last_publish_duration_ms = (time.monotonic() - publish_started_at) * 1000.0
+        self.record_cycle_stats(telemetry_payload)
+        if self.stack_sampler is not None and self.stack_sampler.expired(time.monotonic()):
+            self.finish_profile()
+        elif self.finishing_profiles:
+            self._publish_finished_profiles(wait=False)
+
+        if cycle_late:
+            self.emit_event(
+                "cycle_overrun",
+                {
+                    "cycle_id": self.cycle_id,
+                    "configured_sample_time_ms": self.sample_time_ms,
+                    "cycle_duration_ms": cycle_duration_ms,
+                    "late_by_ms": late_by_ms,
+                    "phase": TELEMETRY_CYCLE_PHASE,
+                },
+            )
+
+        self.next_cycle_deadline = planned_next_deadline
+        while self.next_cycle_deadline < time.monotonic():
+            self.next_cycle_deadline += sample_step
+
+        self.last_cycle_started_at = cycle_started_at
+
+    def _execute_cycle(
+        self,
+        cycle_started_at: float,
+        effective_dt_ms: float,
+    ) -> tuple[SensorPayload, ActuatorPayload, CycleDurations, ControllerOutputPayload, ActuatorPayload]:
+        sensors: SensorPayload = {}
+        actuators_read: ActuatorPayload = {}
+        controller_outputs: ControllerOutputPayload = {}
+        written_outputs: ActuatorPayload = {}
+        written_cycle_id: Optional[int] = None
+        controller_durations: Dict[str, float] = {}
+
+        read_started_at = time.monotonic()
+        sensor_age_ms: Optional[float] = 0.0
+        if self.driver_io is not None:
+            sample = self.driver_io.take_sample(self.sample_time_ms / 1000.0)
+            self.driver_io.request_read()
+            for message in self.driver_io.drain_failures():
+                self._report_warning(message)
+            if sample is None:
+                sensor_age_ms = None
+            else:
+                sensors, actuators_read = sample.sensors, sample.actuators
+                sensor_age_ms = max(0.0, (read_started_at - sample.completed_at) * 1000.0)
+        else:
+            sensors, actuators_read = self._read_driver()
+        read_duration_ms = (time.monotonic() - read_started_at) * 1000.0
+
+        control_started_at = time.monotonic()
+        sensor_vector = array("d")
+        actuator_vector = array("d")
+        if self.controllers_use_vectors:
+            sensor_vector = self.vector_layout.pack_sensors(sensors)
+            actuator_vector = self.vector_layout.pack_actuators(actuators_read)
+        process_submissions = self._submit_process_controllers(
+            cycle_started_at,
+            effective_dt_ms,
+            sensor_vector,
+            actuator_vector,
+        )
+        if self.controller_pool is not None:
+            self._execute_controller_groups_in_parallel(
+                self.controller_pool,
+                control_started_at,
+                cycle_started_at,
+                effective_dt_ms,
+                sensors,
+                actuators_read,
+                sensor_vector,
+                actuator_vector,
+                controller_outputs,
+                controller_durations,
+            )
+        else:
+            self._execute_controller_group(
+                self.controllers,
+                self.cycle_id,
+                cycle_started_at,
+                effective_dt_ms,
+                sensors,
+                actuators_read,
+                sensor_vector,
+                actuator_vector,
+                controller_outputs,
+                controller_durations,
+                self._report_warning,
+            )
+        self._collect_process_controllers(process_submissions, controller_outputs, controller_durations)
+        control_duration_ms = (time.monotonic() - control_started_at) * 1000.0
+
+        write_started_at = time.monotonic()
+        if self.driver_io is not None:
+            written_cycle_id, written_outputs = self.driver_io.take_acknowledged_write()
+            if controller_outputs:
+                self.driver_io.submit_write(self.cycle_id, controller_outputs)
+        elif controller_outputs and self.driver_instance is not None:
+            try:
+                write_status = self.driver_instance.write(dict(controller_outputs))
+                coerce_optional_bool(
+                    "write",
+                    write_status,
+                    "Driver retornou False em write(outputs)",
+                    self._report_warning,
+                )
+                written_outputs = dict(controller_outputs)
+                written_cycle_id = self.cycle_id
+            except Exception as exc:  # noqa: BLE001
+                log_error(traceback.format_exc())
+                self.emit_event("warning", {"message": f"Falha em escrita de driver: {exc}"})
+        write_duration_ms = (time.monotonic() - write_started_at) * 1000.0
+
+        return (
+            sensors,
+            actuators_read,
+            CycleDurations(
+                read_duration_ms=read_duration_ms,
+                control_duration_ms=control_duration_ms,
+                write_duration_ms=write_duration_ms,
+                controller_durations_ms=controller_durations,
+                sensor_age_ms=sensor_age_ms,
+                written_cycle_id=written_cycle_id,
+            ),
+            controller_outputs,
+            written_outputs,
+        )
+
+    def _execute_controller_group(
+        self,
+        controllers: List[LoadedController],
+        cycle_id: int,
+        cycle_started_at: float,
+        effective_dt_ms: float,
+        sensors: SensorPayload,
+        actuators_read: ActuatorPayload,
+        sensor_vector: array,
+        actuator_vector: array,
+        controller_outputs: Dict[str, float],
+        controller_durations: Dict[str, float],
+        report_warning: Callable[[str], None],
+    ) -> None:
+        executed_batches: set[int] = set()
+        for controller in controllers:
+            if controller.process_worker is not None:
+                continue
+
+            batch_group = self.controller_batches.get(controller.metadata.id)
+            if batch_group is not None:
+                if id(batch_group) not in executed_batches:
+                    executed_batches.add(id(batch_group))
+                    self._execute_controller_batch(
+                        batch_group,
+                        cycle_id,
+                        cycle_started_at,
+                        effective_dt_ms,
+                        sensor_vector,
+                        actuator_vector,
+                        controller_outputs,
+                        controller_durations,
+                        report_warning,
+                    )
+                continue
+
+            compute_started_at = time.monotonic()
+            try:
+                if controller.vector_binding is not None:
+                    vector_snapshot = controller.vector_binding.build(
+                        cycle_id=cycle_id,
+                        cycle_started_at=cycle_started_at,
+                        dt_ms=effective_dt_ms,
+                        sensors=sensor_vector,
+                        actuators=actuator_vector,
+                    )
+                    outputs = normalize_controller_output_vector(
+                        getattr(controller.instance, CONTROLLER_VECTOR_COMPUTE_METHOD)(vector_snapshot),
+                        controller.vector_binding.output_variable_ids,
+                        controller.metadata.name,
+                    )
+                else:
+                    snapshot = controller.snapshot_builder.build(
+                        cycle_id=cycle_id,
+                        cycle_started_at=cycle_started_at,
+                        dt_ms=effective_dt_ms,
+                        sensors=sensors,
+                        actuators=actuators_read,
+                    )
+                    outputs = normalize_controller_outputs(
+                        controller.instance.compute(snapshot),
+                        controller.metadata.output_variable_ids,
+                        controller.metadata.name,
+                    )
+                merge_controller_outputs(controller_outputs, outputs)
+            except Exception as exc:  # noqa: BLE001
+                log_error(traceback.format_exc())
+                report_warning(f"Falha no controlador '{controller.metadata.name}': {exc}")
+            finally:
+                controller_durations[controller.metadata.id] = (
+                    time.monotonic() - compute_started_at
+                ) * 1000.0
+
+    def _run_controller_group(
+        self,
+        controllers: List[LoadedController],
+        cycle_id: int,
+        cycle_started_at: float,
+        effective_dt_ms: float,
+        sensors: SensorPayload,
+        actuators_read: ActuatorPayload,
+        sensor_vector: array,
+        actuator_vector: array,
+    ) -> tuple[Dict[str, float], Dict[str, float], List[str]]:
+        outputs: Dict[str, float] = {}
+        durations: Dict[str, float] = {}
+        warnings: List[str] = []
+        self._execute_controller_group(
+            controllers,
+            cycle_id,
+            cycle_started_at,
+            effective_dt_ms,
+            sensors,
+            actuators_read,
+            sensor_vector,
+            actuator_vector,
+            outputs,
+            durations,
+            warnings.append,
+        )
+        return outputs, durations, warnings
+
+    def _execute_controller_groups_in_parallel(
+        self,
+        pool: concurrent.futures.ThreadPoolExecutor,
+        control_started_at: float,
+        cycle_started_at: float,
+        effective_dt_ms: float,
+        sensors: SensorPayload,
+        actuators_read: ActuatorPayload,
+        sensor_vector: array,
+        actuator_vector: array,
+        controller_outputs: Dict[str, float],
+        controller_durations: Dict[str, float],
+    ) -> None:
+        submitted: Dict[int, concurrent.futures.Future[Any]] = {}
+        for index, group in enumerate(self.controller_groups):
+            pending = self.controller_group_futures.get(index)
+            if pending is not None and not pending.done():
+                continue
+            if pending is not None and index in self.late_controller_groups:
+                self._collect_late_controller_group(pending)
+            future = pool.submit(
+                copy_protocol_context(),
+                self._run_controller_group,
+                group,
+                self.cycle_id,
+                cycle_started_at,
+                effective_dt_ms,
+                sensors,
+                actuators_read,
+                sensor_vector,
+                actuator_vector,
+            )
+            self.controller_group_futures[index] = future
+            submitted[index] = future
+
+        join_deadline_s = self.bootstrap.runtime.control.join_deadline_ms / 1000.0 or (
+            self.sample_time_ms / 1000.0 * CONTROL_DEFAULT_DEADLINE_FRACTION
+        )
+        load_concurrent_futures().wait(
+            submitted.values(),
+            timeout=max(0.0, control_started_at + join_deadline_s - time.monotonic()),
+        )
+        for index, group in enumerate(self.controller_groups):
+            future = submitted.get(index)
+            if future is None or not future.done():
+                if index not in self.late_controller_groups:
+                    self.late_controller_groups.add(index)
+                    names = ", ".join(f"'{controller.metadata.name}'" for controller in group)
+                    self.emit_event(
+                        "warning",
+                        {"message": f"Grupo de controladores {names} excedeu o prazo do ciclo; saídas omitidas"},
+                    )
+                continue
+
+            self.late_controller_groups.discard(index)
+            try:
+                group_outputs, group_durations, warnings = future.result()
+                controller_durations.update(group_durations)
+                for message in warnings:
+                    self._report_warning(message)
+                merge_controller_outputs(controller_outputs, group_outputs)
+            except Exception as exc:  # noqa: BLE001
+                log_error(traceback.format_exc())
+                self._report_warning(f"Falha no grupo de controladores: {exc}")
+
+    def _collect_late_controller_group(self, future: concurrent.futures.Future[Any]) -> None:
+        try:
+            _outputs, _durations, warnings = future.result()
+        except Exception as exc:  # noqa: BLE001
+            log_error(traceback.format_exc())
+            self._report_warning(f"Falha no grupo de controladores: {exc}")
+            return
+        for message in warnings:
+            self._report_warning(message)
+
+    def _report_warning(self, message: str) -> None:
+        self.emit_event("warning", {"message": message})
+
+    def _await_controller_groups(self) -> None:
+        pending = [future for future in self.controller_group_futures.values() if not future.done()]
+        if pending:
+            load_concurrent_futures().wait(pending, timeout=CONTROLLER_WORKER_JOIN_TIMEOUT_S)
+        self.controller_group_futures = {}
+        self.late_controller_groups = set()
+
+    def _shutdown_controller_pool(self) -> None:
+        self._await_controller_groups()
+        if self.controller_pool is not None:
+            self.controller_pool.shutdown(wait=False, cancel_futures=True)
+            self.controller_pool = None
+
+    def _execute_controller_batch(
+        self,
+        group: ControllerBatchGroup,
+        cycle_id: int,
+        cycle_started_at: float,
+        effective_dt_ms: float,
+        sensor_vector: array,
+        actuator_vector: array,
+        controller_outputs: Dict[str, float],
+        controller_durations: Dict[str, float],
+        report_warning: Callable[[str], None],
+    ) -> None:
+        numpy = load_numpy()
+        members = group.members
+        bindings = [cast(VectorControllerBinding, member.batch_binding) for member in members]
+        compute_started_at = time.monotonic()
+        try:
+            batch = ControllerBatch(
+                cycle_id=cycle_id,
+                timestamp=cycle_started_at,
+                dt_s=max(0.0, effective_dt_ms / 1000.0),
+                controllers=[member.instance for member in members],
+                controller_ids=[member.metadata.id for member in members],
+                sensors=numpy.frombuffer(sensor_vector, dtype=numpy.float64),
+                actuators=numpy.frombuffer(actuator_vector, dtype=numpy.float64),
+                inputs=numpy.array(
+                    [binding.gather_inputs(sensor_vector, actuator_vector) for binding in bindings],
+                    dtype=numpy.float64,
+                ),
+                setpoints=numpy.array(
+                    [binding.input_setpoints() for binding in bindings],
+                    dtype=numpy.float64,
+                ),
+            )
+            raw_outputs = getattr(members[0].instance, CONTROLLER_BATCH_COMPUTE_METHOD)(batch)
+            if len(raw_outputs) != len(members):
+                raise RuntimeError(
+                    f"compute_batch() deve retornar {len(members)} linhas, recebeu {len(raw_outputs)}"
+                )
+            for member, binding, row in zip(members, bindings, raw_outputs):
+                merge_controller_outputs(
+                    controller_outputs,
+                    normalize_controller_output_vector(
+                        row,
+                        binding.output_variable_ids,
+                        member.metadata.name,
+                    ),
+                )
+        except Exception as exc:  # noqa: BLE001
+            log_error(traceback.format_exc())
+            names = ", ".join(f"'{member.metadata.name}'" for member in members)
+            report_warning(f"Falha no lote de controladores {names}: {exc}")
+        finally:
+            share_ms = (time.monotonic() - compute_started_at) * 1000.0 / len(members)
+            for member in members:
+                controller_durations[member.metadata.id] = share_ms
+
+    def _read_driver(self) -> tuple[SensorPayload, ActuatorPayload]:
+        try:
+            if self.driver_instance is not None and self.driver_reads_vectors:
+                return normalize_read_vector(
+                    getattr(self.driver_instance, DRIVER_VECTOR_READ_METHOD)(),
+                    self.vector_layout,
+                )
+            if self.driver_instance is not None:
+                return normalize_read_snapshot(
+                    self.driver_instance.read(),
+                    self.bootstrap.plant,
+                )
+        except Exception as exc:  # noqa: BLE001
+            log_error(traceback.format_exc())
+            self.emit_event("warning", {"message": f"Falha em leitura de driver: {exc}"})
+        return {}, {}
+
+    def _submit_process_controllers(
+        self,
+        cycle_started_at: float,
+        effective_dt_ms: float,
+        sensor_vector: array,
+        actuator_vector: array,
+    ) -> Dict[str, Optional[float]]:
+        submissions: Dict[str, Optional[float]] = {}
+        for controller in self.controllers:
+            worker = controller.process_worker
+            if worker is None:
+                continue
+            try:
+                submitted = worker.submit(
+                    self.cycle_id,
+                    cycle_started_at,
+                    effective_dt_ms,
+                    sensor_vector,
+                    actuator_vector,
+                )
+                submissions[controller.metadata.id] = time.monotonic() if submitted else None
+            except Exception as exc:  # noqa: BLE001
+                log_error(traceback.format_exc())
+                self.emit_event(
+                    "warning",
+                    {"message": f"Falha no controlador '{controller.metadata.name}': {exc}"},
+                )
+        return submissions
+
+    def _collect_process_controllers(
+        self,
+        submissions: Dict[str, Optional[float]],
+        controller_outputs: Dict[str, float],
+        controller_durations: Dict[str, float],
+    ) -> None:
+        for controller in self.controllers:
+            worker = controller.process_worker
+            if worker is None or controller.metadata.id not in submissions:
+                continue
+
+            submitted_at = submissions[controller.metadata.id]
+            collect_started_at = time.monotonic()
+            try:
+                outputs = None
+                if submitted_at is not None:
+                    deadline_s = worker.deadline_s or (
+                        self.sample_time_ms / 1000.0 * CONTROL_DEFAULT_DEADLINE_FRACTION
+                    )
+                    outputs = worker.collect(submitted_at + deadline_s)
+                if outputs is None:
+                    outputs = worker.fallback_outputs()
+                    worker.missed_deadlines += 1
+                    if not worker.missing_deadline:
+                        self.emit_event(
+                            "warning",
+                            {
+                                "message": (
+                                    f"Controlador '{controller.metadata.name}' excedeu o prazo de cálculo; "
+                                    f"aplicando fallback '{controller.metadata.execution.fallback}' "
+                                    f"({worker.missed_deadlines} prazos perdidos)"
+                                ),
+                                "controller_id": controller.metadata.id,
+                                "missed_deadlines": worker.missed_deadlines,
+                            },
+                        )
+                    worker.missing_deadline = True
+                else:
+                    worker.missing_deadline = False
+                merge_controller_outputs(controller_outputs, outputs)
+            except Exception as exc:  # noqa: BLE001
+                log_error(traceback.format_exc())
+                self.emit_event(
+                    "warning",
+                    {"message": f"Falha no controlador '{controller.metadata.name}': {exc}"},
+                )
+            finally:
+                controller_durations[controller.metadata.id] = (
+                    time.monotonic() - (submitted_at or collect_started_at)
+                ) * 1000.0
+
+    def _resolve_effective_dt_ms(self, cycle_started_at: float) -> float:
+        if self.last_cycle_started_at is None:
+            return float(self.sample_time_ms)
+        return max(0.0, (cycle_started_at - self.last_cycle_started_at) * 1000.0)
+
+    def _resolve_uptime_s(self, cycle_started_at: float) -> float:
+        if self.cycle_id == 1:
+            return 0.0
+        first_cycle_started_at = self.first_cycle_started_at or cycle_started_at
+        return max(0.0, cycle_started_at - first_cycle_started_at)
+
+    def stop(self) -> None:
+        self._clear_pending_controller_reload_results()
+        self.finish_profile(wait=True)
+        self.publish_stats(time.monotonic())
+        self._flush_telemetry_display()
+        if self.telemetry_ring is not None:
+            self._notify_telemetry_head(time.monotonic())
+            self._close_telemetry_ring(remove=True)
+        self._close_telemetry_recorder()
+        self._close_telemetry_publisher()
+        self._shutdown_controller_pool()
+        self._close_driver_io()
+        for controller in self.controllers:
+            maybe_call_optional_stop(controller.instance, controller.metadata.name)
+        self.controllers = []
+        if self.driver_instance is not None:
+            try:
+                stopped = coerce_required_bool("stop", self.driver_instance.stop())
+                if not stopped:
+                    emit("warning", {"message": "Driver retornou False em stop()"})
+            except Exception as exc:  # noqa: BLE001
+                log_error(f"Falha ao finalizar driver: {exc}")
+
+    def apply_pending_controller_reload(self) -> None:
+        while True:
+            try:
+                result = self.controller_reload_results.get_nowait()
+            except queue.Empty:
+                break
+
+            if result.version != self.controller_reload_version:
+                if result.loaded is not None:
+                    self._stop_loaded_controllers(result.loaded)
+                continue
+
+            if result.error is not None:
+                self.emit_event("error", {"message": f"Falha ao atualizar controladores: {result.error}"})
+                continue
+
+            loaded, rebuild = self._apply_controller_reload_plan(result.plan, result.loaded or [])
+            self._install_controllers(result.controllers, loaded)
+            if rebuild:
+                self._start_controller_reload(result.controllers, rebuild)
+
+    def _plan_controller_reload(
+        self,
+        controllers: List[ControllerMetadata],
+        rebuild: Collection[str] = (),
+    ) -> List[ControllerReloadPlan]:
+        installed = {controller.metadata.id: controller for controller in self.controllers}
+        plan: List[ControllerReloadPlan] = []
+        for controller_meta in controllers:
+            current = installed.pop(controller_meta.id, None)
+            if current is None or controller_meta.id in rebuild:
+                plan.append(ControllerReloadPlan(metadata=controller_meta))
+            elif current.metadata == controller_meta:
+                plan.append(ControllerReloadPlan(metadata=controller_meta, current=current))
+            elif (
+                current.process_worker is None
+                and callable(getattr(current.instance, CONTROLLER_PARAMS_CHANGED_METHOD, None))
+                and replace(controller_meta, params=current.metadata.params) == current.metadata
+            ):
+                plan.append(
+                    ControllerReloadPlan(metadata=controller_meta, current=current, params_only=True)
+                )
+            else:
+                plan.append(ControllerReloadPlan(metadata=controller_meta))
+        return plan
+
+    def _apply_controller_reload_plan(
+        self,
+        plan: List[ControllerReloadPlan],
+        fresh: List[LoadedController],
+    ) -> tuple[List[LoadedController], List[str]]:
+        if any(item.params_only for item in plan):
+            self._await_controller_groups()
+        pending = iter(fresh)
+        loaded: List[LoadedController] = []
+        failed: List[str] = []
+        for item in plan:
+            if item.current is None:
+                loaded.append(next(pending))
+            elif item.params_only:
+                updated = self._update_controller_params(item.current, item.metadata)
+                if updated is None:
+                    failed.append(item.metadata.id)
+                    loaded.append(item.current)
+                else:
+                    loaded.append(updated)
+            else:
+                loaded.append(item.current)
+        return loaded, failed
+
+    def _update_controller_params(
+        self,
+        current: LoadedController,
+        controller_meta: ControllerMetadata,
+    ) -> Optional[LoadedController]:
+        public_metadata = build_public_controller_metadata(controller_meta).serialize()
+        try:
+            on_params_changed = getattr(current.instance, CONTROLLER_PARAMS_CHANGED_METHOD)
+            on_params_changed(serialize_controller_params(controller_meta.params))
+        except Exception as exc:  # noqa: BLE001
+            log_exception(exc)
+            self.emit_event(
+                "warning",
+                {
+                    "message": (
+                        f"Controlador '{controller_meta.name}' falhou em {CONTROLLER_PARAMS_CHANGED_METHOD}(); "
+                        f"recarregando instância: {format_exception_message(exc)}"
+                    )
+                },
+            )
+            return None
+        if current.context is not None:
+            current.context.controller.params.clear()
+            current.context.controller.params.update(clone_controller_params(controller_meta.params))
+        return replace(
+            current,
+            metadata=controller_meta,
+            public_metadata=public_metadata,
+            snapshot_builder=ControllerSnapshotBuilder(
+                self.bootstrap.plant,
+                public_metadata,
+                read_only=current.snapshot_builder.read_only,
+            ),
+        )
+
+    def _load_controllers_async(
+        self,
+        version: int,
+        controllers: List[ControllerMetadata],
+        plan: List[ControllerReloadPlan],
+    ) -> None:
+        try:
+            self._ensure_driver_write_support(controllers)
+            loaded = self._load_controllers([item.metadata for item in plan if item.current is None])
+            self.controller_reload_results.put(
+                ControllerReloadResult(
+                    version=version,
+                    controllers=list(controllers),
+                    plan=plan,
+                    loaded=loaded,
+                )
+            )
+        except Exception as exc:  # noqa: BLE001
+            log_exception(exc)
+            self.controller_reload_results.put(
+                ControllerReloadResult(
+                    version=version,
+                    controllers=list(controllers),
+                    error=format_exception_message(exc),
+                )
+            )
+        finally:
+            if self.controller_reload_listener is not None:
+                self.controller_reload_listener()
+
+
+def wait_until_deadline(deadline: float, timing: RuntimeTiming) -> None:
+    now = time.monotonic()
+    if now >= deadline:
+        return
+    if timing.strategy != "hybrid":
+        time.sleep(deadline - now)
+        return
+
+    coarse_sleep_s = deadline - now - timing.wake_margin_s
+    if coarse_sleep_s > 0.0:
+        time.sleep(coarse_sleep_s)
+    while time.monotonic() < deadline:
+        time.sleep(0)
+
+
+def expect_dict(raw_value: Any, context: str) -> JsonObject:
+    if not isinstance(raw_value, dict):
+        raise RuntimeError(f"{context} deve ser um objeto JSON")
+    return cast(JsonObject, raw_value)
+
+
+def normalize_string(raw_value: Any, context: str) -> str:
+    if not isinstance(raw_value, str) or not raw_value.strip():
+        raise RuntimeError(f"{context} deve ser uma string não vazia")
+    return raw_value.strip()
+
+
+def normalize_non_negative_int(raw_value: Any, context: str, default: int = 0) -> int:
+    if raw_value is None:
+        return default
+    resolved = int(raw_value)
+    if resolved < 0:
+        raise RuntimeError(f"{context} não pode ser negativo")
+    return resolved
+
+
+def normalize_non_negative_float(raw_value: Any, context: str, default: float = 0.0) -> float:
+    if raw_value is None:
+        return default
+    resolved = float(raw_value)
+    if not math.isfinite(resolved) or resolved < 0.0:
+        raise RuntimeError(f"{context} deve ser um número finito não negativo")
+    return resolved
+
+
+def normalize_positive_float(raw_value: Any, context: str, default: float) -> float:
+    resolved = normalize_non_negative_float(raw_value, context, default)
+    if resolved <= 0.0:
+        raise RuntimeError(f"{context} deve ser maior que zero")
+    return resolved
+
+
+def normalize_positive_int(raw_value: Any, context: str, default: int = 1) -> int:
+    resolved = normalize_non_negative_int(raw_value, context, default)
+    if resolved <= 0:
+        raise RuntimeError(f"{context} deve ser maior que zero")
+    return resolved
+
+
+def normalize_choice(raw_value: Any, context: str, choices: tuple[str, ...]) -> str:
+    if raw_value is None:
+        return choices[0]
+    resolved = str(raw_value).strip()
+    if resolved not in choices:
+        raise RuntimeError(f"{context} deve ser um de: {', '.join(choices)}")
+    return resolved
+
+
+def normalize_string_list(raw_value: Any, context: str) -> List[str]:
+    if raw_value is None:
+        return []
+    if not isinstance(raw_value, list):
+        raise RuntimeError(f"{context} deve ser um array")
+    return [str(value) for value in raw_value]
+
+
+def normalize_json_map(raw_value: Any, context: str) -> Dict[str, JSONValue]:
+    if raw_value is None:
+        return {}
+    if not isinstance(raw_value, dict):
+        raise RuntimeError(f"{context} deve ser um objeto JSON")
+    return {str(key): cast(JSONValue, value) for key, value in raw_value.items()}
+
+
+def normalize_float_map(
+    raw_value: Any,
+    context: str,
+    allowed_keys: Optional[set[str]] = None,
+) -> Dict[str, float]:
+    if raw_value is None:
+        return {}
+    if not isinstance(raw_value, dict):
+        raise RuntimeError(f"{context} deve ser um objeto JSON")
+
+    normalized: Dict[str, float] = {}
+    for key, value in raw_value.items():
+        key_str = str(key)
+        if allowed_keys is not None and key_str not in allowed_keys:
+            continue
+        try:
+            numeric_value = float(value)
+        except Exception as exc:  # noqa: BLE001
+            raise RuntimeError(f"{context}.{key_str} deve ser numérico") from exc
+        if numeric_value != numeric_value or numeric_value in (float("inf"), float("-inf")):
+            raise RuntimeError(f"{context}.{key_str} deve ser finito")
+        normalized[key_str] = numeric_value
+    return normalized
+
+
+def normalize_variable(raw_value: Any, context: str) -> VariableSpec:
+    raw = expect_dict(raw_value, context)
+    linked_sensor_ids_raw = raw.get("linked_sensor_ids")
+    linked_sensor_ids = (
+        normalize_string_list(linked_sensor_ids_raw, f"{context}.linked_sensor_ids")
+        if linked_sensor_ids_raw is not None
+        else []
+    )
+    return VariableSpec(
+        id=normalize_string(raw.get("id"), f"{context}.id"),
+        name=normalize_string(raw.get("name"), f"{context}.name"),
+        type=normalize_string(raw.get("type"), f"{context}.type"),
+        unit=normalize_string(raw.get("unit"), f"{context}.unit"),
+        setpoint=float(raw.get("setpoint", 0.0) or 0.0),
+        pv_min=float(raw.get("pv_min", 0.0) or 0.0),
+        pv_max=float(raw.get("pv_max", 0.0) or 0.0),
+        linked_sensor_ids=linked_sensor_ids,
+    )
+
+
+def normalize_variable_list(raw_value: Any, context: str) -> List[VariableSpec]:
+    if raw_value is None:
+        return []
+    if not isinstance(raw_value, list):
+        raise RuntimeError(f"{context} deve ser um array")
+    return [
+        normalize_variable(item, f"{context}[{index}]")
+        for index, item in enumerate(raw_value)
+    ]
+
+
+def normalize_variable_map(raw_value: Any, context: str) -> Dict[str, VariableSpec]:
+    if raw_value is None:
+        return {}
+    if not isinstance(raw_value, dict):
+        raise RuntimeError(f"{context} deve ser um objeto JSON")
+
+    normalized: Dict[str, VariableSpec] = {}
+    for key, value in raw_value.items():
+        variable = normalize_variable(value, f"{context}.{key}")
+        normalized[variable.id] = variable
+    return normalized
+
+
+def build_variable_map(variables: List[VariableSpec]) -> Dict[str, VariableSpec]:
+    return {variable.id: variable for variable in variables}
+
+
+def normalize_io_group(raw_value: Any, context: str) -> IOGroup:
+    raw = expect_dict(raw_value, context)
+    variables = normalize_variable_list(raw.get("variables"), f"{context}.variables")
+    variables_by_id = normalize_variable_map(raw.get("variables_by_id"), f"{context}.variables_by_id")
+    if not variables_by_id:
+        variables_by_id = build_variable_map(variables)
+    if not variables:
+        variables = list(variables_by_id.values())
+
+    ids = normalize_string_list(raw.get("ids"), f"{context}.ids")
+    if not ids:
+        ids = [variable.id for variable in variables]
+
+    count = normalize_non_negative_int(raw.get("count"), f"{context}.count", len(ids))
+    return IOGroup(ids=ids, count=count, variables=variables, variables_by_id=variables_by_id)
+
+
+def normalize_plant_context(raw_value: Any) -> PlantContext:
+    raw = expect_dict(raw_value, "bootstrap.plant")
+    variables = normalize_variable_list(raw.get("variables"), "bootstrap.plant.variables")
+    if not variables:
+        raise RuntimeError("bootstrap.plant.variables deve conter pelo menos uma variável")
+    variables_by_id = build_variable_map(variables)
+    sensor_ids = normalize_string_list(raw.get("sensor_ids"), "bootstrap.plant.sensor_ids")
+    actuator_ids = normalize_string_list(raw.get("actuator_ids"), "bootstrap.plant.actuator_ids")
+    if not sensor_ids:
+        sensor_ids = [variable.id for variable in variables if variable.type == "sensor"]
+    if not actuator_ids:
+        actuator_ids = [variable.id for variable in variables if variable.type == "atuador"]
+
+    sensor_variables = [variables_by_id[variable_id] for variable_id in sensor_ids if variable_id in variables_by_id]
+    actuator_variables = [
+        variables_by_id[variable_id] for variable_id in actuator_ids if variable_id in variables_by_id
+    ]
+
+    return PlantContext(
+        id=normalize_string(raw.get("id"), "bootstrap.plant.id"),
+        name=normalize_string(raw.get("name"), "bootstrap.plant.name"),
+        variables=variables,
+        variables_by_id=variables_by_id,
+        sensors=IOGroup(
+            ids=sensor_ids,
+            count=len(sensor_variables),
+            variables=sensor_variables,
+            variables_by_id=build_variable_map(sensor_variables),
+        ),
+        actuators=IOGroup(
+            ids=actuator_ids,
+            count=len(actuator_variables),
+            variables=actuator_variables,
+            variables_by_id=build_variable_map(actuator_variables),
+        ),
+        setpoints=normalize_float_map(raw.get("setpoints"), "bootstrap.plant.setpoints"),
+    )
+
+
+def normalize_timing_strategy(raw_value: Any) -> str:
+    strategy = normalize_string(raw_value, "bootstrap.runtime.timing.strategy")
+    if strategy not in TIMING_STRATEGIES:
+        raise RuntimeError(
+            f"bootstrap.runtime.timing.strategy deve ser um de: {', '.join(TIMING_STRATEGIES)}"
+        )
+    return strategy
+
+
+def normalize_runtime_telemetry(raw_value: Any) -> RuntimeTelemetry:
+    if raw_value is None:
+        return RuntimeTelemetry()
+    raw = expect_dict(raw_value, "bootstrap.runtime.telemetry")
+    telemetry = RuntimeTelemetry(
+        encoding=normalize_choice(
+            raw.get("encoding"),
+            "bootstrap.runtime.telemetry.encoding",
+            TELEMETRY_ENCODINGS,
+        ),
+        batch_max_cycles=normalize_positive_int(
+            raw.get("batch_max_cycles"),
+            "bootstrap.runtime.telemetry.batch_max_cycles",
+            1,
+        ),
+        batch_window_ms=normalize_non_negative_int(
+            raw.get("batch_window_ms"),
+            "bootstrap.runtime.telemetry.batch_window_ms",
+            0,
+        ),
+        publisher=normalize_choice(
+            raw.get("publisher"),
+            "bootstrap.runtime.telemetry.publisher",
+            TELEMETRY_PUBLISHERS,
+        ),
+        queue_size=normalize_positive_int(
+            raw.get("queue_size"),
+            "bootstrap.runtime.telemetry.queue_size",
+            256,
+        ),
+        overflow_policy=normalize_choice(
+            raw.get("overflow_policy"),
+            "bootstrap.runtime.telemetry.overflow_policy",
+            TELEMETRY_OVERFLOW_POLICIES,
+        ),
+        transport=normalize_choice(
+            raw.get("transport"),
+            "bootstrap.runtime.telemetry.transport",
+            TELEMETRY_TRANSPORTS,
+        ),
+        ring_capacity=normalize_positive_int(
+            raw.get("ring_capacity"),
+            "bootstrap.runtime.telemetry.ring_capacity",
+            4096,
+        ),
+        ring_notify_ms=normalize_non_negative_int(
+            raw.get("ring_notify_ms"),
+            "bootstrap.runtime.telemetry.ring_notify_ms",
+            100,
+        ),
+        display_rate_hz=normalize_non_negative_float(
+            raw.get("display_rate_hz"),
+            "bootstrap.runtime.telemetry.display_rate_hz",
+        ),
+        keyframe_cycles=normalize_positive_int(
+            raw.get("keyframe_cycles"),
+            "bootstrap.runtime.telemetry.keyframe_cycles",
+            100,
+        ),
+    )
+    if telemetry.encoding == "delta" and telemetry.batches_telemetry:
+        raise RuntimeError(
+            "bootstrap.runtime.telemetry.encoding 'delta' não suporta batch_max_cycles maior que 1"
+        )
+    if telemetry.encoding != "json":
+        raise RuntimeError(
+            f"bootstrap.runtime.telemetry.encoding '{telemetry.encoding}' ainda não é lido pelo processo Rust"
+        )
+    if telemetry.transport == "ring":
+        raise RuntimeError(
+            "bootstrap.runtime.telemetry.transport 'ring' ainda não é lido pelo processo Rust"
+        )
+    if telemetry.display_rate_hz > 0:
+        raise RuntimeError(
+            "bootstrap.runtime.telemetry.display_rate_hz ainda não é lido pelo processo Rust"
+        )
+    return telemetry
+
+
+def normalize_runtime_control(raw_value: Any) -> RuntimeControl:
+    if raw_value is None:
+        return RuntimeControl()
+    raw = expect_dict(raw_value, "bootstrap.runtime.control")
+    return RuntimeControl(
+        parallel_groups=bool(raw.get("parallel_groups", False)),
+        max_workers=normalize_positive_int(
+            raw.get("max_workers"),
+            "bootstrap.runtime.control.max_workers",
+            4,
+        ),
+        join_deadline_ms=normalize_non_negative_float(
+            raw.get("join_deadline_ms"),
+            "bootstrap.runtime.control.join_deadline_ms",
+        ),
+    )
+
+
+def normalize_runtime_driver_io(raw_value: Any) -> RuntimeDriverIO:
+    if raw_value is None:
+        return RuntimeDriverIO()
+    raw = expect_dict(raw_value, "bootstrap.runtime.driver_io")
+    return RuntimeDriverIO(
+        mode=normalize_choice(raw.get("mode"), "bootstrap.runtime.driver_io.mode", DRIVER_IO_MODES),
+    )
+
+
+def normalize_runtime_recorder(raw_value: Any) -> RuntimeRecorder:
+    if raw_value is None:
+        return RuntimeRecorder()
+    raw = expect_dict(raw_value, "bootstrap.runtime.recorder")
+    compression_level = normalize_non_negative_int(
+        raw.get("compression_level"),
+        "bootstrap.runtime.recorder.compression_level",
+        1,
+    )
+    if compression_level > 9:
+        raise RuntimeError("bootstrap.runtime.recorder.compression_level deve estar entre 0 e 9")
+    return RuntimeRecorder(
+        enabled=bool(raw.get("enabled", False)),
+        chunk_cycles=normalize_positive_int(
+            raw.get("chunk_cycles"),
+            "bootstrap.runtime.recorder.chunk_cycles",
+            1024,
+        ),
+        queue_chunks=normalize_positive_int(
+            raw.get("queue_chunks"),
+            "bootstrap.runtime.recorder.queue_chunks",
+            8,
+        ),
+        compression_level=compression_level,
+    )
+
+
+def normalize_runtime_stats(raw_value: Any) -> RuntimeStats:
+    if raw_value is None:
+        return RuntimeStats()
+    raw = expect_dict(raw_value, "bootstrap.runtime.stats")
+    return RuntimeStats(
+        interval_ms=normalize_non_negative_int(
+            raw.get("interval_ms"),
+            "bootstrap.runtime.stats.interval_ms",
+            0,
+        ),
+    )
+
+
+def normalize_runtime_context(raw_value: Any) -> RuntimeContext:
+    raw = expect_dict(raw_value, "bootstrap.runtime")
+    timing_raw = expect_dict(raw.get("timing"), "bootstrap.runtime.timing")
+    supervision_raw = expect_dict(raw.get("supervision"), "bootstrap.runtime.supervision")
+    paths_raw = expect_dict(raw.get("paths"), "bootstrap.runtime.paths")
+
+    return RuntimeContext(
+        id=normalize_string(raw.get("id"), "bootstrap.runtime.id"),
+        timing=RuntimeTiming(
+            owner=normalize_string(timing_raw.get("owner"), "bootstrap.runtime.timing.owner"),
+            clock=normalize_string(timing_raw.get("clock"), "bootstrap.runtime.timing.clock"),
+            strategy=normalize_timing_strategy(timing_raw.get("strategy")),
+            sample_time_ms=normalize_positive_int(
+                timing_raw.get("sample_time_ms"),
+                "bootstrap.runtime.timing.sample_time_ms",
+                100,
+            ),
+            spin_window_ms=normalize_non_negative_float(
+                timing_raw.get("spin_window_ms"),
+                "bootstrap.runtime.timing.spin_window_ms",
+                DEFAULT_SPIN_WINDOW_MS,
+            ),
+        ),
+        supervision=RuntimeSupervision(
+            owner=normalize_string(
+                supervision_raw.get("owner"),
+                "bootstrap.runtime.supervision.owner",
+            ),
+            startup_timeout_ms=normalize_positive_int(
+                supervision_raw.get("startup_timeout_ms"),
+                "bootstrap.runtime.supervision.startup_timeout_ms",
+                1000,
+            ),
+            shutdown_timeout_ms=normalize_positive_int(
+                supervision_raw.get("shutdown_timeout_ms"),
+                "bootstrap.runtime.supervision.shutdown_timeout_ms",
+                1000,
+            ),
+        ),
+        paths=RuntimePaths(
+            runtime_dir=normalize_string(
+                paths_raw.get("runtime_dir"),
+                "bootstrap.runtime.paths.runtime_dir",
+            ),
+            venv_python_path=normalize_string(
+                paths_raw.get("venv_python_path"),
+                "bootstrap.runtime.paths.venv_python_path",
+            ),
+            runner_path=normalize_string(
+                paths_raw.get("runner_path"),
+                "bootstrap.runtime.paths.runner_path",
+            ),
+            bootstrap_path=normalize_string(
+                paths_raw.get("bootstrap_path"),
+                "bootstrap.runtime.paths.bootstrap_path",
+            ),
+        ),
+        telemetry=normalize_runtime_telemetry(raw.get("telemetry")),
+        control=normalize_runtime_control(raw.get("control")),
+        driver_io=normalize_runtime_driver_io(raw.get("driver_io")),
+        recorder=normalize_runtime_recorder(raw.get("recorder")),
+        stats=normalize_runtime_stats(raw.get("stats")),
+    )
+
+
+def normalize_driver_metadata(raw_value: Any) -> DriverMetadata:
+    raw = expect_dict(raw_value, "bootstrap.driver")
+    return DriverMetadata(
+        plugin_id=normalize_string(raw.get("plugin_id"), "bootstrap.driver.plugin_id"),
+        plugin_name=normalize_string(raw.get("plugin_name"), "bootstrap.driver.plugin_name"),
+        plugin_dir=normalize_string(raw.get("plugin_dir"), "bootstrap.driver.plugin_dir"),
+        source_file=normalize_string(raw.get("source_file"), "bootstrap.driver.source_file"),
+        class_name=normalize_string(raw.get("class_name"), "bootstrap.driver.class_name"),
+        config=normalize_json_map(raw.get("config"), "bootstrap.driver.config"),
+    )
+
+
+def normalize_controller_param(raw_value: Any, context: str, key: str) -> ControllerParamSpec:
+    raw = expect_dict(raw_value, context)
+    return ControllerParamSpec(
+        key=key,
+        type=normalize_string(raw.get("type"), f"{context}.type"),
+        value=cast(JSONValue, raw.get("value")),
+        label=normalize_string(raw.get("label"), f"{context}.label"),
+    )
+
+
+def normalize_controller_metadata(raw_value: Any, index: int) -> ControllerMetadata:
+    context = f"bootstrap.controllers[{index}]"
+    raw = expect_dict(raw_value, context)
+    params_raw = expect_dict(raw.get("params") or {}, f"{context}.params")
+
+    return ControllerMetadata(
+        id=normalize_string(raw.get("id"), f"{context}.id"),
+        plugin_id=normalize_string(raw.get("plugin_id"), f"{context}.plugin_id"),
+        plugin_name=normalize_string(raw.get("plugin_name"), f"{context}.plugin_name"),
+        plugin_dir=normalize_string(raw.get("plugin_dir"), f"{context}.plugin_dir"),
+        source_file=normalize_string(raw.get("source_file"), f"{context}.source_file"),
+        class_name=normalize_string(raw.get("class_name"), f"{context}.class_name"),
+        name=normalize_string(raw.get("name"), f"{context}.name"),
+        controller_type=normalize_string(raw.get("controller_type"), f"{context}.controller_type"),
+        active=bool(raw.get("active", True)),
+        input_variable_ids=normalize_string_list(raw.get("input_variable_ids"), f"{context}.input_variable_ids"),
+        output_variable_ids=normalize_string_list(raw.get("output_variable_ids"), f"{context}.output_variable_ids"),
+        params={
+            str(key): normalize_controller_param(value, f"{context}.params.{key}", str(key))
+            for key, value in params_raw.items()
+        },
+        execution=normalize_controller_execution(raw.get("execution"), f"{context}.execution"),
+    )
+
+
+def normalize_controller_execution(raw_value: Any, context: str) -> ControllerExecution:
+    if raw_value is None:
+        return ControllerExecution()
+    raw = expect_dict(raw_value, context)
+    return ControllerExecution(
+        mode=normalize_choice(raw.get("mode"), f"{context}.mode", CONTROLLER_EXECUTION_MODES),
+        deadline_ms=normalize_non_negative_float(raw.get("deadline_ms"), f"{context}.deadline_ms"),
+        fallback=normalize_choice(raw.get("fallback"), f"{context}.fallback", CONTROLLER_DEADLINE_FALLBACKS),
+    )
+
+
+def normalize_bootstrap(raw_value: Any) -> RuntimeBootstrap:
+    raw = expect_dict(raw_value, "bootstrap")
+    controllers_raw = raw.get("controllers")
+    if controllers_raw is None:
+        controllers: List[ControllerMetadata] = []
+    elif not isinstance(controllers_raw, list):
+        raise RuntimeError("bootstrap.controllers deve ser um array")
+    else:
+        controllers = [
+            normalize_controller_metadata(controller_raw, index)
+            for index, controller_raw in enumerate(controllers_raw)
+        ]
+
+    return RuntimeBootstrap(
+        driver=normalize_driver_metadata(raw.get("driver")),
+        controllers=controllers,
+        plant=normalize_plant_context(raw.get("plant")),
+        runtime=normalize_runtime_context(raw.get("runtime")),
+    )
+
+
+def load_plugin_class(
+    plugin_dir: Path,
+    source_file: str,
+    expected_class_name: str,
+    required_methods: tuple[str, ...],
+    component_label: str,
+    cache_dir: Optional[Path] = None,
+) -> type[Any]:
+    source_path = plugin_dir / source_file
+    if not source_path.exists():
+        raise RuntimeError(f"{source_file} não encontrado em '{source_path}'")
+
+    module = load_plugin_module(source_path, expected_class_name, component_label, cache_dir)
+
+    candidate = getattr(module, expected_class_name, None)
+    if not isinstance(candidate, type):
+        raise RuntimeError(
+            f"Classe '{expected_class_name}' não encontrada em {source_file} para o {component_label}"
+        )
+    if candidate.__module__ != module.__name__:
+        raise RuntimeError(
+            f"Classe '{expected_class_name}' precisa ser definida em {source_file}"
+        )
+
+    missing = [
+        method
+        for method in required_methods
+        if not callable(getattr(candidate, method, None))
+    ]
+    if missing:
+        raise RuntimeError(
+            f"Classe '{expected_class_name}' inválida para o {component_label}. Métodos ausentes: {', '.join(missing)}"
+        )
+
+    return candidate
+
+
+def load_plugin_module(
+    source_path: Path,
+    expected_class_name: str,
+    component_label: str,
+    cache_dir: Optional[Path],
+) -> ModuleType:
+    source = source_path.read_bytes()
+    digest = load_hashlib().sha256(source).hexdigest()
+    key = str(source_path.resolve())
+    with PLUGIN_CODE_CACHE_LOCK:
+        cached = PLUGIN_CODE_CACHE.pop(key, None)
+        if cached is not None and cached[0] == digest:
+            code = cached[1]
+        else:
+            code = load_plugin_code(source, source_path, key, digest, cache_dir)
+        PLUGIN_CODE_CACHE[key] = (digest, code)
+        while len(PLUGIN_CODE_CACHE) > PLUGIN_CODE_CACHE_MAX_ENTRIES:
+            del PLUGIN_CODE_CACHE[next(iter(PLUGIN_CODE_CACHE))]
+
+    importlib_util = load_importlib_util()
+    spec = importlib_util.spec_from_file_location(
+        f"runtime_plugin_{expected_class_name.lower()}",
+        str(source_path),
+    )
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Falha ao criar spec do módulo do {component_label}")
+
+    module = importlib_util.module_from_spec(spec)
+    exec(code, module.__dict__)
+    return module
+
+
+def load_plugin_code(source: bytes, source_path: Path, key: str, digest: str, cache_dir: Optional[Path]) -> CodeType:
+    if cache_dir is None or sys.implementation.cache_tag is None:
+        return compile(source, str(source_path), "exec", dont_inherit=True)
+
+    marshal = load_marshal()
+    magic_number = load_importlib_util().MAGIC_NUMBER
+    path_hash = load_hashlib().sha256(key.encode("utf-8")).hexdigest()[:16]
+    cache_path = cache_dir / f"{path_hash}-{digest[:16]}.{sys.implementation.cache_tag}.pyc"
+    with contextlib.suppress(OSError, ValueError, EOFError, TypeError):
+        cached = cache_path.read_bytes()
+        if cached.startswith(magic_number):
+            code = marshal.loads(cached[len(magic_number) :])
+            if isinstance(code, CodeType):
+                return code
+
+    code = compile(source, str(source_path), "exec", dont_inherit=True)
+    with contextlib.suppress(OSError):
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        for stale in cache_dir.glob(f"{path_hash}-*.pyc"):
+            stale.unlink()
+        temporary = cache_path.with_name(f"{cache_path.name}.tmp")
+        temporary.write_bytes(magic_number + marshal.dumps(code))
+        temporary.replace(cache_path)
+    return code
+
+
+def instantiate_plugin(plugin_cls: type[Any], context: Any, component_label: str) -> Any:
+    try:
+        return plugin_cls(context)
+    except TypeError as exc:
+        raise RuntimeError(
+            f"Construtor do {component_label} deve seguir o contrato __init__(self, context)"
+        ) from exc
+
+
+def coerce_required_bool(method_name: str, result: Any) -> bool:
+    if not isinstance(result, bool):
+        raise RuntimeError(
+            f"Método '{method_name}' deve retornar bool, recebeu {type(result).__name__}"
+        )
+    return result
+
+
+def coerce_optional_bool(
+    method_name: str,
+    result: Any,
+    false_message: str,
+    warn: Optional[Callable[[str], Any]] = None,
+) -> None:
+    if result is None:
+        return
+    if not isinstance(result, bool):
+        raise RuntimeError(
+            f"Método '{method_name}' deve retornar bool ou None, recebeu {type(result).__name__}"
+        )
+    if not result:
+        if warn is None:
+            emit("warning", {"message": false_message})
+        else:
+            warn(false_message)
+
+
+def maybe_call_optional_connect(
+    instance: Any,
+    component_name: str,
+    warn: Optional[Callable[[str], Any]] = None,
+) -> None:
+    connect = getattr(instance, "connect", None)
+    if not callable(connect):
+        return
+    result = connect()
+    coerce_optional_bool(
+        "connect",
+        result,
+        f"Componente '{component_name}' retornou False em connect()",
+        warn,
+    )
+
+
+def maybe_call_optional_stop(
+    instance: Any,
+    component_name: str,
+    warn: Optional[Callable[[str], Any]] = None,
+) -> None:
+    stop = getattr(instance, "stop", None)
+    if not callable(stop):
+        return
+    try:
+        result = stop()
+        coerce_optional_bool(
+            "stop",
+            result,
+            f"Componente '{component_name}' retornou False em stop()",
+            warn,
+        )
+    except Exception as exc:  # noqa: BLE001
+        log_error(f"Falha ao finalizar componente '{component_name}': {exc}")
+
+
+def normalize_read_snapshot(
+    raw_value: Any,
+    plant: PlantContext,
+) -> tuple[SensorPayload, ActuatorPayload]:
+    if raw_value is None:
+        return {}, {}
+    if not isinstance(raw_value, dict):
+        raise RuntimeError(
+            "read() deve retornar um objeto JSON no formato {'sensors': {...}, 'actuators': {...}}"
+        )
+
+    sensors = normalize_float_map(raw_value.get("sensors"), "read().sensors", set(plant.sensors.ids))
+    actuators = normalize_float_map(raw_value.get("actuators"), "read().actuators", set(plant.actuators.ids))
+    return sensors, actuators
+
+
+def normalize_float_vector(raw_value: Any, context: str, expected_length: int) -> array:
+    try:
+        values = raw_value if isinstance(raw_value, array) and raw_value.typecode == "d" else array("d", raw_value)
+    except Exception as exc:  # noqa: BLE001
+        raise RuntimeError(f"{context} deve ser uma sequência numérica") from exc
+    if len(values) != expected_length:
+        raise RuntimeError(f"{context} deve ter {expected_length} valores, recebeu {len(values)}")
+    if not all(map(math.isfinite, values)):
+        raise RuntimeError(f"{context} deve conter apenas valores finitos")
+    return values
+
+
+def normalize_read_vector(
+    raw_value: Any,
+    layout: PlantVectorLayout,
+) -> tuple[SensorPayload, ActuatorPayload]:
+    if isinstance(raw_value, dict):
+        raw_sensors = raw_value.get("sensors")
+        raw_actuators = raw_value.get("actuators")
+    elif isinstance(raw_value, (tuple, list)) and len(raw_value) == 2:
+        raw_sensors, raw_actuators = raw_value
+    else:
+        raise RuntimeError(
+            "read_vector() deve retornar (sensors, actuators) ou {'sensors': [...], 'actuators': [...]}"
+        )
+
+    sensors = layout.sensors_view(
+        normalize_float_vector(raw_sensors, "read_vector().sensors", len(layout.sensor_ids))
+    )
+    if raw_actuators is None:
+        return sensors, {}
+    return sensors, layout.actuators_view(
+        normalize_float_vector(raw_actuators, "read_vector().actuators", len(layout.actuator_ids))
+    )
+
+
+def normalize_controller_output_vector(
+    raw_value: Any,
+    output_variable_ids: List[str],
+    controller_name: str,
+) -> ControllerOutputPayload:
+    values = normalize_float_vector(
+        raw_value,
+        f"compute_vector().outputs[{controller_name}]",
+        len(output_variable_ids),
+    )
+    return dict(zip(output_variable_ids, values))
+
+
+def merge_controller_outputs(
+    controller_outputs: Dict[str, float],
+    outputs: ControllerOutputPayload,
+) -> None:
+    for variable_id, value in outputs.items():
+        if variable_id in controller_outputs:
+            raise RuntimeError(
+                f"Saída '{variable_id}' recebeu mais de um valor no mesmo ciclo"
+            )
+        controller_outputs[variable_id] = value
+
+
+@functools.lru_cache(maxsize=None)
+def load_numpy() -> Any:
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def load_asyncio() -> ModuleType:
+    import asyncio
+
+    return asyncio
+
+
+def load_concurrent_futures() -> ModuleType:
+    import concurrent.futures
+
+    return concurrent.futures
+
+
+def load_controller_workers() -> ModuleType:
+    import runner_workers
+
+    return runner_workers
+
+
+def load_profiler() -> ModuleType:
+    import runner_profiler
+
+    return runner_profiler
+
+
+def load_recorder() -> ModuleType:
+    import runner_recorder
+
+    return runner_recorder
+
+
+def load_telemetry_transports() -> ModuleType:
+    import runner_transports
+
+    return runner_transports
+
+
+def load_inspect() -> ModuleType:
+    import inspect
+
+    return inspect
+
+
+def load_importlib_util() -> ModuleType:
+    import importlib.util
+
+    return importlib.util
+
+
+def load_marshal() -> ModuleType:
+    import marshal
+
+    return marshal
+
+
+def load_hashlib() -> ModuleType:
+    import hashlib
+
+    return hashlib
+
+
+def build_controller_groups(
+    controllers: List[LoadedController],
+    batches: Dict[str, ControllerBatchGroup],
+) -> List[List[LoadedController]]:
+    inline = [controller for controller in controllers if controller.process_worker is None]
+    index_by_id = {controller.metadata.id: index for index, controller in enumerate(inline)}
+    parents = list(range(len(inline)))
+
+    def find(index: int) -> int:
+        while parents[index] != index:
+            parents[index] = parents[parents[index]]
+            index = parents[index]
+        return index
+
+    def union(left: int, right: int) -> None:
+        parents[find(left)] = find(right)
+
+    writers: Dict[str, List[int]] = {}
+    for index, controller in enumerate(inline):
+        for variable_id in controller.metadata.output_variable_ids:
+            writers.setdefault(variable_id, []).append(index)
+
+    for index, controller in enumerate(inline):
+        for variable_id in [*controller.metadata.input_variable_ids, *controller.metadata.output_variable_ids]:
+            for writer in writers.get(variable_id, []):
+                union(index, writer)
+        batch_group = batches.get(controller.metadata.id)
+        if batch_group is not None:
+            for member in batch_group.members:
+                union(index, index_by_id[member.metadata.id])
+
+    groups: Dict[int, List[LoadedController]] = {}
+    for index, controller in enumerate(inline):
+        groups.setdefault(find(index), []).append(controller)
+    return list(groups.values())
+
+
+def build_controller_batches(
+    controllers: List[LoadedController],
+) -> Dict[str, ControllerBatchGroup]:
+    if all(controller.batch_binding is None for controller in controllers) or load_numpy() is None:
+        return {}
+
+    groups: Dict[tuple[str, str, int, int], ControllerBatchGroup] = {}
+    for controller in controllers:
+        binding = controller.batch_binding
+        if binding is None:
+            continue
+        key = (
+            str(Path(controller.metadata.plugin_dir) / controller.metadata.source_file),
+            controller.metadata.class_name,
+            len(binding.input_variable_ids),
+            len(binding.output_variable_ids),
+        )
+        groups.setdefault(key, ControllerBatchGroup(members=[])).members.append(controller)
+
+    return {
+        member.metadata.id: group
+        for group in groups.values()
+        for member in group.members
+    }
+
+
+def normalize_controller_outputs(
+    raw_value: Any,
+    allowed_output_ids: List[str],
+    controller_name: str,
+) -> ControllerOutputPayload:
+    return normalize_float_map(
+        raw_value,
+        f"compute().outputs[{controller_name}]",
+        set(allowed_output_ids),
+    )
+
+
+def clone_controller_params(
+    params: Dict[str, ControllerParamSpec],
+) -> Dict[str, ControllerParamSpec]:
+    return {
+        key: ControllerParamSpec(
+            key=param.key,
+            type=param.type,
+            value=cast(JSONValue, clone_json_value(param.value)),
+            label=param.label,
+        )
+        for key, param in params.items()
+    }
+
+
+def serialize_controller_params(
+    params: Dict[str, ControllerParamSpec],
+) -> Dict[str, Dict[str, JSONValue | str]]:
+    return {
+        key: {
+            "type": param.type,
+            "value": cast(JSONValue, clone_json_value(param.value)),
+            "label": param.label,
+        }
+        for key, param in params.items()
+    }
+
+
+def clone_json_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: clone_json_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [clone_json_value(item) for item in value]
+    return value
+
+
+def freeze_json_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze_json_value(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze_json_value(item) for item in value)
+    return value
+
+
+def clone_public_controller_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        **metadata,
+        "input_variable_ids": list(metadata["input_variable_ids"]),
+        "output_variable_ids": list(metadata["output_variable_ids"]),
+        "params": {
+            key: {**param, "value": clone_json_value(param["value"])}
+            for key, param in metadata["params"].items()
+        },
+    }
+
+
+def build_public_controller_metadata(
+    controller: ControllerMetadata,
+) -> ControllerPublicMetadata:
+    return ControllerPublicMetadata(
+        id=controller.id,
+        name=controller.name,
+        controller_type=controller.controller_type,
+        input_variable_ids=list(controller.input_variable_ids),
+        output_variable_ids=list(controller.output_variable_ids),
+        params=clone_controller_params(controller.params),
+    )
+
+
+def build_driver_plugin_context(bootstrap: RuntimeBootstrap) -> DriverPluginContext:
+    return DriverPluginContext(
+        config=cast(Dict[str, JSONValue], clone_json_value(bootstrap.driver.config)),
+        plant=bootstrap.plant,
+    )
+
+
+def build_controller_plugin_context(
+    controller: ControllerMetadata,
+    plant: PlantContext,
+) -> ControllerPluginContext:
+    return ControllerPluginContext(
+        controller=build_public_controller_metadata(controller),
+        plant=plant,
+    )
+
+
+def build_controller_snapshot(
+    cycle_id: int,
+    cycle_started_at: float,
+    dt_ms: float,
+    plant: PlantContext,
+    controller_public_metadata: Dict[str, Any],
+    sensors: SensorPayload,
+    actuators: ActuatorPayload,
+) -> Dict[str, Any]:
+    return ControllerSnapshotBuilder(plant, controller_public_metadata).build(
+        cycle_id=cycle_id,
+        cycle_started_at=cycle_started_at,
+        dt_ms=dt_ms,
+        sensors=sensors,
+        actuators=actuators,
+    )
+
+
+def build_telemetry_schema(bootstrap: RuntimeBootstrap, schema_id: int) -> TelemetrySchema:
+    plant = bootstrap.plant
+    return TelemetrySchema(
+        schema_id=schema_id,
+        sensor_ids=list(plant.sensors.ids),
+        actuator_ids=list(plant.actuators.ids),
+        setpoint_ids=[variable.id for variable in plant.variables],
+        controller_ids=[controller.id for controller in bootstrap.controllers],
+    )
+
+
+def bootstrap_from_file(bootstrap_path: Path) -> RuntimeBootstrap:
+    with bootstrap_path.open("r", encoding="utf-8") as handle:
+        return normalize_bootstrap(json.load(handle))
+
+
+def handle_command(command: Dict[str, Any], engine: PlantRuntimeEngine) -> None:
+    msg_type = str(command.get("type", "")).strip()
+    payload = command.get("payload")
+
+    if msg_type == "init":
+        engine.apply_init(normalize_bootstrap(payload))
+        return
+
+    if msg_type == "start":
+        engine.start()
+        connected: Dict[str, Any] = {"runtime_id": engine.runtime_id, "plant_id": engine.plant_id}
+        if engine.startup_trace is not None:
+            connected["startup_trace"] = engine.startup_trace.serialize()
+        engine.emit_event("connected", connected)
+        return
+
+    if msg_type == "pause":
+        engine.pause()
+        return
+
+    if msg_type == "resume":
+        engine.resume()
+        return
+
+    if msg_type == "update_setpoints":
+        raw_payload = expect_dict(payload, "update_setpoints.payload")
+        setpoints = normalize_float_map(
+            raw_payload.get("setpoints"),
+            "update_setpoints.payload.setpoints",
+        )
+        engine.update_setpoints(setpoints)
+        return
+
+    if msg_type == "update_controllers":
+        raw_payload = expect_dict(payload, "update_controllers.payload")
+        controllers_raw = raw_payload.get("controllers")
+        if controllers_raw is None:
+            controllers: List[ControllerMetadata] = []
+        elif not isinstance(controllers_raw, list):
+            raise RuntimeError("update_controllers.payload.controllers deve ser um array")
+        else:
+            controllers = [
+                normalize_controller_metadata(controller_raw, index)
+                for index, controller_raw in enumerate(controllers_raw)
+            ]
+        try:
+            engine.update_controllers(controllers)
+        except Exception as exc:  # noqa: BLE001
+            log_exception(exc)
+            emit("error", {"message": f"Falha ao atualizar controladores: {exc}"})
+        return
+
+    if msg_type == "reset_stats":
+        engine.reset_stats()
+        return
+
+    if msg_type == "profile":
+        raw_payload = expect_dict(payload or {}, "profile.payload")
+        engine.start_profile(
+            normalize_positive_float(
+                raw_payload.get("duration_s"),
+                "profile.payload.duration_s",
+                PROFILE_DEFAULT_DURATION_S,
+            ),
+            normalize_positive_float(
+                raw_payload.get("interval_ms"),
+                "profile.payload.interval_ms",
+                PROFILE_DEFAULT_INTERVAL_MS,
+            ),
+        )
+        return
+
+    if msg_type in ("stop", "shutdown"):
+        engine.request_shutdown()
+        return
+
+    if msg_type == "write_outputs":
+        emit("warning", {"message": "Comando write_outputs não é suportado nesta fase"})
+        return
+
+
+def build_ready_payload(engine: PlantRuntimeEngine, runtime_dir: Path) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {
+        "runtime_id": engine.runtime_id,
+        "plant_id": engine.plant_id,
+        "driver": engine.bootstrap.driver.plugin_name,
+        "runtime_dir": str(runtime_dir),
+        "telemetry": engine.describe_telemetry(),
+    }
+    if engine.startup_trace is not None:
+        payload["startup_trace"] = engine.startup_trace.serialize()
+    return payload
+
+
+class StartupTrace:
+    def __init__(self, started_at: float, interpreter_ms: Optional[float] = None) -> None:
+        self.started_at = started_at
+        self.offset_ms = interpreter_ms or 0.0
+        self.phases_ms: Dict[str, float] = {}
+        if interpreter_ms is not None:
+            self.phases_ms["interpreter"] = interpreter_ms
+
+    def record(self, phase: str, started_at: float, finished_at: Optional[float] = None) -> None:
+        elapsed_ms = ((time.monotonic() if finished_at is None else finished_at) - started_at) * 1000.0
+        self.phases_ms[phase] = self.phases_ms.get(phase, 0.0) + elapsed_ms
+
+    @contextlib.contextmanager
+    def phase(self, phase: str) -> Iterator[None]:
+        started_at = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(phase, started_at)
+
+    def serialize(self) -> Dict[str, Any]:
+        return {
+            "phases_ms": dict(self.phases_ms),
+            "total_ms": self.offset_ms + (time.monotonic() - self.started_at) * 1000.0,
+        }
+
+
+def startup_phase(trace: Optional[StartupTrace], phase: str) -> ContextManager[None]:
+    if trace is None:
+        return contextlib.nullcontext()
+    return trace.phase(phase)
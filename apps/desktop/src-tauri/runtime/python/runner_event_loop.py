@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import contextlib
+import sys
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from runner_engine import handle_command, load_asyncio
+from runner_protocol import emit, log_exception, parse_command_line, spawn_command_reader
+
+if TYPE_CHECKING:
+    import asyncio
+
+    from runner_engine import PlantRuntimeEngine
+
+COMMAND_LINE_LIMIT_BYTES = 16 * 1024 * 1024
+
+
+class EngineEventLoop:
+    def __init__(self, engine: PlantRuntimeEngine, loop: asyncio.AbstractEventLoop) -> None:
+        self.engine = engine
+        self.loop = loop
+        self.cycle_handle: Optional[asyncio.TimerHandle] = None
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        self.finished: asyncio.Future[None] = loop.create_future()
+        engine.controller_reload_listener = self._notify_controller_reload
+
+    def handle_line(self, raw_line: str | bytes) -> None:
+        command = parse_command_line(raw_line)
+        if command is not None:
+            self.handle_command(command)
+
+    def handle_command(self, command: Dict[str, Any]) -> None:
+        if self.finished.done():
+            return
+        try:
+            handle_command(command, self.engine)
+        except Exception as exc:  # noqa: BLE001
+            log_exception(exc)
+            emit("error", {"message": f"Falha ao processar comando '{command.get('type', '')}': {exc}"})
+            self.engine.request_shutdown()
+        self.reschedule()
+
+    def reschedule(self) -> None:
+        if self.cycle_handle is not None:
+            self.cycle_handle.cancel()
+            self.cycle_handle = None
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        if self.engine.should_exit:
+            if not self.finished.done():
+                self.finished.set_result(None)
+            return
+
+        due_at = self.engine.next_cycle_due_at()
+        if due_at is not None:
+            self.cycle_handle = self.loop.call_at(
+                due_at - self.engine.bootstrap.runtime.timing.wake_margin_s,
+                self._run_cycle,
+            )
+        flush_at = self.engine.telemetry_flush_due_at()
+        if flush_at is not None:
+            self.flush_handle = self.loop.call_at(flush_at, self._flush_telemetry)
+
+    async def read_commands(self) -> None:
+        asyncio = load_asyncio()
+        reader = asyncio.StreamReader(limit=COMMAND_LINE_LIMIT_BYTES)
+        try:
+            transport, _protocol = await self.loop.connect_read_pipe(
+                lambda: asyncio.StreamReaderProtocol(reader),
+                sys.stdin,
+            )
+        except (NotImplementedError, OSError, ValueError):
+            spawn_command_reader(self._deliver_threadsafe)
+            return
+
+        try:
+            while True:
+                raw_line = await reader.readline()
+                if not raw_line:
+                    return
+                self.handle_line(raw_line)
+        finally:
+            transport.close()
+
+    def _run_cycle(self) -> None:
+        self.cycle_handle = None
+        try:
+            self.engine.apply_pending_controller_reload()
+            self.engine.run_cycle()
+        except BaseException as exc:  # noqa: BLE001
+            if not self.finished.done():
+                self.finished.set_exception(exc)
+            return
+        self.reschedule()
+
+    def _flush_telemetry(self) -> None:
+        self.flush_handle = None
+        self.engine.flush_expired_telemetry()
+
+    def _deliver_threadsafe(self, command: Dict[str, Any]) -> None:
+        with contextlib.suppress(RuntimeError):
+            self.loop.call_soon_threadsafe(self.handle_command, command)
+
+    def _notify_controller_reload(self) -> None:
+        with contextlib.suppress(RuntimeError):
+            self.loop.call_soon_threadsafe(self._apply_controller_reload)
+
+    def _apply_controller_reload(self) -> None:
+        if self.finished.done():
+            return
+        self.engine.apply_pending_controller_reload()
+        self.reschedule()
+
+
+async def run_engine_event_loop(engine: PlantRuntimeEngine) -> None:
+    asyncio = load_asyncio()
+    event_loop = EngineEventLoop(engine, asyncio.get_running_loop())
+    reader_task = asyncio.create_task(event_loop.read_commands())
+    try:
+        await event_loop.finished
+    finally:
+        engine.controller_reload_listener = None
+        reader_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await reader_task
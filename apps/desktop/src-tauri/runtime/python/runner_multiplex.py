@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import queue
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from runner_engine import (
+    PlantRuntimeEngine,
+    build_ready_payload,
+    handle_command,
+    normalize_bootstrap,
+    normalize_string,
+)
+from runner_protocol import emit, log_exception, plant_protocol_scope
+
+class MultiPlantHost:
+    def __init__(self, runtime_dir: Path) -> None:
+        self.runtime_dir = runtime_dir
+        self.engines: Dict[str, PlantRuntimeEngine] = {}
+        self.should_exit = False
+
+    def next_wait_timeout(self) -> Optional[float]:
+        deadlines = [
+            deadline
+            for engine in self.engines.values()
+            for deadline in (engine.next_cycle_due_at(), engine.telemetry_flush_due_at())
+            if deadline is not None
+        ]
+        if not deadlines:
+            return None
+        return max(0.0, min(deadlines) - time.monotonic())
+
+    def dispatch(self, command: Dict[str, Any]) -> None:
+        raw_plant_id = command.get("plant_id")
+        try:
+            self.handle_command(command)
+        except Exception as exc:  # noqa: BLE001
+            log_exception(exc)
+            message = f"Falha ao processar comando '{command.get('type', '')}': {exc}"
+            if isinstance(raw_plant_id, str) and raw_plant_id in self.engines:
+                with plant_protocol_scope(raw_plant_id):
+                    emit("error", {"message": message})
+                self.remove_plant(raw_plant_id)
+            else:
+                emit("error", {"message": message})
+
+    def handle_command(self, command: Dict[str, Any]) -> None:
+        msg_type = str(command.get("type", "")).strip()
+        if msg_type == "shutdown" and command.get("plant_id") is None:
+            self.should_exit = True
+            return
+
+        if msg_type == "init":
+            bootstrap = normalize_bootstrap(command.get("payload"))
+            if bootstrap.runtime.telemetry.encoding != "json":
+                raise RuntimeError("O modo multiplexado suporta apenas telemetria JSON")
+            plant_id = bootstrap.plant.id
+            with plant_protocol_scope(plant_id):
+                engine = self.engines.get(plant_id)
+                if engine is None:
+                    engine = PlantRuntimeEngine(bootstrap)
+                    self.engines[plant_id] = engine
+                else:
+                    engine.apply_init(bootstrap)
+                emit("ready", build_ready_payload(engine, self.runtime_dir))
+            return
+
+        plant_id = normalize_string(command.get("plant_id"), f"{msg_type}.plant_id")
+        engine = self.engines.get(plant_id)
+        if engine is None:
+            raise RuntimeError(f"Planta '{plant_id}' não está carregada neste runner")
+
+        if msg_type in ("stop", "shutdown"):
+            self.remove_plant(plant_id)
+            return
+
+        with plant_protocol_scope(plant_id):
+            handle_command(command, engine)
+
+    def run_due_cycles(self) -> None:
+        now = time.monotonic()
+        due: List[tuple[float, str]] = []
+        for plant_id, engine in self.engines.items():
+            with plant_protocol_scope(plant_id):
+                engine.flush_expired_telemetry()
+            deadline = engine.next_cycle_due_at()
+            if deadline is not None and deadline <= now:
+                due.append((deadline, plant_id))
+
+        for _, plant_id in sorted(due):
+            engine = self.engines.get(plant_id)
+            if engine is None:
+                continue
+            try:
+                with plant_protocol_scope(plant_id):
+                    engine.apply_pending_controller_reload()
+                    engine.run_cycle()
+            except Exception as exc:  # noqa: BLE001
+                log_exception(exc)
+                with plant_protocol_scope(plant_id):
+                    emit("error", {"message": f"Falha no ciclo da planta: {exc}"})
+                self.remove_plant(plant_id)
+
+    def remove_plant(self, plant_id: str) -> None:
+        engine = self.engines.pop(plant_id, None)
+        if engine is None:
+            return
+        with plant_protocol_scope(plant_id):
+            try:
+                engine.stop()
+            finally:
+                emit("stopped", {"runtime_id": engine.runtime_id, "plant_id": engine.plant_id})
+
+    def stop_all(self) -> None:
+        for plant_id in list(self.engines):
+            self.remove_plant(plant_id)
+
+
+def run_multiplexed(runtime_dir: Path, command_queue: "queue.Queue[Dict[str, Any]]") -> int:
+    host = MultiPlantHost(runtime_dir)
+    emit("ready", {"mode": "multiplex", "runtime_dir": str(runtime_dir)})
+
+    try:
+        while not host.should_exit:
+            wait_timeout = host.next_wait_timeout()
+            try:
+                host.dispatch(command_queue.get(timeout=0.5 if wait_timeout is None else wait_timeout))
+            except queue.Empty:
+                pass
+
+            while not host.should_exit:
+                try:
+                    command = command_queue.get_nowait()
+                except queue.Empty:
+                    break
+                host.dispatch(command)
+
+            if host.should_exit:
+                break
+
+            host.run_due_cycles()
+    finally:
+        host.stop_all()
+
+    emit("stopped", {"mode": "multiplex"})
+    return 0
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import signal
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+PROFILE_RUNNER_LABEL = "runner"
+PROFILE_OTHER_THREADS_EVERY = 4
+
+
+class StackSampler:
+    def __init__(
+        self,
+        path: Path,
+        file_labels: Mapping[str, str],
+        instance_labels: Mapping[int, str],
+        duration_s: float,
+        interval_s: float,
+    ) -> None:
+        self.path = path
+        self.file_labels = file_labels
+        self.instance_labels = instance_labels
+        self.interval_s = interval_s
+        self.deadline = time.monotonic() + duration_s
+        self.counts: Dict[str, int] = {}
+        self.thread_counts: Dict[str, int] = {}
+        self.frame_names: Dict[Any, str] = {}
+        self.samples = 0
+        self.thread_samples = 0
+        self.thread_id = threading.get_ident()
+        self.sampler_thread_id: Optional[int] = None
+        self.uses_signal = hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+        self.stopped = threading.Event()
+        self.writer: Optional[threading.Thread] = None
+        self.summary: Optional[Dict[str, Any]] = None
+        self.failure: Optional[str] = None
+        if self.uses_signal:
+            self.previous_handler = signal.signal(signal.SIGPROF, self._handle_signal)
+            signal.setitimer(signal.ITIMER_PROF, interval_s, interval_s)
+        self.thread = threading.Thread(target=self._run_thread, daemon=True, name="stack-sampler")
+        self.thread.start()
+
+    def expired(self, now: float) -> bool:
+        return now >= self.deadline
+
+    def stop(self) -> None:
+        global ACTIVE_STACK_SAMPLER
+        if self.uses_signal:
+            signal.setitimer(signal.ITIMER_PROF, 0.0, 0.0)
+            signal.signal(signal.SIGPROF, self.previous_handler)
+        self.stopped.set()
+        self.thread.join(timeout=self.interval_s * PROFILE_OTHER_THREADS_EVERY * 10)
+        with STACK_SAMPLER_LOCK:
+            if ACTIVE_STACK_SAMPLER is self:
+                ACTIVE_STACK_SAMPLER = None
+        self.writer = threading.Thread(target=self._write, daemon=True, name="profile-writer")
+        self.writer.start()
+
+    def result(self, wait: bool) -> Optional[Dict[str, Any]]:
+        if self.writer is None:
+            return None
+        if wait:
+            self.writer.join()
+        if self.writer.is_alive():
+            return None
+        return self.summary
+
+    def _write(self) -> None:
+        counts = dict(self.counts)
+        for stack, count in self.thread_counts.items():
+            counts[stack] = counts.get(stack, 0) + count
+        labels: Dict[str, int] = {}
+        for stack, count in counts.items():
+            label = stack.split(";", 1)[0]
+            labels[label] = labels.get(label, 0) + count
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as output:
+                for stack, count in sorted(counts.items()):
+                    output.write(f"{stack} {count}\n")
+        except OSError as exc:
+            self.failure = f"Falha ao gravar perfil em {self.path}: {exc}"
+        self.summary = {
+            "path": str(self.path),
+            "samples": self.samples + self.thread_samples,
+            "sampler": "signal" if self.uses_signal else "thread",
+            "labels": labels,
+        }
+
+    def _handle_signal(self, signum: int, frame: Any) -> None:
+        if frame is not None:
+            self.samples += self._record(self.counts, frame, plugin_only=False, weight=1)
+
+    def _run_thread(self) -> None:
+        self.sampler_thread_id = threading.get_ident()
+        ticks = 0
+        while not self.stopped.wait(self.interval_s):
+            frames = None
+            if not self.uses_signal:
+                frames = sys._current_frames()
+                frame = frames.get(self.thread_id)
+                if frame is not None:
+                    self.samples += self._record(self.counts, frame, plugin_only=False, weight=1)
+            ticks += 1
+            if ticks % PROFILE_OTHER_THREADS_EVERY:
+                continue
+            for thread_id, frame in (frames or sys._current_frames()).items():
+                if thread_id != self.thread_id and thread_id != self.sampler_thread_id:
+                    self.thread_samples += self._record(
+                        self.thread_counts, frame, plugin_only=True, weight=PROFILE_OTHER_THREADS_EVERY
+                    )
+
+    def _record(self, counts: Dict[str, int], frame: Any, plugin_only: bool, weight: int) -> int:
+        names: List[str] = []
+        label = PROFILE_RUNNER_LABEL
+        while frame is not None:
+            code = frame.f_code
+            name = self.frame_names.get(code)
+            if name is None:
+                name = self.frame_names[code] = f"{code.co_name} ({Path(code.co_filename).name}"
+            names.append(f"{name}:{frame.f_lineno})")
+            file_label = self.file_labels.get(code.co_filename)
+            if file_label is not None:
+                instance = frame.f_locals.get("self")
+                label = self.instance_labels.get(id(instance), file_label)
+            frame = frame.f_back
+        if plugin_only and label == PROFILE_RUNNER_LABEL:
+            return 0
+        names.append(label)
+        stack = ";".join(reversed(names))
+        counts[stack] = counts.get(stack, 0) + weight
+        return weight
+
+
+STACK_SAMPLER_LOCK = threading.Lock()
+ACTIVE_STACK_SAMPLER: Optional[StackSampler] = None
+
+
+def start_stack_sampler(
+    path: Path,
+    file_labels: Mapping[str, str],
+    instance_labels: Mapping[int, str],
+    duration_s: float,
+    interval_s: float,
+) -> Optional[StackSampler]:
+    global ACTIVE_STACK_SAMPLER
+    with STACK_SAMPLER_LOCK:
+        if ACTIVE_STACK_SAMPLER is not None:
+            return None
+        ACTIVE_STACK_SAMPLER = StackSampler(path, file_labels, instance_labels, duration_s, interval_s)
+        return ACTIVE_STACK_SAMPLER
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Mapping, Optional, TypeAlias, cast
+
+if TYPE_CHECKING:
+    import contextvars
+
+JSONScalar: TypeAlias = str | int | float | bool | None
+JSONValue: TypeAlias = JSONScalar | List["JSONValue"] | Dict[str, "JSONValue"]
+JsonObject: TypeAlias = Dict[str, Any]
+PROTOCOL_STDOUT = sys.stdout
+PROTOCOL_LOCK = threading.Lock()
+PROTOCOL_PLANT_ID: Optional[contextvars.ContextVar[Optional[str]]] = None
+
+
+@dataclass
+class PublishMetrics:
+    serialize_ms: float = 0.0
+    write_ms: float = 0.0
+    flush_ms: float = 0.0
+    bytes_written: int = 0
+
+    def add(self, other: PublishMetrics) -> None:
+        self.serialize_ms += other.serialize_ms
+        self.write_ms += other.write_ms
+        self.flush_ms += other.flush_ms
+        self.bytes_written += other.bytes_written
+
+
+def emit(msg_type: str, payload: Optional[Dict[str, Any]] = None) -> PublishMetrics:
+    started_at = time.monotonic()
+    envelope: Dict[str, Any] = {"type": msg_type}
+    plant_id = PROTOCOL_PLANT_ID.get() if PROTOCOL_PLANT_ID is not None else None
+    if plant_id is not None:
+        envelope["plant_id"] = plant_id
+    if payload is not None:
+        envelope["payload"] = payload
+    line = json.dumps(envelope, ensure_ascii=False, default=encode_protocol_value) + "\n"
+    serialized_at = time.monotonic()
+    with PROTOCOL_LOCK:
+        PROTOCOL_STDOUT.write(line)
+        written_at = time.monotonic()
+        PROTOCOL_STDOUT.flush()
+        flushed_at = time.monotonic()
+    return PublishMetrics(
+        serialize_ms=(serialized_at - started_at) * 1000.0,
+        write_ms=(written_at - serialized_at) * 1000.0,
+        flush_ms=(flushed_at - written_at) * 1000.0,
+        bytes_written=len(line) if line.isascii() else len(line.encode("utf-8")),
+    )
+
+
+def emit_bytes(data: bytes, started_at: float) -> PublishMetrics:
+    serialized_at = time.monotonic()
+    with PROTOCOL_LOCK:
+        stream = PROTOCOL_STDOUT.buffer
+        stream.write(data)
+        written_at = time.monotonic()
+        stream.flush()
+        flushed_at = time.monotonic()
+    return PublishMetrics(
+        serialize_ms=(serialized_at - started_at) * 1000.0,
+        write_ms=(written_at - serialized_at) * 1000.0,
+        flush_ms=(flushed_at - written_at) * 1000.0,
+        bytes_written=len(data),
+    )
+
+
+def encode_protocol_value(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+@contextlib.contextmanager
+def plant_protocol_scope(plant_id: str) -> Iterator[None]:
+    global PROTOCOL_PLANT_ID
+    if PROTOCOL_PLANT_ID is None:
+        PROTOCOL_PLANT_ID = load_contextvars().ContextVar("protocol_plant_id", default=None)
+    plant_id_var = PROTOCOL_PLANT_ID
+    token = plant_id_var.set(plant_id)
+    try:
+        yield
+    finally:
+        plant_id_var.reset(token)
+
+
+def copy_protocol_context() -> Callable[..., Any]:
+    if PROTOCOL_PLANT_ID is None:
+        return call_in_context
+    return load_contextvars().copy_context().run
+
+
+def call_in_context(target: Callable[..., Any], *args: Any) -> Any:
+    return target(*args)
+
+
+def load_contextvars() -> ModuleType:
+    import contextvars
+
+    return contextvars
+
+
+def log_error(message: str) -> None:
+    sys.stderr.write(message + "\n")
+    sys.stderr.flush()
+
+
+def format_exception_message(exc: BaseException) -> str:
+    message = str(exc).strip()
+    return message or exc.__class__.__name__
+
+
+def log_exception(exc: BaseException) -> None:
+    if isinstance(exc, RuntimeError):
+        log_error(str(exc))
+        return
+    log_error(traceback.format_exc())
+
+
+def parse_command_line(raw_line: str | bytes) -> Optional[Dict[str, Any]]:
+    line = raw_line.strip()
+    if not line:
+        return None
+    try:
+        payload = json.loads(line)
+    except Exception as exc:  # noqa: BLE001
+        emit("error", {"message": f"Comando JSON inválido: {exc}"})
+        return None
+
+    if not isinstance(payload, dict):
+        emit("error", {"message": "Comando recebido deve ser um objeto JSON"})
+        return None
+    return cast(Dict[str, Any], payload)
+
+
+def spawn_command_reader(deliver: Callable[[Dict[str, Any]], Any]) -> None:
+    def _reader() -> None:
+        for raw_line in sys.stdin:
+            command = parse_command_line(raw_line)
+            if command is not None:
+                deliver(command)
+
+    thread = threading.Thread(target=_reader, daemon=True, name="stdin-command-reader")
+    thread.start()
@@ -0,0 +1,485 @@
+from __future__ import annotations
+
+import json
+import math
+import mmap
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from collections import deque
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional, Sequence
+
+from runner_engine import BINARY_TELEMETRY_SCALARS
+from runner_protocol import copy_protocol_context
+
+if TYPE_CHECKING:
+    from runner_engine import RuntimeRecorder
+    from runner_transports import BinaryTelemetryEncoder
+
+RECORDER_FILE_MAGIC = b"SNBCOL01"
+RECORDER_HEADER_LENGTH = struct.Struct("<I")
+RECORDER_CHUNK_MAGIC = b"CHNK"
+RECORDER_CHUNK_HEADER = struct.Struct("<4sIQQI")
+RECORDER_COLUMN_LENGTH = struct.Struct("<I")
+RECORDER_INDEX_ENTRY = struct.Struct("<QQQI")
+RECORDER_JOIN_TIMEOUT_S = 5.0
+RECORDER_PYRAMID_MAGIC = b"SNBPYR01"
+RECORDER_PYRAMID_HEADER = struct.Struct("<8sIIQII")
+RECORDER_PYRAMID_LEVEL = struct.Struct("<QQQ")
+RECORDER_PYRAMID_CHUNK = struct.Struct("<QQ")
+RECORDER_PYRAMID_STATS = ("min", "max", "mean", "count")
+RECORDER_PYRAMID_FACTOR = 16
+RECORDER_QUERY_AXIS = "uptime_s"
+
+
+class ColumnarRecorder:
+    def __init__(self, path: Path, encoder: BinaryTelemetryEncoder, options: RuntimeRecorder) -> None:
+        self.path = path
+        self.index_path = path.with_name(f"{path.name}.idx")
+        self.encoder = encoder
+        self.options = options
+        self.columns = [
+            "cycle_id",
+            *BINARY_TELEMETRY_SCALARS,
+            *(f"{group_name}.{variable_id}" for group_name, ids in encoder.groups for variable_id in ids),
+        ]
+        self.cycle_ids = array("Q")
+        self.values = [array("d") for _ in range(len(self.columns) - 1)]
+        self.dropped_chunks = 0
+        self.failure: Optional[str] = None
+        self.pending: Deque[tuple[array, List[array]]] = deque()
+        self.condition = threading.Condition()
+        self.closed = False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.data_file = open(path, "wb")
+        self.index_file = open(self.index_path, "wb")
+        header = json.dumps(
+            {
+                "schema": encoder.schema.serialize(),
+                "columns": self.columns,
+                "compression": "zlib",
+                "byte_order": "little",
+            }
+        ).encode("utf-8")
+        self.data_file.write(RECORDER_FILE_MAGIC + RECORDER_HEADER_LENGTH.pack(len(header)) + header)
+        self.thread = threading.Thread(
+            target=copy_protocol_context(),
+            args=(self._run,),
+            daemon=True,
+            name="telemetry-recorder",
+        )
+        self.thread.start()
+
+    def record(self, payload: Dict[str, Any]) -> bool:
+        self.cycle_ids.append(int(payload.get("cycle_id", 0)))
+        for column, value in zip(self.values, self.encoder.row_values(payload)):
+            column.append(value)
+        if len(self.cycle_ids) >= self.options.chunk_cycles:
+            return self.flush()
+        return True
+
+    def flush(self) -> bool:
+        if not self.cycle_ids:
+            return True
+        chunk = (self.cycle_ids, self.values)
+        self.cycle_ids = array("Q")
+        self.values = [array("d") for _ in range(len(self.columns) - 1)]
+        with self.condition:
+            if len(self.pending) >= self.options.queue_chunks:
+                self.dropped_chunks += 1
+                return False
+            self.pending.append(chunk)
+            self.condition.notify_all()
+        return True
+
+    def close(self) -> None:
+        self.flush()
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.thread.join(timeout=RECORDER_JOIN_TIMEOUT_S)
+
+    def take_failure(self) -> Optional[str]:
+        with self.condition:
+            failure = self.failure
+            self.failure = None
+        return failure
+
+    def _run(self) -> None:
+        try:
+            while True:
+                with self.condition:
+                    while not self.pending and not self.closed:
+                        self.condition.wait()
+                    if not self.pending:
+                        return
+                    cycle_ids, values = self.pending.popleft()
+                self._write_chunk(cycle_ids, values)
+        except Exception as exc:  # noqa: BLE001
+            with self.condition:
+                self.failure = f"Falha ao gravar execução em {self.path}: {exc}"
+        finally:
+            self.data_file.close()
+            self.index_file.close()
+
+    def _write_chunk(self, cycle_ids: array, values: List[array]) -> None:
+        offset = self.data_file.tell()
+        parts = [
+            RECORDER_CHUNK_HEADER.pack(
+                RECORDER_CHUNK_MAGIC,
+                len(cycle_ids),
+                cycle_ids[0],
+                cycle_ids[-1],
+                len(self.columns),
+            )
+        ]
+        for column in (cycle_ids, *values):
+            if sys.byteorder == "big":
+                column.byteswap()
+            compressed = zlib.compress(column.tobytes(), self.options.compression_level)
+            parts.append(RECORDER_COLUMN_LENGTH.pack(len(compressed)))
+            parts.append(compressed)
+        self.data_file.write(b"".join(parts))
+        self.data_file.flush()
+        self.index_file.write(RECORDER_INDEX_ENTRY.pack(cycle_ids[0], cycle_ids[-1], offset, len(cycle_ids)))
+        self.index_file.flush()
+
+
+class RecordingReader:
+    def __init__(self, path: Path, factor: int = RECORDER_PYRAMID_FACTOR) -> None:
+        self.path = path
+        self.index_path = path.with_name(f"{path.name}.idx")
+        self.pyramid_path = path.with_name(f"{path.name}.pyr")
+        self.factor = factor
+        self.file = open(path, "rb")
+        try:
+            self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self.file.close()
+            raise
+        try:
+            if self.buffer[: len(RECORDER_FILE_MAGIC)] != RECORDER_FILE_MAGIC:
+                raise RuntimeError(f"Arquivo de gravação inválido: '{path}'")
+            (header_length,) = RECORDER_HEADER_LENGTH.unpack_from(self.buffer, len(RECORDER_FILE_MAGIC))
+            header_start = len(RECORDER_FILE_MAGIC) + RECORDER_HEADER_LENGTH.size
+            header = json.loads(self.buffer[header_start : header_start + header_length])
+            self.columns: List[str] = list(header["columns"])
+            self._open_pyramid()
+        except BaseException:
+            self.buffer.close()
+            self.file.close()
+            raise
+
+    def query(
+        self,
+        variable: str,
+        start: float,
+        end: float,
+        points: int,
+        axis: str = RECORDER_QUERY_AXIS,
+    ) -> Dict[str, Any]:
+        if points <= 0:
+            raise RuntimeError("points deve ser um inteiro positivo")
+        value_column = self._column_index(variable)
+        axis_column = self._column_index(axis)
+        result: Dict[str, Any] = {
+            "variable": variable,
+            "axis": axis,
+            "time": [],
+            "min": [],
+            "max": [],
+            "mean": [],
+        }
+        if not self.levels or end < start:
+            return result
+
+        first_row = self._find_row(axis_column, start, after=False)
+        last_row = self._find_row(axis_column, end, after=True)
+        if last_row <= first_row:
+            return result
+
+        times, mins, maxs, means, counts = self._query_source(value_column, axis_column, first_row, last_row, points)
+        output_count = min(points, len(times))
+        for output in range(output_count):
+            group_start = len(times) * output // output_count
+            group_end = len(times) * (output + 1) // output_count
+            total = sum(counts[group_start:group_end])
+            result["time"].append(times[group_start])
+            if total <= 0:
+                result["min"].append(None)
+                result["max"].append(None)
+                result["mean"].append(None)
+                continue
+            result["min"].append(min(value for value in mins[group_start:group_end] if value == value))
+            result["max"].append(max(value for value in maxs[group_start:group_end] if value == value))
+            result["mean"].append(
+                sum(
+                    mean * count
+                    for mean, count in zip(means[group_start:group_end], counts[group_start:group_end])
+                    if count > 0
+                )
+                / total
+            )
+        return result
+
+    def close(self) -> None:
+        self.pyramid.close()
+        self.pyramid_file.close()
+        self.buffer.close()
+        self.file.close()
+
+    def _column_index(self, name: str) -> int:
+        try:
+            return self.columns.index(name)
+        except ValueError:
+            raise RuntimeError(f"Coluna '{name}' não existe na gravação '{self.path}'") from None
+
+    def _open_pyramid(self) -> None:
+        entries = self._read_index()
+        if not self._pyramid_is_current(len(entries)):
+            self._build_pyramid(entries)
+        self.pyramid_file = open(self.pyramid_path, "rb")
+        try:
+            self.pyramid = mmap.mmap(self.pyramid_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self.pyramid_file.close()
+            raise
+        _, _, _, self.row_count, self.chunk_count, level_count = RECORDER_PYRAMID_HEADER.unpack_from(
+            self.pyramid,
+            0,
+        )
+        self.levels = [
+            RECORDER_PYRAMID_LEVEL.unpack_from(
+                self.pyramid,
+                RECORDER_PYRAMID_HEADER.size + level * RECORDER_PYRAMID_LEVEL.size,
+            )
+            for level in range(level_count)
+        ]
+        self.chunk_table_offset = RECORDER_PYRAMID_HEADER.size + level_count * RECORDER_PYRAMID_LEVEL.size
+
+    def _read_index(self) -> List[tuple[int, int, int, int]]:
+        if not self.index_path.exists():
+            return []
+        raw = self.index_path.read_bytes()
+        return list(RECORDER_INDEX_ENTRY.iter_unpack(raw[: len(raw) - len(raw) % RECORDER_INDEX_ENTRY.size]))
+
+    def _pyramid_is_current(self, chunk_count: int) -> bool:
+        if not self.pyramid_path.exists():
+            return False
+        with open(self.pyramid_path, "rb") as pyramid_file:
+            raw = pyramid_file.read(RECORDER_PYRAMID_HEADER.size)
+        if len(raw) < RECORDER_PYRAMID_HEADER.size:
+            return False
+        magic, factor, column_count, _, stored_chunks, _ = RECORDER_PYRAMID_HEADER.unpack(raw)
+        return (
+            magic == RECORDER_PYRAMID_MAGIC
+            and factor == self.factor
+            and column_count == len(self.columns)
+            and stored_chunks == chunk_count
+        )
+
+    def _build_pyramid(self, entries: List[tuple[int, int, int, int]]) -> None:
+        row_count = sum(rows for _, _, _, rows in entries)
+        levels: List[tuple[int, int]] = []
+        bucket_rows = self.factor
+        while row_count > 0:
+            bucket_count = -(-row_count // bucket_rows)
+            levels.append((bucket_rows, bucket_count))
+            if bucket_count == 1:
+                break
+            bucket_rows *= self.factor
+
+        column_count = len(self.columns)
+        stat_count = len(RECORDER_PYRAMID_STATS)
+        offset = (
+            RECORDER_PYRAMID_HEADER.size
+            + len(levels) * RECORDER_PYRAMID_LEVEL.size
+            + len(entries) * RECORDER_PYRAMID_CHUNK.size
+        )
+        table: List[tuple[int, int, int]] = []
+        for bucket_rows, bucket_count in levels:
+            table.append((bucket_rows, bucket_count, offset))
+            offset += column_count * stat_count * bucket_count * 8
+
+        temporary = self.pyramid_path.with_name(f"{self.pyramid_path.name}.tmp")
+        with open(temporary, "wb") as output:
+            output.write(
+                RECORDER_PYRAMID_HEADER.pack(
+                    RECORDER_PYRAMID_MAGIC,
+                    self.factor,
+                    column_count,
+                    row_count,
+                    len(entries),
+                    len(levels),
+                )
+            )
+            for level in table:
+                output.write(RECORDER_PYRAMID_LEVEL.pack(*level))
+            start_row = 0
+            for _, _, chunk_offset, rows in entries:
+                output.write(RECORDER_PYRAMID_CHUNK.pack(start_row, chunk_offset))
+                start_row += rows
+            for column in range(column_count):
+                stats = self._bucket_column(entries, column)
+                for bucket_rows, bucket_count, level_offset in table:
+                    if bucket_rows > self.factor:
+                        stats = merge_pyramid_stats(stats, self.factor)
+                    output.seek(level_offset + column * stat_count * bucket_count * 8)
+                    for values in stats:
+                        output.write(struct.pack(f"<{bucket_count}d", *values))
+        temporary.replace(self.pyramid_path)
+
+    def _bucket_column(
+        self,
+        entries: List[tuple[int, int, int, int]],
+        column: int,
+    ) -> tuple[List[float], ...]:
+        stats: tuple[List[float], ...] = ([], [], [], [])
+        pending: List[float] = []
+        for _, _, chunk_offset, _ in entries:
+            pending.extend(self._decode_column(chunk_offset, column))
+            complete = len(pending) - len(pending) % self.factor
+            for start in range(0, complete, self.factor):
+                append_pyramid_bucket(stats, pending[start : start + self.factor])
+            del pending[:complete]
+        if pending:
+            append_pyramid_bucket(stats, pending)
+        return stats
+
+    def _decode_column(self, chunk_offset: int, column: int) -> array:
+        magic, _, _, _, _ = RECORDER_CHUNK_HEADER.unpack_from(self.buffer, chunk_offset)
+        if magic != RECORDER_CHUNK_MAGIC:
+            raise RuntimeError(f"Bloco corrompido em '{self.path}' (offset {chunk_offset})")
+        position = chunk_offset + RECORDER_CHUNK_HEADER.size
+        for _ in range(column):
+            (length,) = RECORDER_COLUMN_LENGTH.unpack_from(self.buffer, position)
+            position += RECORDER_COLUMN_LENGTH.size + length
+        (length,) = RECORDER_COLUMN_LENGTH.unpack_from(self.buffer, position)
+        position += RECORDER_COLUMN_LENGTH.size
+        values = array("Q" if column == 0 else "d", zlib.decompress(self.buffer[position : position + length]))
+        if sys.byteorder == "big":
+            values.byteswap()
+        return values
+
+    def _raw_values(self, column: int, first_row: int, last_row: int) -> List[float]:
+        low, high = 0, self.chunk_count
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self._chunk_entry(middle)[0] <= first_row:
+                low = middle
+            else:
+                high = middle
+        values: List[float] = []
+        chunk = low
+        while chunk < self.chunk_count:
+            chunk_start, chunk_offset = self._chunk_entry(chunk)
+            if chunk_start >= last_row:
+                break
+            decoded = self._decode_column(chunk_offset, column)
+            values.extend(
+                float(value)
+                for value in decoded[max(0, first_row - chunk_start) : max(0, last_row - chunk_start)]
+            )
+            chunk += 1
+        return values
+
+    def _chunk_entry(self, chunk: int) -> tuple[int, int]:
+        return RECORDER_PYRAMID_CHUNK.unpack_from(
+            self.pyramid,
+            self.chunk_table_offset + chunk * RECORDER_PYRAMID_CHUNK.size,
+        )
+
+    def _level_stat(self, level: int, column: int, stat: int, first: int, last: int) -> tuple[float, ...]:
+        _, bucket_count, level_offset = self.levels[level]
+        offset = level_offset + ((column * len(RECORDER_PYRAMID_STATS) + stat) * bucket_count + first) * 8
+        return struct.unpack_from(f"<{last - first}d", self.pyramid, offset)
+
+    def _find_row(self, axis_column: int, target: float, after: bool) -> int:
+        bucket_rows, bucket_count, _ = self.levels[0]
+
+        def reached(value: float) -> bool:
+            return value > target if after else value >= target
+
+        low, high = 0, bucket_count
+        while low < high:
+            middle = (low + high) // 2
+            if reached(self._level_stat(0, axis_column, 0, middle, middle + 1)[0]):
+                high = middle
+            else:
+                low = middle + 1
+        if low == 0:
+            return 0
+        first_row = (low - 1) * bucket_rows
+        last_row = min(low * bucket_rows, self.row_count)
+        for offset, value in enumerate(self._raw_values(axis_column, first_row, last_row)):
+            if reached(value):
+                return first_row + offset
+        return last_row
+
+    def _query_source(
+        self,
+        value_column: int,
+        axis_column: int,
+        first_row: int,
+        last_row: int,
+        points: int,
+    ) -> tuple[Sequence[float], ...]:
+        chosen: Optional[tuple[int, int, int]] = None
+        for level, (bucket_rows, _, _) in enumerate(self.levels):
+            first_bucket = first_row // bucket_rows
+            last_bucket = -(-last_row // bucket_rows)
+            if last_bucket - first_bucket < points:
+                break
+            chosen = (level, first_bucket, last_bucket)
+
+        if chosen is None:
+            values = self._raw_values(value_column, first_row, last_row)
+            counts = [1.0 if value == value else 0.0 for value in values]
+            return self._raw_values(axis_column, first_row, last_row), values, values, values, counts
+
+        level, first_bucket, last_bucket = chosen
+        return (
+            self._level_stat(level, axis_column, 0, first_bucket, last_bucket),
+            *(
+                self._level_stat(level, value_column, stat, first_bucket, last_bucket)
+                for stat in range(len(RECORDER_PYRAMID_STATS))
+            ),
+        )
+
+
+def append_pyramid_bucket(stats: tuple[List[float], ...], values: List[float]) -> None:
+    finite = [value for value in values if value == value]
+    mins, maxs, means, counts = stats
+    if not finite:
+        mins.append(math.nan)
+        maxs.append(math.nan)
+        means.append(math.nan)
+        counts.append(0.0)
+        return
+    mins.append(min(finite))
+    maxs.append(max(finite))
+    means.append(math.fsum(finite) / len(finite))
+    counts.append(float(len(finite)))
+
+
+def merge_pyramid_stats(stats: tuple[List[float], ...], factor: int) -> tuple[List[float], ...]:
+    mins, maxs, means, counts = stats
+    merged: tuple[List[float], ...] = ([], [], [], [])
+    for start in range(0, len(counts), factor):
+        end = start + factor
+        total = sum(counts[start:end])
+        if total <= 0:
+            for values in merged[:3]:
+                values.append(math.nan)
+            merged[3].append(0.0)
+            continue
+        merged[0].append(min(value for value in mins[start:end] if value == value))
+        merged[1].append(max(value for value in maxs[start:end] if value == value))
+        merged[2].append(
+            sum(mean * count for mean, count in zip(means[start:end], counts[start:end]) if count > 0) / total
+        )
+        merged[3].append(total)
+    return merged
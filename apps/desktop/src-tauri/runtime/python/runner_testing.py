@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+import contextlib
+import dataclasses
+import io
+import json
+import sys
+import textwrap
+import time
+import unittest
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Iterator
+from unittest.mock import patch
+
+import runner_engine
+import runner_transports
+from benchmark_runner import write_plugin
+
+RUNNER_PATH = Path(__file__).with_name("runner.py")
+
+
+def runner_modules() -> list[ModuleType]:
+    return [module for name, module in sorted(sys.modules.items()) if name.startswith("runner_") and name != "runner_testing"]
+
+
+@contextlib.contextmanager
+def patch_runtime(name: str, value: Any) -> Iterator[None]:
+    with contextlib.ExitStack() as stack:
+        for module in runner_modules():
+            if name in vars(module):
+                stack.enter_context(patch.object(module, name, value))
+        yield
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.monotonic_now = 1000.0
+        self.wall_now = 1700000000.0
+
+    def monotonic(self) -> float:
+        return self.monotonic_now
+
+    def time(self) -> float:
+        return self.wall_now + (self.monotonic_now - 1000.0)
+
+    def sleep(self, duration: float) -> None:
+        self.monotonic_now += max(0.0, duration)
+
+    def patch_runner(self) -> Any:
+        return patch.multiple(
+            time,
+            monotonic=self.monotonic,
+            time=self.time,
+            sleep=self.sleep,
+        )
+
+
+class RunnerTestCase(unittest.TestCase):
+    BATCH_CONTROLLER_SOURCE = """
+        class BatchController:
+            batch_calls = 0
+
+            def __init__(self, context):
+                self.context = context
+
+            def compute(self, snapshot):
+                sensor_id = self.context.controller.input_variable_ids[0]
+                error = snapshot["setpoints"][sensor_id] - snapshot["sensors"][sensor_id]
+                return {self.context.controller.output_variable_ids[0]: error}
+
+            @classmethod
+            def compute_batch(cls, batch):
+                cls.batch_calls += 1
+                return batch.setpoints - batch.inputs
+    """
+
+    def build_bootstrap(self, root: Path) -> Any:
+        plant_variables = [
+            runner_engine.VariableSpec(
+                id="sensor_1",
+                name="Sensor 1",
+                type="sensor",
+                unit="C",
+                setpoint=42.0,
+                pv_min=0.0,
+                pv_max=100.0,
+                linked_sensor_ids=[],
+            ),
+            runner_engine.VariableSpec(
+                id="actuator_1",
+                name="Actuator 1",
+                type="actuator",
+                unit="%",
+                setpoint=0.0,
+                pv_min=0.0,
+                pv_max=100.0,
+                linked_sensor_ids=["sensor_1"],
+            ),
+        ]
+
+        variables_by_id = {variable.id: variable for variable in plant_variables}
+        plant = runner_engine.PlantContext(
+            id="plant_1",
+            name="Plant 1",
+            variables=plant_variables,
+            variables_by_id=variables_by_id,
+            sensors=runner_engine.IOGroup(
+                ids=["sensor_1"],
+                count=1,
+                variables=[variables_by_id["sensor_1"]],
+                variables_by_id={"sensor_1": variables_by_id["sensor_1"]},
+            ),
+            actuators=runner_engine.IOGroup(
+                ids=["actuator_1"],
+                count=1,
+                variables=[variables_by_id["actuator_1"]],
+                variables_by_id={"actuator_1": variables_by_id["actuator_1"]},
+            ),
+            setpoints={"sensor_1": 42.0, "actuator_1": 0.0},
+        )
+
+        runtime = runner_engine.RuntimeContext(
+            id="rt_1",
+            timing=runner_engine.RuntimeTiming(
+                owner="runtime",
+                clock="monotonic",
+                strategy="deadline",
+                sample_time_ms=100,
+            ),
+            supervision=runner_engine.RuntimeSupervision(
+                owner="rust",
+                startup_timeout_ms=12000,
+                shutdown_timeout_ms=4000,
+            ),
+            paths=runner_engine.RuntimePaths(
+                runtime_dir=str(root / "runtime"),
+                venv_python_path=str(root / ".venv" / "bin" / "python"),
+                runner_path=str(root / "runtime" / "runner.py"),
+                bootstrap_path=str(root / "runtime" / "bootstrap.json"),
+            ),
+        )
+
+        driver_dir = root / "driver_plugin"
+        driver_dir.mkdir()
+        (driver_dir / "main.py").write_text(
+            textwrap.dedent(
+                """
+                from typing import Any, Dict
+
+                class ContractDriver:
+                    def __init__(self, context: Any) -> None:
+                        if hasattr(context, "runtime"):
+                            raise RuntimeError("driver context leaked runtime")
+                        self.context = context
+                        self.context_keys = set(vars(context).keys())
+
+                    def connect(self) -> bool:
+                        return True
+
+                    def stop(self) -> bool:
+                        return True
+
+                    def read(self) -> Dict[str, Dict[str, float]]:
+                        return {
+                            "sensors": {"sensor_1": 1.0},
+                            "actuators": {"actuator_1": 0.0},
+                        }
+
+                    def write(self, outputs: Dict[str, float]) -> bool:
+                        return True
+                """
+            ).strip()
+            + "\n",
+            encoding="utf-8",
+        )
+
+        controller_dir = root / "controller_plugin"
+        controller_dir.mkdir()
+        (controller_dir / "main.py").write_text(
+            textwrap.dedent(
+                """
+                from typing import Any, Dict
+
+                class ContractController:
+                    def __init__(self, context: Any) -> None:
+                        if hasattr(context, "runtime"):
+                            raise RuntimeError("controller context leaked runtime")
+                        self.context = context
+                        self.context_keys = set(vars(context).keys())
+                        self.controller_keys = set(vars(context.controller).keys())
+
+                    def connect(self) -> bool:
+                        return True
+
+                    def stop(self) -> bool:
+                        return True
+
+                    def compute(self, snapshot: Dict[str, Any]) -> Dict[str, float]:
+                        return {self.context.controller.output_variable_ids[0]: 0.0}
+                """
+            ).strip()
+            + "\n",
+            encoding="utf-8",
+        )
+
+        return runner_engine.RuntimeBootstrap(
+            driver=runner_engine.DriverMetadata(
+                plugin_id="driver_plugin",
+                plugin_name="Driver Plugin",
+                plugin_dir=str(driver_dir),
+                source_file="main.py",
+                class_name="ContractDriver",
+                config={"port": "COM1"},
+            ),
+            controllers=[
+                runner_engine.ControllerMetadata(
+                    id="ctrl_1",
+                    plugin_id="controller_plugin",
+                    plugin_name="Controller Plugin",
+                    plugin_dir=str(controller_dir),
+                    source_file="main.py",
+                    class_name="ContractController",
+                    name="Controller 1",
+                    controller_type="PID",
+                    active=True,
+                    input_variable_ids=["sensor_1"],
+                    output_variable_ids=["actuator_1"],
+                    params={
+                        "kp": runner_engine.ControllerParamSpec(
+                            key="kp",
+                            type="number",
+                            value=1.2,
+                            label="Kp",
+                        )
+                    },
+                )
+            ],
+            plant=plant,
+            runtime=runtime,
+        )
+
+    def with_runtime_telemetry(self, bootstrap: Any, **options: Any) -> Any:
+        return dataclasses.replace(
+            bootstrap,
+            runtime=dataclasses.replace(
+                bootstrap.runtime,
+                telemetry=dataclasses.replace(bootstrap.runtime.telemetry, **options),
+            ),
+        )
+
+    write_plugin = staticmethod(write_plugin)
+
+    def build_multi_loop_bootstrap(self, root: Path, loops: int, controller_source: str, class_name: str) -> Any:
+        bootstrap = self.build_bootstrap(root)
+        variables: list[dict[str, Any]] = []
+        for index in range(1, loops + 1):
+            variables.append({"id": f"sensor_{index}", "name": f"Sensor {index}", "type": "sensor", "unit": "C"})
+            variables.append({"id": f"actuator_{index}", "name": f"Actuator {index}", "type": "atuador", "unit": "%"})
+        plant = runner_engine.normalize_plant_context(
+            {
+                "id": "plant_multi",
+                "name": "Plant Multi",
+                "variables": variables,
+                "setpoints": {f"sensor_{index}": float(index * 10) for index in range(1, loops + 1)},
+            }
+        )
+        driver_dir = self.write_plugin(
+            root,
+            "loop_driver",
+            """
+            class LoopDriver:
+                def __init__(self, context):
+                    self.context = context
+                    self.written = []
+
+                def connect(self):
+                    return True
+
+                def stop(self):
+                    return True
+
+                def read(self):
+                    return {
+                        "sensors": {
+                            sensor_id: float(index)
+                            for index, sensor_id in enumerate(self.context.plant.sensors.ids, start=1)
+                        },
+                        "actuators": {},
+                    }
+
+                def write(self, outputs):
+                    self.written.append(dict(outputs))
+                    return True
+            """,
+        )
+        controller_dir = self.write_plugin(root, "loop_controller", controller_source)
+        return dataclasses.replace(
+            bootstrap,
+            plant=plant,
+            driver=dataclasses.replace(bootstrap.driver, plugin_dir=str(driver_dir), class_name="LoopDriver"),
+            controllers=[
+                dataclasses.replace(
+                    bootstrap.controllers[0],
+                    id=f"ctrl_{index}",
+                    name=f"Controller {index}",
+                    plugin_dir=str(controller_dir),
+                    class_name=class_name,
+                    input_variable_ids=[f"sensor_{index}"],
+                    output_variable_ids=[f"actuator_{index}"],
+                )
+                for index in range(1, loops + 1)
+            ],
+        )
+
+    def capture_protocol_stdout(self) -> io.TextIOWrapper:
+        return io.TextIOWrapper(io.BytesIO(), encoding="utf-8", write_through=True)
+
+    def split_protocol_stream(self, raw: bytes) -> tuple[list[dict[str, Any]], list[bytes]]:
+        messages: list[dict[str, Any]] = []
+        frames: list[bytes] = []
+        offset = 0
+        while offset < len(raw):
+            if raw[offset:offset + 1] == runner_engine.BINARY_FRAME_MAGIC:
+                (length,) = runner_transports.BINARY_FRAME_HEADER.unpack_from(raw, offset + 1)
+                body_start = offset + 1 + runner_transports.BINARY_FRAME_HEADER.size
+                frames.append(raw[body_start:body_start + length])
+                offset = body_start + length
+                continue
+            line_end = raw.index(b"\n", offset)
+            messages.append(json.loads(raw[offset:line_end]))
+            offset = line_end + 1
+        return messages, frames
@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import math
+import mmap
+import struct
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, TypeAlias
+
+from runner_engine import BINARY_FRAME_MAGIC, BINARY_TELEMETRY_SCALARS
+from runner_protocol import PublishMetrics, emit_bytes
+
+if TYPE_CHECKING:
+    from runner_engine import TelemetrySchema
+
+TELEMETRY_RING_MAGIC = b"SNBRING1"
+TELEMETRY_RING_VERSION = 1
+TELEMETRY_RING_HEADER = struct.Struct("<8sIIIII")
+TELEMETRY_RING_HEAD = struct.Struct("<Q")
+TELEMETRY_RING_HEAD_OFFSET = 32
+TELEMETRY_RING_HEADER_SIZE = 64
+BINARY_FRAME_HEADER = struct.Struct("<I")
+BINARY_TELEMETRY_PREFIX = struct.Struct("<IQ")
+TELEMETRY_DISPLAY_LAST_VALUE_FIELDS = (
+    "written_cycle_id",
+    "configured_sample_time_ms",
+    "jitter_mean_ms",
+    "jitter_max_ms",
+    "jitter_std_ms",
+)
+DELTA_TELEMETRY_FIELDS = ("phase",)
+
+
+class BinaryTelemetryEncoder:
+    def __init__(self, schema: TelemetrySchema) -> None:
+        self.schema = schema
+        self.groups = schema.groups()
+        value_count = len(BINARY_TELEMETRY_SCALARS) + sum(len(ids) for _, ids in self.groups)
+        self.values_struct = struct.Struct(f"<{value_count}d")
+        self.record_size = BINARY_TELEMETRY_PREFIX.size + self.values_struct.size
+
+    def encode(self, payload: Dict[str, Any]) -> bytes:
+        return BINARY_TELEMETRY_PREFIX.pack(
+            self.schema.schema_id,
+            int(payload.get("cycle_id", 0)),
+        ) + self.values_struct.pack(*self.row_values(payload))
+
+    def encode_into(self, buffer: Any, offset: int, payload: Dict[str, Any]) -> None:
+        BINARY_TELEMETRY_PREFIX.pack_into(
+            buffer,
+            offset,
+            self.schema.schema_id,
+            int(payload.get("cycle_id", 0)),
+        )
+        self.values_struct.pack_into(buffer, offset + BINARY_TELEMETRY_PREFIX.size, *self.row_values(payload))
+
+    def row_values(self, payload: Dict[str, Any]) -> List[float]:
+        values = [
+            math.nan if payload.get(name) is None else float(payload[name])
+            for name in BINARY_TELEMETRY_SCALARS
+        ]
+        for group_name, ids in self.groups:
+            group = payload.get(group_name) or {}
+            values.extend(group.get(variable_id, float("nan")) for variable_id in ids)
+        return values
+
+
+def telemetry_values_equal(value: Any, last: Any) -> bool:
+    if isinstance(value, float) and isinstance(last, float) and math.isnan(value) and math.isnan(last):
+        return True
+    return value == last
+
+
+class DeltaTelemetryEncoder:
+    def __init__(self, schema: TelemetrySchema, keyframe_cycles: int) -> None:
+        self.schema = schema
+        self.groups = schema.groups()
+        self.keyframe_cycles = keyframe_cycles
+        self.keys = [
+            *DELTA_TELEMETRY_FIELDS,
+            *BINARY_TELEMETRY_SCALARS,
+            *(f"{group_name}.{variable_id}" for group_name, ids in self.groups for variable_id in ids),
+        ]
+        self.previous: Optional[List[Any]] = None
+        self.cycles_since_keyframe = 0
+
+    def encode(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        values = self._values(payload)
+        item: Dict[str, Any] = {
+            "schema_id": self.schema.schema_id,
+            "cycle_id": payload.get("cycle_id"),
+        }
+        previous = self.previous
+        self.previous = values
+        if previous is None or self.cycles_since_keyframe + 1 >= self.keyframe_cycles:
+            self.cycles_since_keyframe = 0
+            item["keyframe"] = values
+            return item
+
+        self.cycles_since_keyframe += 1
+        changes: List[Any] = []
+        for index, (value, last) in enumerate(zip(values, previous)):
+            if not telemetry_values_equal(value, last):
+                changes.append(index)
+                changes.append(value)
+        item["changes"] = changes
+        return item
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "schema_id": self.schema.schema_id,
+            "keys": self.keys,
+            "keyframe_cycles": self.keyframe_cycles,
+        }
+
+    def _values(self, payload: Dict[str, Any]) -> List[Any]:
+        values = [payload.get(name) for name in DELTA_TELEMETRY_FIELDS]
+        values.extend(payload.get(name) for name in BINARY_TELEMETRY_SCALARS)
+        for group_name, ids in self.groups:
+            group = payload.get(group_name) or {}
+            values.extend(group.get(variable_id) for variable_id in ids)
+        return values
+
+
+TelemetryEncoder: TypeAlias = BinaryTelemetryEncoder | DeltaTelemetryEncoder
+
+
+class TelemetryRingWriter:
+    def __init__(self, path: Path, encoder: BinaryTelemetryEncoder, capacity: int) -> None:
+        self.path = path
+        self.encoder = encoder
+        self.capacity = capacity
+        self.head = 0
+        size = TELEMETRY_RING_HEADER_SIZE + capacity * encoder.record_size
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(path, "w+b")
+        try:
+            self.file.truncate(size)
+            self.buffer = mmap.mmap(self.file.fileno(), size)
+        except BaseException:
+            self.file.close()
+            raise
+        TELEMETRY_RING_HEADER.pack_into(
+            self.buffer,
+            0,
+            TELEMETRY_RING_MAGIC,
+            TELEMETRY_RING_VERSION,
+            TELEMETRY_RING_HEADER_SIZE,
+            encoder.record_size,
+            capacity,
+            encoder.schema.schema_id,
+        )
+        TELEMETRY_RING_HEAD.pack_into(self.buffer, TELEMETRY_RING_HEAD_OFFSET, 0)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "path": str(self.path),
+            "header_size": TELEMETRY_RING_HEADER_SIZE,
+            "head_offset": TELEMETRY_RING_HEAD_OFFSET,
+            "record_size": self.encoder.record_size,
+            "capacity": self.capacity,
+        }
+
+    def write(self, payload: Dict[str, Any]) -> int:
+        slot = self.head % self.capacity
+        self.encoder.encode_into(
+            self.buffer,
+            TELEMETRY_RING_HEADER_SIZE + slot * self.encoder.record_size,
+            payload,
+        )
+        self.head += 1
+        TELEMETRY_RING_HEAD.pack_into(self.buffer, TELEMETRY_RING_HEAD_OFFSET, self.head)
+        return self.head
+
+    def close(self, remove: bool = False) -> Optional[str]:
+        self.buffer.close()
+        self.file.close()
+        if not remove:
+            return None
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            return None
+        except OSError as exc:
+            return f"Falha ao remover ring de telemetria {self.path}: {exc}"
+        return None
+
+
+class TelemetryDisplayDecimator:
+    def __init__(self, rate_hz: float) -> None:
+        self.interval_s = 1.0 / rate_hz
+        self.started_at: Optional[float] = None
+        self.first_cycle_id: Optional[int] = None
+        self.cycles = 0
+        self.last: Dict[str, Any] = {}
+        self.scalars: Dict[str, List[Any]] = {}
+        self.groups: Dict[str, Dict[str, List[Any]]] = {}
+
+    def add(self, payload: Dict[str, Any], now: float) -> Optional[Dict[str, Any]]:
+        if self.started_at is None:
+            self.started_at = now
+            self.first_cycle_id = payload.get("cycle_id")
+        self.cycles += 1
+        for key, value in payload.items():
+            if isinstance(value, Mapping):
+                group = self.groups.setdefault(key, {})
+                for variable_id, variable_value in value.items():
+                    update_display_bucket(group, variable_id, variable_value)
+            elif key in BINARY_TELEMETRY_SCALARS and key not in TELEMETRY_DISPLAY_LAST_VALUE_FIELDS:
+                update_display_bucket(self.scalars, key, value)
+            else:
+                self.last[key] = value
+        if now - self.started_at >= self.interval_s:
+            return self.take()
+        return None
+
+    def take(self) -> Optional[Dict[str, Any]]:
+        if self.cycles == 0:
+            return None
+        display: Dict[str, Any] = {
+            **self.last,
+            "first_cycle_id": self.first_cycle_id,
+            "cycles": self.cycles,
+        }
+        for name, (minimum, maximum, last) in self.scalars.items():
+            display[name] = {"min": minimum, "max": maximum, "last": last}
+        for group_name, group in self.groups.items():
+            display[group_name] = {
+                variable_id: {"min": minimum, "max": maximum, "last": last}
+                for variable_id, (minimum, maximum, last) in group.items()
+            }
+        self.started_at = None
+        self.first_cycle_id = None
+        self.cycles = 0
+        self.last = {}
+        self.scalars = {}
+        self.groups = {}
+        return display
+
+
+def update_display_bucket(buckets: Dict[str, List[Any]], key: str, value: Any) -> None:
+    if value is None or value != value:
+        return
+    bucket = buckets.get(key)
+    if bucket is None:
+        buckets[key] = [value, value, value]
+        return
+    if value < bucket[0]:
+        bucket[0] = value
+    if value > bucket[1]:
+        bucket[1] = value
+    bucket[2] = value
+
+
+def emit_frames(bodies: List[bytes]) -> PublishMetrics:
+    started_at = time.monotonic()
+    data = b"".join(
+        BINARY_FRAME_MAGIC + BINARY_FRAME_HEADER.pack(len(body)) + body
+        for body in bodies
+    )
+    return emit_bytes(data, started_at)
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import contextlib
+import math
+import sys
+import time
+import traceback
+from array import array
+from pathlib import Path
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Dict, Optional, cast
+
+from runner_engine import (
+    CONTROLLER_READ_ONLY_SNAPSHOT_ATTR,
+    CONTROLLER_REQUIRED_METHODS,
+    CONTROLLER_WORKER_JOIN_TIMEOUT_S,
+    ControllerSnapshotBuilder,
+    build_controller_plugin_context,
+    build_public_controller_metadata,
+    instantiate_plugin,
+    load_plugin_class,
+    maybe_call_optional_connect,
+    maybe_call_optional_stop,
+    normalize_controller_outputs,
+)
+from runner_protocol import format_exception_message, log_error
+
+if TYPE_CHECKING:
+    from runner_engine import ControllerMetadata, PlantContext, PlantVectorLayout
+
+CONTROLLER_WORKER_START_METHOD = "spawn"
+CONTROLLER_WORKER_HEADER_SLOTS = 3
+CONTROLLER_WORKER_STARTUP_TIMEOUT_S = 15.0
+
+
+class ProcessControllerWorker:
+    def __init__(self, controller: ControllerMetadata, layout: PlantVectorLayout) -> None:
+        self.controller = controller
+        self.layout = layout
+        multiprocessing = load_multiprocessing()
+        shared_memory = load_shared_memory()
+
+        self.output_offset = CONTROLLER_WORKER_HEADER_SLOTS + len(layout.sensor_ids) + len(layout.actuator_ids)
+        self.memory = shared_memory.SharedMemory(
+            create=True,
+            size=(self.output_offset + len(controller.output_variable_ids)) * 8,
+        )
+        self.values = self.memory.buf.cast("d")
+        mp_context = multiprocessing.get_context(CONTROLLER_WORKER_START_METHOD)
+        self.connection, worker_connection = mp_context.Pipe()
+        self.process = mp_context.Process(
+            target=run_controller_worker,
+            args=(controller, layout.plant, self.memory.name, worker_connection),
+            name=f"controller-{controller.id}",
+            daemon=True,
+        )
+        self.sequence = 0
+        self.pending_sequence: Optional[int] = None
+        self.setpoints_source: Optional[Dict[str, float]] = None
+        self.last_outputs: Dict[str, float] = {}
+        self.missing_deadline = False
+        self.missed_deadlines = 0
+        try:
+            self.process.start()
+            worker_connection.close()
+            if not self.connection.poll(CONTROLLER_WORKER_STARTUP_TIMEOUT_S):
+                raise RuntimeError("Processo do controlador não respondeu durante a inicialização")
+            status, detail = self._receive()
+            if status != "ready":
+                raise RuntimeError(str(detail))
+        except BaseException:
+            self.stop()
+            raise
+
+    @property
+    def deadline_s(self) -> Optional[float]:
+        if self.controller.execution.deadline_ms <= 0.0:
+            return None
+        return self.controller.execution.deadline_ms / 1000.0
+
+    def submit(
+        self,
+        cycle_id: int,
+        cycle_started_at: float,
+        dt_ms: float,
+        sensors: array,
+        actuators: array,
+    ) -> bool:
+        if self.pending_sequence is not None and not self._drain(0.0):
+            return False
+
+        values = self.values
+        values[0] = float(cycle_id)
+        values[1] = cycle_started_at
+        values[2] = dt_ms
+        sensor_end = CONTROLLER_WORKER_HEADER_SLOTS + len(sensors)
+        values[CONTROLLER_WORKER_HEADER_SLOTS:sensor_end] = sensors
+        values[sensor_end:self.output_offset] = actuators
+
+        setpoints: Optional[Dict[str, float]] = None
+        if self.setpoints_source is not self.layout.plant.setpoints:
+            self.setpoints_source = self.layout.plant.setpoints
+            setpoints = dict(self.setpoints_source)
+        self.sequence += 1
+        self.pending_sequence = self.sequence
+        self.connection.send((self.sequence, setpoints))
+        return True
+
+    def collect(self, deadline_at: float) -> Optional[Dict[str, float]]:
+        if self.pending_sequence is None:
+            return None
+        if not self._drain(max(0.0, deadline_at - time.monotonic())):
+            return None
+        return dict(self.last_outputs)
+
+    def fallback_outputs(self) -> Dict[str, float]:
+        if self.controller.execution.fallback == "zero":
+            return {variable_id: 0.0 for variable_id in self.controller.output_variable_ids}
+        return dict(self.last_outputs)
+
+    def stop(self) -> None:
+        if self.process.is_alive():
+            with contextlib.suppress(OSError, ValueError):
+                self.connection.send(None)
+            self.process.join(CONTROLLER_WORKER_JOIN_TIMEOUT_S)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(CONTROLLER_WORKER_JOIN_TIMEOUT_S)
+        self.connection.close()
+        self.values.release()
+        self.memory.close()
+        with contextlib.suppress(FileNotFoundError):
+            self.memory.unlink()
+
+    def _drain(self, timeout_s: float) -> bool:
+        if not self.connection.poll(timeout_s):
+            return False
+        self.pending_sequence = None
+        status, detail = self._receive()
+        if status != "done":
+            raise RuntimeError(str(detail))
+        self.last_outputs = {
+            variable_id: value
+            for variable_id, value in zip(
+                self.controller.output_variable_ids,
+                self.values[self.output_offset:],
+            )
+            if not math.isnan(value)
+        }
+        return True
+
+    def _receive(self) -> tuple[str, Any]:
+        try:
+            return cast(tuple[str, Any], self.connection.recv())
+        except EOFError as exc:
+            raise RuntimeError("Processo do controlador encerrou inesperadamente") from exc
+
+
+def load_multiprocessing() -> ModuleType:
+    import multiprocessing
+
+    return multiprocessing
+
+
+def load_shared_memory() -> ModuleType:
+    from multiprocessing import shared_memory
+
+    return shared_memory
+
+
+def run_controller_worker(
+    controller: ControllerMetadata,
+    plant: PlantContext,
+    memory_name: str,
+    connection: Any,
+) -> None:
+    sys.stdout = sys.stderr
+    memory = load_shared_memory().SharedMemory(name=memory_name)
+    values = memory.buf.cast("d")
+    instance: Any = None
+    try:
+        try:
+            controller_cls = load_plugin_class(
+                Path(controller.plugin_dir),
+                controller.source_file,
+                controller.class_name,
+                CONTROLLER_REQUIRED_METHODS,
+                f"controlador '{controller.name}'",
+            )
+            instance = instantiate_plugin(
+                controller_cls,
+                build_controller_plugin_context(controller, plant),
+                f"controlador '{controller.name}'",
+            )
+            maybe_call_optional_connect(instance, controller.name)
+        except Exception as exc:  # noqa: BLE001
+            connection.send(("error", format_exception_message(exc)))
+            return
+
+        snapshot_builder = ControllerSnapshotBuilder(
+            plant,
+            build_public_controller_metadata(controller).serialize(),
+            read_only=getattr(instance, CONTROLLER_READ_ONLY_SNAPSHOT_ATTR, False) is True,
+        )
+        sensor_ids = list(plant.sensors.ids)
+        actuator_ids = list(plant.actuators.ids)
+        sensor_end = CONTROLLER_WORKER_HEADER_SLOTS + len(sensor_ids)
+        output_offset = sensor_end + len(actuator_ids)
+        connection.send(("ready", None))
+
+        while True:
+            try:
+                message = connection.recv()
+            except EOFError:
+                break
+            if message is None:
+                break
+
+            sequence, setpoints = message
+            if setpoints is not None:
+                plant.apply_setpoints(setpoints)
+            try:
+                snapshot = snapshot_builder.build(
+                    cycle_id=int(values[0]),
+                    cycle_started_at=values[1],
+                    dt_ms=values[2],
+                    sensors={
+                        variable_id: value
+                        for variable_id, value in zip(sensor_ids, values[CONTROLLER_WORKER_HEADER_SLOTS:sensor_end])
+                        if not math.isnan(value)
+                    },
+                    actuators={
+                        variable_id: value
+                        for variable_id, value in zip(actuator_ids, values[sensor_end:output_offset])
+                        if not math.isnan(value)
+                    },
+                )
+                outputs = normalize_controller_outputs(
+                    instance.compute(snapshot),
+                    controller.output_variable_ids,
+                    controller.name,
+                )
+                for index, variable_id in enumerate(controller.output_variable_ids):
+                    values[output_offset + index] = outputs.get(variable_id, math.nan)
+                connection.send(("done", sequence))
+            except Exception as exc:  # noqa: BLE001
+                log_error(traceback.format_exc())
+                connection.send(("error", format_exception_message(exc)))
+    finally:
+        if instance is not None:
+            maybe_call_optional_stop(instance, controller.name)
+        values.release()
+        memory.close()
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import benchmark_runner
+import runner_engine
+import runner_protocol
+from runner_testing import RUNNER_PATH, RunnerTestCase
+
+
+class BenchmarkRunnerTests(RunnerTestCase):
+    def test_benchmark_reports_cycle_metrics_and_flags_regressions_against_baseline(self) -> None:
+        options = argparse.Namespace(
+            runner=RUNNER_PATH,
+            variables=4,
+            controllers=2,
+            cycles=30,
+            warmup=3,
+            allocation_cycles=3,
+            encoding="json",
+            api="vector",
+        )
+        protocol_stdout = runner_protocol.PROTOCOL_STDOUT
+
+        results = benchmark_runner.run_benchmark(runner_engine, options)
+        baseline = json.loads(json.dumps(results))
+        baseline["metrics"]["cycles_per_s"] = results["metrics"]["cycles_per_s"] * 2
+        baseline["metrics"]["telemetry"]["bytes_per_cycle"] = results["metrics"]["telemetry"]["bytes_per_cycle"] * 2
+        comparison = {item["metric"]: item for item in benchmark_runner.compare_with_baseline(results, baseline, 0.1)}
+
+        metrics = results["metrics"]
+        self.assertGreater(metrics["cycles_per_s"], 0.0)
+        self.assertEqual(metrics["phases"]["cycle"]["count"], 30)
+        self.assertTrue({"read", "control", "write", "publish"} <= set(metrics["phases"]))
+        self.assertIn("p99_ms", metrics["phases"]["control"])
+        self.assertGreater(metrics["telemetry"]["bytes_per_cycle"], 0.0)
+        self.assertGreater(metrics["allocations"]["peak_bytes_per_cycle"], 0.0)
+        self.assertGreaterEqual(metrics["allocations"]["allocated_blocks_per_cycle"], 0.0)
+        self.assertTrue(comparison["cycles_per_s"]["regressed"])
+        self.assertFalse(comparison["telemetry.bytes_per_cycle"]["regressed"])
+        self.assertIs(runner_protocol.PROTOCOL_STDOUT, protocol_stdout)
+        with self.assertRaises(RuntimeError):
+            benchmark_runner.compare_with_baseline(results, {**baseline, "config": {**baseline["config"], "cycles": 1}}, 0.1)
+
+    def test_compare_with_baseline_uses_absolute_change_when_baseline_is_zero(self) -> None:
+        config = {"cycles": 10}
+        baseline = {"config": config, "metrics": {"allocations": {"retained_blocks_per_cycle": 0.0}, "cycles_per_s": 0.0}}
+        results = {"config": config, "metrics": {"allocations": {"retained_blocks_per_cycle": 2.0}, "cycles_per_s": 5.0}}
+
+        comparison = {item["metric"]: item for item in benchmark_runner.compare_with_baseline(results, baseline, 0.1)}
+
+        retained = comparison["allocations.retained_blocks_per_cycle"]
+        self.assertFalse(retained["relative"])
+        self.assertEqual(retained["change"], 2.0)
+        self.assertTrue(retained["regressed"])
+        self.assertFalse(comparison["cycles_per_s"]["regressed"])
+
+    def test_write_plugin_is_shared_with_runner_tests(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            plugin_dir = self.write_plugin(
+                Path(tmp_dir),
+                "plugin",
+                """
+                class Plugin:
+                    pass
+                """,
+            )
+
+            self.assertIs(RunnerTestCase.write_plugin, benchmark_runner.write_plugin)
+            self.assertEqual((plugin_dir / "main.py").read_text(encoding="utf-8"), "class Plugin:\n    pass\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,200 +1,28 @@
 from __future__ import annotations
 
-import importlib.util
+import dataclasses
+import io
+import json
+import subprocess
 import sys
 import tempfile
-import textwrap
+import threading
+import time
 import unittest
+from array import array
 from unittest.mock import patch
 from pathlib import Path
-from types import ModuleType
 from typing import Any
 
+import runner_engine
+from runner_testing import RUNNER_PATH, FakeClock, RunnerTestCase, patch_runtime
 
-def load_runner_module() -> ModuleType:
-    runner_path = Path(__file__).with_name("runner.py")
-    spec = importlib.util.spec_from_file_location("senamby_runtime_runner", runner_path)
-    if spec is None or spec.loader is None:
-        raise RuntimeError("Falha ao carregar runner.py para testes")
-    module = importlib.util.module_from_spec(spec)
-    sys.modules[spec.name] = module
-    spec.loader.exec_module(module)
-    return module
-
-
-runner = load_runner_module()
-
-
-class RunnerContractTests(unittest.TestCase):
-    def build_bootstrap(self, root: Path) -> Any:
-        plant_variables = [
-            runner.VariableSpec(
-                id="sensor_1",
-                name="Sensor 1",
-                type="sensor",
-                unit="C",
-                setpoint=42.0,
-                pv_min=0.0,
-                pv_max=100.0,
-                linked_sensor_ids=[],
-            ),
-            runner.VariableSpec(
-                id="actuator_1",
-                name="Actuator 1",
-                type="actuator",
-                unit="%",
-                setpoint=0.0,
-                pv_min=0.0,
-                pv_max=100.0,
-                linked_sensor_ids=["sensor_1"],
-            ),
-        ]
-
-        variables_by_id = {variable.id: variable for variable in plant_variables}
-        plant = runner.PlantContext(
-            id="plant_1",
-            name="Plant 1",
-            variables=plant_variables,
-            variables_by_id=variables_by_id,
-            sensors=runner.IOGroup(
-                ids=["sensor_1"],
-                count=1,
-                variables=[variables_by_id["sensor_1"]],
-                variables_by_id={"sensor_1": variables_by_id["sensor_1"]},
-            ),
-            actuators=runner.IOGroup(
-                ids=["actuator_1"],
-                count=1,
-                variables=[variables_by_id["actuator_1"]],
-                variables_by_id={"actuator_1": variables_by_id["actuator_1"]},
-            ),
-            setpoints={"sensor_1": 42.0, "actuator_1": 0.0},
-        )
-
-        runtime = runner.RuntimeContext(
-            id="rt_1",
-            timing=runner.RuntimeTiming(
-                owner="runtime",
-                clock="monotonic",
-                strategy="deadline",
-                sample_time_ms=100,
-            ),
-            supervision=runner.RuntimeSupervision(
-                owner="rust",
-                startup_timeout_ms=12000,
-                shutdown_timeout_ms=4000,
-            ),
-            paths=runner.RuntimePaths(
-                runtime_dir=str(root / "runtime"),
-                venv_python_path=str(root / ".venv" / "bin" / "python"),
-                runner_path=str(root / "runtime" / "runner.py"),
-                bootstrap_path=str(root / "runtime" / "bootstrap.json"),
-            ),
-        )
-
-        driver_dir = root / "driver_plugin"
-        driver_dir.mkdir()
-        (driver_dir / "main.py").write_text(
-            textwrap.dedent(
-                """
-                from typing import Any, Dict
-
-                class ContractDriver:
-                    def __init__(self, context: Any) -> None:
-                        if hasattr(context, "runtime"):
-                            raise RuntimeError("driver context leaked runtime")
-                        self.context = context
-                        self.context_keys = set(vars(context).keys())
-
-                    def connect(self) -> bool:
-                        return True
-
-                    def stop(self) -> bool:
-                        return True
-
-                    def read(self) -> Dict[str, Dict[str, float]]:
-                        return {
-                            "sensors": {"sensor_1": 1.0},
-                            "actuators": {"actuator_1": 0.0},
-                        }
-
-                    def write(self, outputs: Dict[str, float]) -> bool:
-                        return True
-                """
-            ).strip()
-            + "\n",
-            encoding="utf-8",
-        )
-
-        controller_dir = root / "controller_plugin"
-        controller_dir.mkdir()
-        (controller_dir / "main.py").write_text(
-            textwrap.dedent(
-                """
-                from typing import Any, Dict
-
-                class ContractController:
-                    def __init__(self, context: Any) -> None:
-                        if hasattr(context, "runtime"):
-                            raise RuntimeError("controller context leaked runtime")
-                        self.context = context
-                        self.context_keys = set(vars(context).keys())
-                        self.controller_keys = set(vars(context.controller).keys())
-
-                    def connect(self) -> bool:
-                        return True
-
-                    def stop(self) -> bool:
-                        return True
-
-                    def compute(self, snapshot: Dict[str, Any]) -> Dict[str, float]:
-                        return {self.context.controller.output_variable_ids[0]: 0.0}
-                """
-            ).strip()
-            + "\n",
-            encoding="utf-8",
-        )
-
-        return runner.RuntimeBootstrap(
-            driver=runner.DriverMetadata(
-                plugin_id="driver_plugin",
-                plugin_name="Driver Plugin",
-                plugin_dir=str(driver_dir),
-                source_file="main.py",
-                class_name="ContractDriver",
-                config={"port": "COM1"},
-            ),
-            controllers=[
-                runner.ControllerMetadata(
-                    id="ctrl_1",
-                    plugin_id="controller_plugin",
-                    plugin_name="Controller Plugin",
-                    plugin_dir=str(controller_dir),
-                    source_file="main.py",
-                    class_name="ContractController",
-                    name="Controller 1",
-                    controller_type="PID",
-                    active=True,
-                    input_variable_ids=["sensor_1"],
-                    output_variable_ids=["actuator_1"],
-                    params={
-                        "kp": runner.ControllerParamSpec(
-                            key="kp",
-                            type="number",
-                            value=1.2,
-                            label="Kp",
-                        )
-                    },
-                )
-            ],
-            plant=plant,
-            runtime=runtime,
-        )
 
+class RunnerContractTests(RunnerTestCase):
     def test_driver_context_exposes_only_config_and_plant(self) -> None:
         with tempfile.TemporaryDirectory() as tmp_dir:
             bootstrap = self.build_bootstrap(Path(tmp_dir))
-            context = runner.build_driver_plugin_context(bootstrap)
+            context = runner_engine.build_driver_plugin_context(bootstrap)
 
         self.assertEqual(set(vars(context).keys()), {"config", "plant"})
         self.assertFalse(hasattr(context, "runtime"))
@@ -202,7 +30,7 @@ class RunnerContractTests(unittest.TestCase):
     def test_controller_context_uses_minimum_public_shape(self) -> None:
         with tempfile.TemporaryDirectory() as tmp_dir:
             bootstrap = self.build_bootstrap(Path(tmp_dir))
-            context = runner.build_controller_plugin_context(
+            context = runner_engine.build_controller_plugin_context(
                 bootstrap.controllers[0],
                 bootstrap.plant,
             )
@@ -224,12 +52,12 @@ class RunnerContractTests(unittest.TestCase):
     def test_snapshot_controller_omits_internal_loader_fields(self) -> None:
         with tempfile.TemporaryDirectory() as tmp_dir:
             bootstrap = self.build_bootstrap(Path(tmp_dir))
-            snapshot = runner.build_controller_snapshot(
+            snapshot = runner_engine.build_controller_snapshot(
                 cycle_id=1,
                 cycle_started_at=123.456,
                 dt_ms=100.0,
                 plant=bootstrap.plant,
-                controller_public_metadata=runner.build_public_controller_metadata(
+                controller_public_metadata=runner_engine.build_public_controller_metadata(
                     bootstrap.controllers[0]
                 ).serialize(),
                 sensors={"sensor_1": 40.0},
@@ -254,7 +82,7 @@ class RunnerContractTests(unittest.TestCase):
     def test_engine_loads_plugins_with_internal_bootstrap_and_public_context(self) -> None:
         with tempfile.TemporaryDirectory() as tmp_dir:
             bootstrap = self.build_bootstrap(Path(tmp_dir))
-            engine = runner.PlantRuntimeEngine(bootstrap)
+            engine = runner_engine.PlantRuntimeEngine(bootstrap)
             try:
                 engine.start()
 
@@ -298,13 +126,13 @@ class RunnerContractTests(unittest.TestCase):
 
         with tempfile.TemporaryDirectory() as tmp_dir:
             original_bootstrap = self.build_bootstrap(Path(tmp_dir))
-            bootstrap = runner.RuntimeBootstrap(
+            bootstrap = runner_engine.RuntimeBootstrap(
                 driver=original_bootstrap.driver,
                 controllers=original_bootstrap.controllers,
                 plant=original_bootstrap.plant,
-                runtime=runner.RuntimeContext(
+                runtime=runner_engine.RuntimeContext(
                     id=original_bootstrap.runtime.id,
-                    timing=runner.RuntimeTiming(
+                    timing=runner_engine.RuntimeTiming(
                         owner=original_bootstrap.runtime.timing.owner,
                         clock=original_bootstrap.runtime.timing.clock,
                         strategy=original_bootstrap.runtime.timing.strategy,
@@ -314,7 +142,7 @@ class RunnerContractTests(unittest.TestCase):
                     paths=original_bootstrap.runtime.paths,
                 ),
             )
-            engine = runner.PlantRuntimeEngine(bootstrap)
+            engine = runner_engine.PlantRuntimeEngine(bootstrap)
             fake_clock = FakeClock()
             telemetry_payloads: list[dict[str, Any]] = []
 
@@ -323,10 +151,10 @@ class RunnerContractTests(unittest.TestCase):
                     telemetry_payloads.append(payload)
 
             with (
-                patch.object(runner.time, "monotonic", fake_clock.monotonic),
-                patch.object(runner.time, "time", fake_clock.time),
-                patch.object(runner.time, "sleep", fake_clock.sleep),
-                patch.object(runner, "emit", capture_emit),
+                patch.object(time, "monotonic", fake_clock.monotonic),
+                patch.object(time, "time", fake_clock.time),
+                patch.object(time, "sleep", fake_clock.sleep),
+                patch_runtime("emit", capture_emit),
             ):
                 try:
                     engine.start()
@@ -341,6 +169,851 @@ class RunnerContractTests(unittest.TestCase):
             self.assertAlmostEqual(telemetry_payloads[1]["uptime_s"], 1.0, places=6)
             self.assertAlmostEqual(telemetry_payloads[2]["uptime_s"], 2.0, places=6)
 
+    def test_normalize_runtime_context_rejects_unknown_telemetry_encoding(self) -> None:
+        raw_runtime = {
+            "id": "rt_1",
+            "timing": {"owner": "runtime", "clock": "monotonic", "strategy": "deadline", "sample_time_ms": 10},
+            "supervision": {"owner": "rust", "startup_timeout_ms": 1000, "shutdown_timeout_ms": 1000},
+            "paths": {
+                "runtime_dir": "/tmp/rt",
+                "venv_python_path": "/tmp/python",
+                "runner_path": "/tmp/runner.py",
+                "bootstrap_path": "/tmp/bootstrap.json",
+            },
+        }
+
+        self.assertEqual(runner_engine.normalize_runtime_context(raw_runtime).telemetry.encoding, "json")
+        raw_runtime["telemetry"] = {"encoding": "binary"}
+        with self.assertRaisesRegex(RuntimeError, "processo Rust"):
+            runner_engine.normalize_runtime_context(raw_runtime)
+        raw_runtime["telemetry"] = {"encoding": "msgpack"}
+        with self.assertRaises(RuntimeError):
+            runner_engine.normalize_runtime_context(raw_runtime)
+
+    def test_hybrid_wait_spins_until_deadline_after_coarse_sleep(self) -> None:
+        timing = runner_engine.RuntimeTiming(
+            owner="runtime",
+            clock="monotonic",
+            strategy="hybrid",
+            sample_time_ms=10,
+            spin_window_ms=5.0,
+        )
+        sleep_calls: list[float] = []
+        real_sleep = time.sleep
+
+        def record_sleep(seconds: float) -> None:
+            sleep_calls.append(seconds)
+            real_sleep(seconds)
+
+        deadline = time.monotonic() + 0.02
+        with patch.object(time, "sleep", record_sleep):
+            runner_engine.wait_until_deadline(deadline, timing)
+
+        self.assertGreaterEqual(time.monotonic(), deadline)
+        self.assertLessEqual(sleep_calls[0], 0.015)
+        self.assertTrue(all(seconds == 0 for seconds in sleep_calls[1:]))
+
+        stats = runner_engine.JitterStats()
+        for value_ms in (1.0, 2.0, 3.0):
+            stats.record(value_ms)
+        self.assertAlmostEqual(stats.mean_ms, 2.0)
+        self.assertAlmostEqual(stats.std_ms, 1.0)
+        self.assertEqual(stats.max_ms, 3.0)
+
+        raw_runtime = {
+            "id": "rt_1",
+            "timing": {"owner": "runtime", "clock": "monotonic", "strategy": "busy", "sample_time_ms": 10},
+            "supervision": {"owner": "rust", "startup_timeout_ms": 1000, "shutdown_timeout_ms": 1000},
+            "paths": {
+                "runtime_dir": "/tmp/rt",
+                "venv_python_path": "/tmp/python",
+                "runner_path": "/tmp/runner.py",
+                "bootstrap_path": "/tmp/bootstrap.json",
+            },
+        }
+        with self.assertRaises(RuntimeError):
+            runner_engine.normalize_runtime_context(raw_runtime)
+
+    def test_stats_publish_phase_percentiles_and_reset_on_request(self) -> None:
+        histogram = runner_engine.LatencyHistogram()
+        for value in range(1, 1001):
+            histogram.record(value / 100.0)
+        summary = histogram.summary()
+        self.assertEqual((summary["count"], summary["max_ms"]), (1000, 10.0))
+        for name, expected in (("p50_ms", 5.0), ("p95_ms", 9.5), ("p99_ms", 9.9)):
+            self.assertAlmostEqual(summary[name], expected, delta=expected / 16)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bootstrap = self.build_bootstrap(Path(tmp_dir))
+            bootstrap = dataclasses.replace(
+                bootstrap,
+                runtime=dataclasses.replace(bootstrap.runtime, stats=runner_engine.RuntimeStats(interval_ms=200)),
+            )
+            engine = runner_engine.PlantRuntimeEngine(bootstrap)
+            fake_clock = FakeClock()
+            events: list[tuple[str, Any]] = []
+            with (
+                fake_clock.patch_runner(),
+                patch_runtime("emit", lambda msg_type, payload=None: events.append((msg_type, payload))),
+            ):
+                try:
+                    engine.start()
+                    for cycle in range(5):
+                        if cycle == 3:
+                            runner_engine.handle_command({"type": "reset_stats"}, engine)
+                        engine.run_cycle()
+                        fake_clock.monotonic_now += 0.1
+                finally:
+                    engine.stop()
+
+        stats = [payload for msg_type, payload in events if msg_type == "stats"]
+        self.assertEqual([(item["first_cycle_id"], item["last_cycle_id"]) for item in stats], [(1, 3), (4, 5)])
+        self.assertEqual(stats[0]["phases"]["cycle"]["count"], 3)
+        self.assertIn("dt_error", stats[0]["phases"])
+        self.assertIn("p999_ms", stats[0]["phases"]["read"])
+        self.assertEqual(stats[1]["controllers"]["ctrl_1"]["count"], 2)
+
+    def test_publish_metrics_report_previous_cycle_serialize_write_and_bytes(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            engine = runner_engine.PlantRuntimeEngine(self.build_bootstrap(Path(tmp_dir)))
+            stdout = io.StringIO()
+            with patch_runtime("PROTOCOL_STDOUT", stdout):
+                try:
+                    engine.start()
+                    for _ in range(2):
+                        engine.run_cycle()
+                finally:
+                    engine.stop()
+
+        lines = [line for line in stdout.getvalue().splitlines(keepends=True) if '"type": "telemetry"' in line]
+        first, second = (json.loads(line)["payload"] for line in lines)
+        self.assertEqual(first["publish_bytes"], 0)
+        self.assertEqual(second["publish_bytes"], len(lines[0].encode("utf-8")))
+        self.assertGreater(second["publish_duration_ms"], 0.0)
+        self.assertGreaterEqual(
+            second["publish_duration_ms"] + 1e-6,
+            second["publish_serialize_ms"] + second["publish_write_ms"] + second["publish_flush_ms"],
+        )
+
+    def test_plugin_code_is_cached_by_content_with_a_fresh_module_per_load(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            cache_dir = root / "plugin-cache"
+            plugin_dir = self.write_plugin(
+                root,
+                "cached_controller",
+                """
+                class CachedController:
+                    gain = 1.0
+
+                    def __init__(self, context):
+                        self.context = context
+
+                    def compute(self, snapshot):
+                        return {}
+                """,
+            )
+            other_dir = self.write_plugin(
+                root,
+                "other_controller",
+                """
+                class OtherController:
+                    def __init__(self, context):
+                        self.context = context
+
+                    def compute(self, snapshot):
+                        return {}
+                """,
+            )
+
+            def load(directory: Path = plugin_dir, class_name: str = "CachedController") -> Any:
+                return runner_engine.load_plugin_class(
+                    directory,
+                    "main.py",
+                    class_name,
+                    runner_engine.CONTROLLER_REQUIRED_METHODS,
+                    "controlador",
+                    cache_dir,
+                )
+
+            with patch.dict(runner_engine.PLUGIN_CODE_CACHE, clear=True):
+                first = load()
+                with patch.object(runner_engine, "compile", side_effect=AssertionError("código não reaproveitado"), create=True):
+                    second = load()
+                self.assertIsNot(second, first)
+                self.assertIs(second.compute.__code__, first.compute.__code__)
+                first.gain = 5.0
+                self.assertEqual(second.gain, 1.0)
+                cached_files = list(cache_dir.glob("*.pyc"))
+                self.assertEqual(len(cached_files), 1)
+
+                runner_engine.PLUGIN_CODE_CACHE.clear()
+                with patch.object(runner_engine, "compile", side_effect=AssertionError("bytecode não reaproveitado"), create=True):
+                    from_bytecode = load()
+                self.assertEqual(from_bytecode.gain, 1.0)
+
+                source_path = plugin_dir / "main.py"
+                source_path.write_text(source_path.read_text(encoding="utf-8").replace("1.0", "2.0"), encoding="utf-8")
+                edited = load()
+                self.assertEqual(edited.gain, 2.0)
+                refreshed_files = list(cache_dir.glob("*.pyc"))
+                self.assertEqual(len(refreshed_files), 1)
+                self.assertNotEqual(refreshed_files, cached_files)
+
+                with patch.object(runner_engine, "PLUGIN_CODE_CACHE_MAX_ENTRIES", 1):
+                    load(other_dir, "OtherController")
+                self.assertEqual(list(runner_engine.PLUGIN_CODE_CACHE), [str((other_dir / "main.py").resolve())])
+
+    def test_controller_update_rebuilds_only_changed_ids_and_applies_params_in_place(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            bootstrap = self.build_bootstrap(root)
+            plugin_dir = self.write_plugin(
+                root,
+                "tunable_controller",
+                """
+                class TunableController:
+                    def __init__(self, context):
+                        self.context = context
+                        self.kp = context.controller.params["kp"].value
+                        self.stopped = False
+
+                    def on_params_changed(self, params):
+                        self.kp = params["kp"]["value"]
+
+                    def stop(self):
+                        self.stopped = True
+                        return True
+
+                    def compute(self, snapshot):
+                        return {self.context.controller.output_variable_ids[0]: self.kp}
+                """,
+            )
+            tunable = dataclasses.replace(
+                bootstrap.controllers[0],
+                plugin_id="tunable_controller",
+                plugin_dir=str(plugin_dir),
+                class_name="TunableController",
+            )
+            controllers = [
+                tunable,
+                dataclasses.replace(tunable, id="ctrl_2", name="Controller 2"),
+                dataclasses.replace(tunable, id="ctrl_3", name="Controller 3"),
+            ]
+            engine = runner_engine.PlantRuntimeEngine(dataclasses.replace(bootstrap, controllers=controllers))
+            events: list[tuple[str, Any]] = []
+            with patch_runtime("emit", lambda msg_type, payload=None: events.append((msg_type, payload))):
+                try:
+                    engine.start()
+                    first, second, third = [controller.instance for controller in engine.controllers]
+                    retuned_params = {
+                        "kp": dataclasses.replace(controllers[0].params["kp"], value=3.5),
+                    }
+                    reloaded = threading.Event()
+                    engine.controller_reload_listener = reloaded.set
+                    engine.update_controllers(
+                        [
+                            dataclasses.replace(controllers[0], params=retuned_params),
+                            dataclasses.replace(controllers[1], output_variable_ids=["sensor_1"]),
+                        ]
+                    )
+                    self.assertTrue(reloaded.wait(timeout=2))
+                    engine.apply_pending_controller_reload()
+                    instances = [controller.instance for controller in engine.controllers]
+                    snapshot = engine.controllers[0].snapshot_builder.controller_public_metadata
+                    context_kp = first.context.controller.params["kp"].value
+                    stopped = [first.stopped, second.stopped, third.stopped]
+                finally:
+                    engine.stop()
+
+            self.assertIs(instances[0], first)
+            self.assertEqual(first.kp, 3.5)
+            self.assertEqual(snapshot["params"]["kp"]["value"], 3.5)
+            self.assertEqual(context_kp, 3.5)
+            self.assertIsNot(instances[1], second)
+            self.assertEqual(stopped, [False, True, True])
+            self.assertEqual([payload for msg_type, payload in events if msg_type in {"warning", "error"}], [])
+
+    def test_failed_params_hook_rebuilds_controller_off_the_control_thread(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            bootstrap = self.build_bootstrap(root)
+            plugin_dir = self.write_plugin(
+                root,
+                "strict_controller",
+                """
+                class StrictController:
+                    def __init__(self, context):
+                        self.context = context
+                        self.kp = context.controller.params["kp"].value
+                        self.stopped = False
+
+                    def on_params_changed(self, params):
+                        raise ValueError("kp exige reinício")
+
+                    def stop(self):
+                        self.stopped = True
+                        return True
+
+                    def compute(self, snapshot):
+                        return {self.context.controller.output_variable_ids[0]: self.kp}
+                """,
+            )
+            controller = dataclasses.replace(
+                bootstrap.controllers[0],
+                plugin_id="strict_controller",
+                plugin_dir=str(plugin_dir),
+                class_name="StrictController",
+            )
+            engine = runner_engine.PlantRuntimeEngine(dataclasses.replace(bootstrap, controllers=[controller]))
+            events: list[tuple[str, Any]] = []
+            with (
+                patch_runtime("emit", lambda msg_type, payload=None: events.append((msg_type, payload))),
+                patch_runtime("log_exception", lambda _exc: None),
+            ):
+                try:
+                    engine.start()
+                    original = engine.controllers[0].instance
+                    retuned = dataclasses.replace(
+                        controller,
+                        params={"kp": dataclasses.replace(controller.params["kp"], value=4.0)},
+                    )
+                    reloaded = threading.Semaphore(0)
+                    engine.controller_reload_listener = reloaded.release
+                    engine.update_controllers([retuned])
+                    self.assertTrue(reloaded.acquire(timeout=2))
+                    load_controllers = engine._load_controllers
+                    loader_threads: list[threading.Thread] = []
+
+                    def record_loader_thread(controllers: Any) -> Any:
+                        loader_threads.append(threading.current_thread())
+                        return load_controllers(controllers)
+
+                    with patch.object(engine, "_load_controllers", record_loader_thread):
+                        engine.apply_pending_controller_reload()
+                        self.assertTrue(reloaded.acquire(timeout=2))
+                        engine.apply_pending_controller_reload()
+                    rebuilt = engine.controllers[0].instance
+                    original_stopped = original.stopped
+                finally:
+                    engine.stop()
+
+            self.assertIsNot(rebuilt, original)
+            self.assertEqual(rebuilt.kp, 4.0)
+            self.assertEqual(len(loader_threads), 1)
+            self.assertIsNot(loader_threads[0], threading.current_thread())
+            self.assertTrue(original_stopped)
+            warnings = [payload["message"] for msg_type, payload in events if msg_type == "warning"]
+            self.assertEqual(len(warnings), 1)
+            self.assertIn("on_params_changed", warnings[0])
+
+    def test_batched_telemetry_flushes_by_cycle_count_and_before_overruns(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bootstrap = self.with_runtime_telemetry(
+                self.build_bootstrap(Path(tmp_dir)),
+                batch_max_cycles=3,
+            )
+            engine = runner_engine.PlantRuntimeEngine(bootstrap)
+            fake_clock = FakeClock()
+            emitted: list[tuple[str, dict[str, Any] | None]] = []
+
+            def capture_emit(msg_type: str, payload: dict[str, Any] | None = None) -> None:
+                emitted.append((msg_type, payload))
+
+            with fake_clock.patch_runner(), patch_runtime("emit", capture_emit):
+                try:
+                    engine.start()
+                    for _ in range(4):
+                        engine.run_cycle()
+                    engine.emit_event("cycle_overrun", {"cycle_id": engine.cycle_id})
+                finally:
+                    engine.stop()
+
+        self.assertEqual([msg_type for msg_type, _ in emitted], ["telemetry_batch", "telemetry_batch", "cycle_overrun"])
+        first_batch = emitted[0][1] or {}
+        second_batch = emitted[1][1] or {}
+        self.assertEqual([item["cycle_id"] for item in first_batch["items"]], [1, 2, 3])
+        self.assertEqual([item["cycle_id"] for item in second_batch["items"]], [4])
+
+    def test_inline_batch_window_shortens_the_wait_and_flushes_between_cycles(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bootstrap = self.with_runtime_telemetry(
+                self.build_bootstrap(Path(tmp_dir)),
+                batch_max_cycles=10,
+                batch_window_ms=20,
+            )
+            engine = runner_engine.PlantRuntimeEngine(bootstrap)
+            fake_clock = FakeClock()
+            emitted: list[tuple[str, Any]] = []
+            with (
+                fake_clock.patch_runner(),
+                patch_runtime("emit", lambda msg_type, payload=None: emitted.append((msg_type, payload))),
+            ):
+                try:
+                    engine.start()
+                    engine.run_cycle()
+                    wait_timeout = engine.next_wait_timeout()
+                    fake_clock.monotonic_now += 0.025
+                    self.assertFalse(engine.cycle_due())
+                    engine.flush_expired_telemetry()
+                    flushed = [msg_type for msg_type, _payload in emitted]
+                finally:
+                    engine.stop()
+
+        self.assertAlmostEqual(wait_timeout or 0.0, 0.02)
+        self.assertEqual(flushed.count("telemetry_batch"), 1)
+
+    def test_threaded_publisher_drops_oldest_frames_when_ring_is_full(self) -> None:
+        options = runner_engine.RuntimeTelemetry(publisher="thread", queue_size=2, overflow_policy="drop_oldest")
+        writer_entered = threading.Event()
+        release_writer = threading.Event()
+        emitted: list[tuple[str, dict[str, Any] | None]] = []
+
+        def blocking_emit(msg_type: str, payload: dict[str, Any] | None = None) -> None:
+            writer_entered.set()
+            release_writer.wait(timeout=5.0)
+            emitted.append((msg_type, payload))
+
+        with patch_runtime("emit", blocking_emit):
+            publisher = runner_engine.create_telemetry_publisher(options)
+            publisher.publish({"cycle_id": 1}, None)
+            self.assertTrue(writer_entered.wait(timeout=5.0))
+            for cycle_id in (2, 3, 4):
+                publisher.publish({"cycle_id": cycle_id}, None)
+            publisher.emit_event("cycle_overrun", {"cycle_id": 4})
+            self.assertEqual(publisher.dropped_frames, 1)
+            release_writer.set()
+            publisher.close()
+
+        self.assertEqual(
+            [(msg_type, (payload or {}).get("cycle_id")) for msg_type, payload in emitted],
+            [("telemetry", 1), ("telemetry", 3), ("telemetry", 4), ("cycle_overrun", 4)],
+        )
+
+    def test_threaded_publisher_snapshots_reused_driver_buffers(self) -> None:
+        options = runner_engine.RuntimeTelemetry(publisher="thread")
+        release_writer = threading.Event()
+        emitted: list[dict[str, Any]] = []
+
+        def blocking_emit(msg_type: str, payload: dict[str, Any] | None = None) -> None:
+            release_writer.wait(timeout=5.0)
+            emitted.append(payload or {})
+
+        buffer = array("d", [1.0])
+        sensors = runner_engine.IndexedValues(["sensor_1"], {"sensor_1": 0}, buffer)
+        with patch_runtime("emit", blocking_emit):
+            publisher = runner_engine.create_telemetry_publisher(options)
+            publisher.publish({"cycle_id": 1, "sensors": sensors}, None)
+            buffer[0] = 2.0
+            publisher.publish({"cycle_id": 2, "sensors": sensors}, None)
+            release_writer.set()
+            publisher.close()
+
+        self.assertEqual([payload["sensors"]["sensor_1"] for payload in emitted], [1.0, 2.0])
+
+    def test_read_only_snapshot_builder_refreshes_setpoints_without_copies(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bootstrap = self.build_bootstrap(Path(tmp_dir))
+            builder = runner_engine.ControllerSnapshotBuilder(
+                bootstrap.plant,
+                runner_engine.build_public_controller_metadata(bootstrap.controllers[0]).serialize(),
+                read_only=True,
+            )
+            sensors = {"sensor_1": 40.0}
+            first = builder.build(cycle_id=1, cycle_started_at=1.0, dt_ms=100.0, sensors=sensors, actuators={})
+            second = builder.build(cycle_id=2, cycle_started_at=1.1, dt_ms=100.0, sensors=sensors, actuators={})
+            bootstrap.plant.apply_setpoints({"sensor_1": 55.0})
+            third = builder.build(cycle_id=3, cycle_started_at=1.2, dt_ms=100.0, sensors=sensors, actuators={})
+
+        self.assertIs(first["variables_by_id"], second["variables_by_id"])
+        self.assertIs(first["controller"], second["controller"])
+        self.assertEqual(third["variables_by_id"]["sensor_1"]["setpoint"], 55.0)
+        self.assertEqual(third["setpoints"], {"sensor_1": 55.0})
+        with self.assertRaises(TypeError):
+            first["sensors"]["sensor_1"] = 0.0  # type: ignore[index]
+        with self.assertRaises(TypeError):
+            first["controller"]["params"]["kp"]["value"] = 3.0  # type: ignore[index]
+
+    def test_vector_driver_and_controller_skip_dict_payloads(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            bootstrap = self.build_bootstrap(root)
+            driver_dir = self.write_plugin(
+                root,
+                "vector_driver",
+                """
+                from array import array
+
+                class VectorDriver:
+                    def __init__(self, context):
+                        self.context = context
+                        self.written = []
+
+                    def connect(self):
+                        return True
+
+                    def stop(self):
+                        return True
+
+                    def read(self):
+                        raise AssertionError("read_vector should be preferred")
+
+                    def read_vector(self):
+                        return array("d", [40.0]), array("d", [5.0])
+
+                    def write(self, outputs):
+                        self.written.append(dict(outputs))
+                        return True
+                """,
+            )
+            controller_dir = self.write_plugin(
+                root,
+                "vector_controller",
+                """
+                class VectorController:
+                    def __init__(self, context):
+                        self.context = context
+
+                    def compute(self, snapshot):
+                        raise AssertionError("compute_vector should be preferred")
+
+                    def compute_vector(self, snapshot):
+                        return [snapshot.setpoints[0] - snapshot.inputs[0] + snapshot.actuators[0]]
+                """,
+            )
+            bootstrap = dataclasses.replace(
+                bootstrap,
+                driver=dataclasses.replace(bootstrap.driver, plugin_dir=str(driver_dir), class_name="VectorDriver"),
+                controllers=[
+                    dataclasses.replace(
+                        bootstrap.controllers[0],
+                        plugin_dir=str(controller_dir),
+                        class_name="VectorController",
+                    )
+                ],
+            )
+            engine = runner_engine.PlantRuntimeEngine(bootstrap)
+            stdout = self.capture_protocol_stdout()
+            with patch_runtime("PROTOCOL_STDOUT", stdout):
+                try:
+                    engine.start()
+                    engine.run_cycle()
+                    driver_instance = engine.driver_instance
+                finally:
+                    engine.stop()
+
+            messages, _ = self.split_protocol_stream(stdout.buffer.getvalue())
+
+        self.assertEqual(driver_instance.written, [{"actuator_1": 7.0}])
+        telemetry = [message["payload"] for message in messages if message["type"] == "telemetry"]
+        self.assertEqual(len(telemetry), 1)
+        self.assertEqual(telemetry[0]["sensors"], {"sensor_1": 40.0})
+        self.assertEqual(telemetry[0]["actuators_read"], {"actuator_1": 5.0})
+        self.assertEqual(telemetry[0]["controller_outputs"], {"actuator_1": 7.0})
+
+    def test_normalize_read_vector_rejects_wrong_channel_count(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bootstrap = self.build_bootstrap(Path(tmp_dir))
+        layout = runner_engine.PlantVectorLayout(bootstrap.plant)
+
+        with self.assertRaises(RuntimeError):
+            runner_engine.normalize_read_vector(([1.0, 2.0], [0.0]), layout)
+        with self.assertRaises(RuntimeError):
+            runner_engine.normalize_read_vector(([float("nan")], [0.0]), layout)
+
+    def test_independent_controller_groups_run_concurrently(self) -> None:
+        controller_source = """
+            class GroupController:
+                barrier = None
+
+                def __init__(self, context):
+                    self.context = context
+
+                def compute(self, snapshot):
+                    if self.barrier is not None:
+                        self.barrier.wait(timeout=2)
+                    return {self.context.controller.output_variable_ids[0]: float(snapshot["cycle_id"])}
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bootstrap = self.build_multi_loop_bootstrap(Path(tmp_dir), 3, controller_source, "GroupController")
+            bootstrap = dataclasses.replace(
+                bootstrap,
+                controllers=[
+                    *bootstrap.controllers[:2],
+                    dataclasses.replace(bootstrap.controllers[2], input_variable_ids=["actuator_2"]),
+                ],
+                runtime=dataclasses.replace(
+                    bootstrap.runtime,
+                    control=runner_engine.RuntimeControl(parallel_groups=True, join_deadline_ms=2000.0),
+                ),
+            )
+            engine = runner_engine.PlantRuntimeEngine(bootstrap)
+            events: list[tuple[str, Any]] = []
+            with patch_runtime("emit", lambda msg_type, payload=None: events.append((msg_type, payload))):
+                try:
+                    engine.start()
+                    barrier = threading.Barrier(2)
+                    engine.controllers[0].instance.barrier = barrier
+                    engine.controllers[1].instance.barrier = barrier
+                    engine.run_cycle()
+                    groups = [[controller.metadata.id for controller in group] for group in engine.controller_groups]
+                    written = engine.driver_instance.written
+                finally:
+                    engine.stop()
+
+            self.assertEqual(groups, [["ctrl_1"], ["ctrl_2", "ctrl_3"]])
+            self.assertEqual(written, [{"actuator_1": 1.0, "actuator_2": 1.0, "actuator_3": 1.0}])
+            self.assertEqual([payload for msg_type, payload in events if msg_type == "warning"], [])
+            self.assertIsNone(engine.controller_pool)
+
+    def test_late_controller_group_warnings_are_forwarded_on_the_next_cycle(self) -> None:
+        controller_source = """
+            class LateController:
+                gate = None
+
+                def __init__(self, context):
+                    self.context = context
+
+                def compute(self, snapshot):
+                    gate = self.gate
+                    if gate is not None:
+                        self.gate = None
+                        gate.wait(timeout=2)
+                        raise ValueError("cálculo atrasado falhou")
+                    return {self.context.controller.output_variable_ids[0]: 1.0}
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bootstrap = self.build_multi_loop_bootstrap(Path(tmp_dir), 2, controller_source, "LateController")
+            bootstrap = dataclasses.replace(
+                bootstrap,
+                runtime=dataclasses.replace(
+                    bootstrap.runtime,
+                    control=runner_engine.RuntimeControl(parallel_groups=True, join_deadline_ms=20.0),
+                ),
+            )
+            engine = runner_engine.PlantRuntimeEngine(bootstrap)
+            events: list[tuple[str, Any]] = []
+            with (
+                patch_runtime("emit", lambda msg_type, payload=None: events.append((msg_type, payload))),
+                patch_runtime("log_error", lambda _message: None),
+            ):
+                try:
+                    engine.start()
+                    gate = threading.Event()
+                    engine.controllers[0].instance.gate = gate
+                    engine.run_cycle()
+                    late_future = engine.controller_group_futures[0]
+                    gate.set()
+                    late_future.exception(timeout=2)
+                    engine.next_cycle_deadline = None
+                    engine.run_cycle()
+                    written = engine.driver_instance.written
+                finally:
+                    engine.stop()
+
+            warnings = [payload["message"] for msg_type, payload in events if msg_type == "warning"]
+            self.assertEqual(len(warnings), 2)
+            self.assertIn("excedeu o prazo do ciclo", warnings[0])
+            self.assertIn("cálculo atrasado falhou", warnings[1])
+            self.assertEqual(written, [{"actuator_2": 1.0}, {"actuator_1": 1.0, "actuator_2": 1.0}])
+
+    def test_late_controller_group_keeps_the_cycle_id_it_was_submitted_with(self) -> None:
+        controller_source = """
+            class ChainedController:
+                gate = None
+                seen_cycle_ids = []
+
+                def __init__(self, context):
+                    self.context = context
+
+                def compute(self, snapshot):
+                    gate = self.gate
+                    if gate is not None:
+                        self.gate = None
+                        gate.wait(timeout=2)
+                    if self.context.controller.id == "ctrl_2":
+                        type(self).seen_cycle_ids.append(snapshot["cycle_id"])
+                    return {self.context.controller.output_variable_ids[0]: 1.0}
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bootstrap = self.build_multi_loop_bootstrap(Path(tmp_dir), 3, controller_source, "ChainedController")
+            bootstrap = dataclasses.replace(
+                bootstrap,
+                controllers=[
+                    bootstrap.controllers[0],
+                    dataclasses.replace(bootstrap.controllers[1], input_variable_ids=["actuator_1"]),
+                    bootstrap.controllers[2],
+                ],
+                runtime=dataclasses.replace(
+                    bootstrap.runtime,
+                    control=runner_engine.RuntimeControl(parallel_groups=True, join_deadline_ms=20.0),
+                ),
+            )
+            engine = runner_engine.PlantRuntimeEngine(bootstrap)
+            with patch_runtime("emit", lambda _msg_type, _payload=None: None):
+                try:
+                    engine.start()
+                    gate = threading.Event()
+                    engine.controllers[0].instance.gate = gate
+                    engine.run_cycle()
+                    late_future = engine.controller_group_futures[0]
+                    engine.next_cycle_deadline = None
+                    engine.run_cycle()
+                    gate.set()
+                    late_future.result(timeout=2)
+                    seen_cycle_ids = list(type(engine.controllers[1].instance).seen_cycle_ids)
+                finally:
+                    engine.stop()
+
+            self.assertEqual(seen_cycle_ids, [1])
+
+    def test_async_driver_runs_on_io_thread_and_reports_sample_age(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            bootstrap = self.build_bootstrap(root)
+            driver_dir = self.write_plugin(
+                root,
+                "async_driver",
+                """
+                import asyncio
+                import threading
+
+
+                class AsyncDriver:
+                    def __init__(self, context):
+                        self.reads = 0
+                        self.written = []
+                        self.io_threads = set()
+
+                    def connect(self):
+                        return True
+
+                    def stop(self):
+                        return True
+
+                    async def read(self):
+                        await asyncio.sleep(0)
+                        self.reads += 1
+                        self.io_threads.add(threading.current_thread().name)
+                        return {"sensors": {"sensor_1": float(self.reads)}, "actuators": {"actuator_1": 0.0}}
+
+                    async def write(self, outputs):
+                        self.io_threads.add(threading.current_thread().name)
+                        self.written.append(dict(outputs))
+                        return True
+                """,
+            )
+            bootstrap = dataclasses.replace(
+                bootstrap,
+                driver=dataclasses.replace(bootstrap.driver, plugin_dir=str(driver_dir), class_name="AsyncDriver"),
+            )
+            engine = runner_engine.PlantRuntimeEngine(bootstrap)
+            events: list[tuple[str, Any]] = []
+            with patch_runtime("emit", lambda msg_type, payload=None: events.append((msg_type, payload))):
+                try:
+                    engine.start()
+                    self.assertIsNotNone(engine.driver_io)
+                    engine.run_cycle()
+                    time.sleep(0.05)
+                    engine.run_cycle()
+                    driver = engine.driver_instance
+                finally:
+                    engine.stop()
+
+            telemetry = [payload for msg_type, payload in events if msg_type == "telemetry"]
+            self.assertEqual([payload["sensors"]["sensor_1"] for payload in telemetry], [1.0, 2.0])
+            self.assertGreaterEqual(telemetry[1]["sensor_age_ms"], 30.0)
+            self.assertEqual([payload["written_outputs"] for payload in telemetry], [{}, {"actuator_1": 0.0}])
+            self.assertEqual([payload["written_cycle_id"] for payload in telemetry], [None, 1])
+            self.assertEqual(driver.written, [{"actuator_1": 0.0}, {"actuator_1": 0.0}])
+            self.assertEqual(driver.io_threads, {"driver-io"})
+            self.assertEqual([payload for msg_type, payload in events if msg_type == "warning"], [])
+
+    @unittest.skipIf(runner_engine.load_numpy() is None, "NumPy não instalado")
+    def test_compute_batch_runs_loops_sharing_a_class_in_one_call(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bootstrap = self.build_multi_loop_bootstrap(Path(tmp_dir), 3, self.BATCH_CONTROLLER_SOURCE, "BatchController")
+            engine = runner_engine.PlantRuntimeEngine(bootstrap)
+            with patch_runtime("emit", lambda *_args, **_kwargs: None):
+                try:
+                    engine.start()
+                    engine.run_cycle()
+                    written = engine.driver_instance.written
+                    batch_calls = type(engine.controllers[0].instance).batch_calls
+                finally:
+                    engine.stop()
+
+        self.assertEqual(batch_calls, 1)
+        self.assertEqual(written, [{"actuator_1": 9.0, "actuator_2": 18.0, "actuator_3": 27.0}])
+
+    def test_compute_batch_falls_back_to_compute_without_numpy(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bootstrap = self.build_multi_loop_bootstrap(Path(tmp_dir), 2, self.BATCH_CONTROLLER_SOURCE, "BatchController")
+            engine = runner_engine.PlantRuntimeEngine(bootstrap)
+            with (
+                patch.object(runner_engine, "load_numpy", lambda: None),
+                patch_runtime("emit", lambda *_args, **_kwargs: None),
+            ):
+                try:
+                    engine.start()
+                    engine.run_cycle()
+                    written = engine.driver_instance.written
+                    batch_calls = type(engine.controllers[0].instance).batch_calls
+                finally:
+                    engine.stop()
+
+        self.assertEqual(batch_calls, 0)
+        self.assertEqual(written, [{"actuator_1": 9.0, "actuator_2": 18.0}])
+
+    def test_startup_trace_reports_phases_and_defers_heavy_imports(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            bootstrap_path = root / "bootstrap.json"
+            bootstrap_path.write_text(json.dumps(dataclasses.asdict(self.build_bootstrap(root))), encoding="utf-8")
+            completed = subprocess.run(
+                [
+                    sys.executable,
+                    str(RUNNER_PATH),
+                    "--runtime-dir",
+                    str(root / "runtime"),
+                    "--bootstrap",
+                    str(bootstrap_path),
+                    "--startup-trace",
+                    "--launched-at-ns",
+                    str(time.time_ns()),
+                ],
+                input=b'{"type": "start"}\n{"type": "stop"}\n',
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                timeout=30,
+                check=True,
+            )
+            imported = subprocess.run(
+                [
+                    sys.executable,
+                    "-c",
+                    "import sys\n"
+                    f"sys.path.insert(0, {str(RUNNER_PATH.parent)!r})\n"
+                    "import runner\n"
+                    "deferred = ('argparse', 'asyncio', 'concurrent.futures', 'contextvars', 'importlib.util', 'mmap',\n"
+                    "            'multiprocessing', 'signal', 'socket', 'struct', 'zlib', 'runner_multiplex')\n"
+                    "print(sorted(name for name in deferred if name in sys.modules))",
+                ],
+                stdout=subprocess.PIPE,
+                timeout=30,
+                check=True,
+            )
+
+        messages = {message["type"]: message["payload"] for message in map(json.loads, completed.stdout.splitlines())}
+        ready_trace = messages["ready"]["startup_trace"]
+        connected_trace = messages["connected"]["startup_trace"]
+        self.assertTrue({"interpreter", "runner_import", "argument_parse", "bootstrap_parse"} <= set(ready_trace["phases_ms"]))
+        self.assertNotIn("plugin_import", ready_trace["phases_ms"])
+        self.assertTrue({"plugin_import", "driver_connect"} <= set(connected_trace["phases_ms"]))
+        self.assertGreaterEqual(connected_trace["total_ms"], ready_trace["total_ms"])
+        self.assertGreaterEqual(ready_trace["total_ms"], sum(ready_trace["phases_ms"].values()))
+        self.assertEqual(imported.stdout.decode().strip(), "[]")
+
 
 if __name__ == "__main__":
     unittest.main()
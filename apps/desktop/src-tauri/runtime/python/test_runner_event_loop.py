@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import runner_engine
+import runner_event_loop
+from runner_testing import RunnerTestCase, patch_runtime
+
+
+class EngineEventLoopTests(RunnerTestCase):
+    def test_asyncio_event_loop_reads_stdin_pipe_and_schedules_cycles(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            engine = runner_engine.PlantRuntimeEngine(self.build_bootstrap(Path(tmp_dir)))
+            events: list[tuple[str, Any]] = []
+            read_fd, write_fd = os.pipe()
+
+            async def scenario() -> None:
+                loop = asyncio.get_running_loop()
+                os.write(write_fd, b'{"type": "start"}\n')
+                loop.call_later(0.25, os.write, write_fd, b'{"type": "update_setpoints", "payload": {"setpoints": {"sensor_1": 7.0}}}\n')
+                loop.call_later(0.35, os.write, write_fd, b'{"type": "stop"}\n')
+                await asyncio.wait_for(runner_event_loop.run_engine_event_loop(engine), timeout=5)
+
+            with (
+                open(read_fd, "rb", buffering=0) as stdin,
+                patch.object(sys, "stdin", stdin),
+                patch_runtime("emit", lambda msg_type, payload=None: events.append((msg_type, payload))),
+            ):
+                try:
+                    asyncio.run(scenario())
+                finally:
+                    os.close(write_fd)
+                    engine.stop()
+
+            message_types = [msg_type for msg_type, _payload in events]
+            self.assertEqual(message_types[0], "connected")
+            telemetry = [payload for msg_type, payload in events if msg_type == "telemetry"]
+            self.assertGreaterEqual(len(telemetry), 3)
+            self.assertEqual(telemetry[-1]["setpoints"]["sensor_1"], 7.0)
+            self.assertTrue(engine.should_exit)
+            self.assertIsNone(engine.controller_reload_listener)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import dataclasses
+import tempfile
+import unittest
+from pathlib import Path
+
+import runner_multiplex
+from runner_testing import FakeClock, RunnerTestCase, patch_runtime
+
+
+class MultiPlantHostTests(RunnerTestCase):
+    def test_multiplexed_host_interleaves_plants_and_tags_messages(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            (root / "first").mkdir()
+            (root / "second").mkdir()
+            first = self.build_multi_loop_bootstrap(root / "first", 1, self.BATCH_CONTROLLER_SOURCE, "BatchController")
+            second = self.build_multi_loop_bootstrap(root / "second", 2, self.BATCH_CONTROLLER_SOURCE, "BatchController")
+            second = dataclasses.replace(
+                second,
+                plant=dataclasses.replace(second.plant, id="plant_other"),
+                runtime=dataclasses.replace(
+                    second.runtime,
+                    timing=dataclasses.replace(second.runtime.timing, sample_time_ms=250),
+                ),
+            )
+            host = runner_multiplex.MultiPlantHost(root)
+            fake_clock = FakeClock()
+            stdout = self.capture_protocol_stdout()
+            with (
+                fake_clock.patch_runner(),
+                patch_runtime("PROTOCOL_STDOUT", stdout),
+                patch_runtime("log_error", lambda _message: None),
+            ):
+                for bootstrap in (first, second):
+                    host.dispatch({"type": "init", "payload": dataclasses.asdict(bootstrap)})
+                    host.dispatch({"type": "start", "plant_id": bootstrap.plant.id})
+                host.dispatch({"type": "pause"})
+                for _ in range(6):
+                    host.run_due_cycles()
+                    fake_clock.sleep(host.next_wait_timeout() or 0.0)
+                host.dispatch({"type": "stop", "plant_id": "plant_other"})
+                remaining = sorted(host.engines)
+                host.stop_all()
+
+            messages, _ = self.split_protocol_stream(stdout.buffer.getvalue())
+
+        self.assertEqual(remaining, ["plant_multi"])
+        untagged = [message for message in messages if "plant_id" not in message]
+        self.assertEqual([message["type"] for message in untagged], ["error"])
+        telemetry_by_plant: dict[str, list[int]] = {}
+        for message in messages:
+            if message["type"] == "telemetry":
+                telemetry_by_plant.setdefault(message["plant_id"], []).append(message["payload"]["cycle_id"])
+        self.assertEqual(telemetry_by_plant["plant_multi"], [1, 2, 3, 4, 5])
+        self.assertEqual(telemetry_by_plant["plant_other"], [1, 2])
+        self.assertEqual(
+            [message["plant_id"] for message in messages if message["type"] == "stopped"],
+            ["plant_other", "plant_multi"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
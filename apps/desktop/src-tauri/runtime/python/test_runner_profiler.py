@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import dataclasses
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from typing import Any, cast
+
+import runner_engine
+import runner_profiler
+from runner_testing import RunnerTestCase, patch_runtime
+
+
+class StackSamplerTests(RunnerTestCase):
+    def test_profile_command_writes_collapsed_stacks_labelled_by_plugin(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            bootstrap = self.build_bootstrap(root)
+            controller_dir = self.write_plugin(
+                root,
+                "busy_controller",
+                """
+                import time
+
+                def burn(seconds):
+                    deadline = time.process_time() + seconds
+                    total = 0
+                    while time.process_time() < deadline:
+                        total += 1
+                    return total
+
+                class BusyController:
+                    def __init__(self, context):
+                        self.context = context
+
+                    def compute(self, snapshot):
+                        burn(0.05)
+                        return {"actuator_1": 0.0}
+                """,
+            )
+            bootstrap = dataclasses.replace(
+                bootstrap,
+                controllers=[
+                    dataclasses.replace(
+                        bootstrap.controllers[0],
+                        plugin_dir=str(controller_dir),
+                        class_name="BusyController",
+                    )
+                ],
+            )
+            engine = runner_engine.PlantRuntimeEngine(bootstrap)
+            events: list[tuple[str, Any]] = []
+            with patch_runtime("emit", lambda msg_type, payload=None: events.append((msg_type, payload))):
+                try:
+                    engine.start()
+                    runner_engine.handle_command({"type": "profile", "payload": {"duration_s": 60, "interval_ms": 1}}, engine)
+                    for _ in range(3):
+                        engine.next_cycle_deadline = None
+                        engine.run_cycle()
+                finally:
+                    engine.stop()
+
+            finished = [payload for msg_type, payload in events if msg_type == "profile_finished"]
+            self.assertEqual(len(finished), 1)
+            folded = Path(finished[0]["path"]).read_text(encoding="utf-8").splitlines()
+
+        controller_id = bootstrap.controllers[0].id
+        self.assertGreater(finished[0]["labels"].get(f"controller:{controller_id}", 0), 0)
+        self.assertTrue(
+            any(
+                line.startswith(f"controller:{controller_id};") and "burn (main.py:" in line
+                for line in folded
+            )
+        )
+        self.assertTrue(all(line.rsplit(" ", 1)[1].isdigit() for line in folded))
+
+    def test_profile_samples_plugin_threads_with_one_sampler_per_process(self) -> None:
+        stop_burning = threading.Event()
+
+        def burn() -> None:
+            while not stop_burning.is_set():
+                pass
+
+        worker = threading.Thread(target=burn, daemon=True)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "profile.folded"
+            labels = {burn.__code__.co_filename: "driver"}
+            sampler = cast(Any, runner_profiler.start_stack_sampler(path, labels, {}, 60.0, 0.001))
+            self.assertIsNotNone(sampler)
+            try:
+                self.assertIsNone(runner_profiler.start_stack_sampler(path, labels, {}, 60.0, 0.001))
+                worker.start()
+                deadline = time.monotonic() + 5.0
+                while "driver;" not in "".join(sampler.thread_counts) and time.monotonic() < deadline:
+                    time.sleep(0.01)
+            finally:
+                stop_burning.set()
+                sampler.stop()
+            summary = sampler.result(wait=True) or {}
+            folded = path.read_text(encoding="utf-8")
+            worker.join()
+
+            restarted = runner_profiler.start_stack_sampler(path, labels, {}, 60.0, 0.001)
+            self.assertIsNotNone(restarted)
+            cast(Any, restarted).stop()
+            cast(Any, restarted).result(wait=True)
+
+        self.assertGreater(summary["labels"].get("driver", 0), 0)
+        self.assertIn("burn (test_runner_profiler.py:", folded)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+import struct
+import tempfile
+import unittest
+import zlib
+from pathlib import Path
+from typing import Any
+
+import runner_engine
+import runner_recorder
+import runner_transports
+from runner_testing import FakeClock, RunnerTestCase, patch_runtime
+
+
+class ColumnarRecorderTests(RunnerTestCase):
+    def test_recorder_writes_compressed_column_chunks_with_cycle_index(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bootstrap = self.build_bootstrap(Path(tmp_dir))
+            bootstrap = dataclasses.replace(
+                bootstrap,
+                runtime=dataclasses.replace(
+                    bootstrap.runtime,
+                    recorder=runner_engine.RuntimeRecorder(enabled=True, chunk_cycles=2),
+                ),
+            )
+            engine = runner_engine.PlantRuntimeEngine(bootstrap)
+            events: list[tuple[str, Any]] = []
+            with (
+                FakeClock().patch_runner(),
+                patch_runtime("emit", lambda msg_type, payload=None: events.append((msg_type, payload))),
+            ):
+                try:
+                    engine.start()
+                    for _ in range(3):
+                        engine.run_cycle()
+                finally:
+                    engine.stop()
+
+            started = [payload for msg_type, payload in events if msg_type == "recording_started"]
+            self.assertEqual(len(started), 1)
+            raw = Path(started[0]["path"]).read_bytes()
+            index = Path(started[0]["index_path"]).read_bytes()
+
+        self.assertEqual(raw[:8], runner_recorder.RECORDER_FILE_MAGIC)
+        (header_length,) = runner_recorder.RECORDER_HEADER_LENGTH.unpack_from(raw, 8)
+        header = json.loads(raw[12 : 12 + header_length])
+        columns = header["columns"]
+        self.assertEqual(columns[0], "cycle_id")
+        self.assertIn("sensors.sensor_1", columns)
+
+        entries = [
+            runner_recorder.RECORDER_INDEX_ENTRY.unpack_from(index, offset)
+            for offset in range(0, len(index), runner_recorder.RECORDER_INDEX_ENTRY.size)
+        ]
+        self.assertEqual([(first, last, rows) for first, last, _offset, rows in entries], [(1, 2, 2), (3, 3, 1)])
+
+        sensor_values: list[float] = []
+        for first, _last, offset, rows in entries:
+            magic, row_count, first_cycle, _last_cycle, column_count = runner_recorder.RECORDER_CHUNK_HEADER.unpack_from(
+                raw,
+                offset,
+            )
+            self.assertEqual((magic, row_count, first_cycle, column_count), (b"CHNK", rows, first, len(columns)))
+            position = offset + runner_recorder.RECORDER_CHUNK_HEADER.size
+            decoded = []
+            for _ in columns:
+                (length,) = runner_recorder.RECORDER_COLUMN_LENGTH.unpack_from(raw, position)
+                position += runner_recorder.RECORDER_COLUMN_LENGTH.size
+                decoded.append(zlib.decompress(raw[position : position + length]))
+                position += length
+            self.assertEqual(struct.unpack(f"<{rows}Q", decoded[0]), tuple(range(first, first + rows)))
+            sensor_values.extend(struct.unpack(f"<{rows}d", decoded[columns.index("sensors.sensor_1")]))
+        self.assertEqual(sensor_values, [1.0, 1.0, 1.0])
+
+    def test_recording_reader_answers_range_queries_from_pyramids(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bootstrap = self.build_bootstrap(Path(tmp_dir))
+            encoder = runner_transports.BinaryTelemetryEncoder(runner_engine.build_telemetry_schema(bootstrap, 1))
+            path = Path(tmp_dir) / "recording.sncol"
+            recorder = runner_recorder.ColumnarRecorder(
+                path,
+                encoder,
+                runner_engine.RuntimeRecorder(enabled=True, chunk_cycles=64, queue_chunks=32),
+            )
+            for row in range(1000):
+                value = 1000.0 if row == 537 else float(row % 50)
+                recorder.record({"cycle_id": row + 1, "uptime_s": row / 100, "sensors": {"sensor_1": value}})
+            recorder.close()
+            self.assertEqual(recorder.dropped_chunks, 0)
+
+            reader = runner_recorder.RecordingReader(path)
+            try:
+                overview = reader.query("sensors.sensor_1", 0.0, 9.99, points=10)
+                detail = reader.query("sensors.sensor_1", 1.0, 1.05, points=100)
+                empty = reader.query("sensors.sensor_1", 20.0, 30.0, points=10)
+            finally:
+                reader.close()
+            pyramid_written_at = path.with_name("recording.sncol.pyr").stat().st_mtime_ns
+            runner_recorder.RecordingReader(path).close()
+            self.assertEqual(path.with_name("recording.sncol.pyr").stat().st_mtime_ns, pyramid_written_at)
+
+        self.assertEqual(len(overview["time"]), 10)
+        self.assertEqual(overview["time"][0], 0.0)
+        self.assertEqual(max(overview["max"]), 1000.0)
+        self.assertEqual(min(overview["min"]), 0.0)
+        self.assertAlmostEqual(
+            sum(overview["mean"]) / len(overview["mean"]),
+            (sum(row % 50 for row in range(1000)) - 37 + 1000) / 1000,
+            delta=0.5,
+        )
+        self.assertEqual(detail["time"], [row / 100 for row in range(100, 106)])
+        self.assertEqual(detail["mean"], [float(row % 50) for row in range(100, 106)])
+        self.assertEqual(empty["time"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+import math
+import struct
+import tempfile
+import unittest
+from array import array
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import runner_engine
+import runner_transports
+from runner_testing import FakeClock, RunnerTestCase, patch_runtime
+
+
+class TelemetryTransportTests(RunnerTestCase):
+    def test_binary_and_delta_layouts_cover_every_telemetry_field(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bootstrap = self.build_bootstrap(Path(tmp_dir))
+            engine = runner_engine.PlantRuntimeEngine(bootstrap)
+            events: list[tuple[str, Any]] = []
+            with patch_runtime("emit", lambda msg_type, payload=None: events.append((msg_type, payload))):
+                try:
+                    engine.start()
+                    engine.run_cycle()
+                finally:
+                    engine.stop()
+
+        payload = next(payload for msg_type, payload in events if msg_type == "telemetry")
+        schema = runner_engine.build_telemetry_schema(bootstrap, 1).serialize()
+        binary_fields = {
+            "cycle_id",
+            *schema["scalars"],
+            *schema["constants"],
+            *(group["name"] for group in schema["groups"]),
+        }
+        self.assertEqual(set(payload) - binary_fields, set())
+
+        delta = runner_transports.DeltaTelemetryEncoder(runner_engine.build_telemetry_schema(bootstrap, 1), keyframe_cycles=10)
+        delta_fields = {"cycle_id", *(key.split(".", 1)[0] for key in delta.keys)}
+        self.assertEqual(set(payload) - delta_fields, set())
+        self.assertIn("controller_missed_deadlines.ctrl_1", delta.keys)
+
+    def test_binary_telemetry_frames_follow_schema_announced_at_ready(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bootstrap = self.with_runtime_telemetry(
+                self.build_bootstrap(Path(tmp_dir)),
+                encoding="binary",
+            )
+            engine = runner_engine.PlantRuntimeEngine(bootstrap)
+            stdout = self.capture_protocol_stdout()
+            with patch_runtime("PROTOCOL_STDOUT", stdout):
+                descriptor = engine.describe_telemetry()
+                try:
+                    engine.start()
+                    engine.run_cycle()
+                finally:
+                    engine.stop()
+
+            messages, frames = self.split_protocol_stream(stdout.buffer.getvalue())
+
+        schema = descriptor["schema"]
+        self.assertEqual(descriptor["encoding"], "binary")
+        self.assertNotIn("telemetry_schema", [message["type"] for message in messages])
+        self.assertEqual(len(frames), 1)
+
+        schema_id, cycle_id = runner_transports.BINARY_TELEMETRY_PREFIX.unpack_from(frames[0])
+        values_raw = frames[0][runner_transports.BINARY_TELEMETRY_PREFIX.size:]
+        values = struct.unpack(f"<{len(values_raw) // 8}d", values_raw)
+        scalars = dict(zip(schema["scalars"], values))
+        self.assertEqual(schema_id, schema["schema_id"])
+        self.assertEqual(cycle_id, 1)
+        self.assertEqual(scalars["cycle_late"], 0.0)
+
+        offset = len(schema["scalars"])
+        groups: dict[str, dict[str, float]] = {}
+        for group in schema["groups"]:
+            groups[group["name"]] = dict(zip(group["ids"], values[offset:offset + len(group["ids"])]))
+            offset += len(group["ids"])
+        self.assertEqual(offset, len(values))
+        self.assertEqual(groups["sensors"], {"sensor_1": 1.0})
+        self.assertEqual(groups["setpoints"]["sensor_1"], 42.0)
+        self.assertEqual(groups["written_outputs"], {"actuator_1": 0.0})
+        self.assertIn("ctrl_1", groups["controller_durations_ms"])
+
+    def test_ring_transport_writes_fixed_records_and_notifies_head(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bootstrap = self.with_runtime_telemetry(
+                self.build_bootstrap(Path(tmp_dir)),
+                transport="ring",
+                ring_capacity=2,
+                ring_notify_ms=0,
+            )
+            engine = runner_engine.PlantRuntimeEngine(bootstrap)
+            events: list[tuple[str, Any]] = []
+            with (
+                FakeClock().patch_runner(),
+                patch_runtime("emit", lambda msg_type, payload=None: events.append((msg_type, payload))),
+            ):
+                descriptor = engine.describe_telemetry()
+                ring_path = Path(descriptor["ring"]["path"])
+                try:
+                    engine.start()
+                    for _ in range(3):
+                        engine.run_cycle()
+                    raw = ring_path.read_bytes()
+                finally:
+                    engine.stop()
+
+            self.assertFalse(ring_path.exists())
+
+        magic, version, header_size, record_size, capacity, schema_id = runner_transports.TELEMETRY_RING_HEADER.unpack_from(raw)
+        (head,) = runner_transports.TELEMETRY_RING_HEAD.unpack_from(raw, runner_transports.TELEMETRY_RING_HEAD_OFFSET)
+        self.assertEqual(magic, runner_transports.TELEMETRY_RING_MAGIC)
+        self.assertEqual((version, header_size, capacity), (1, runner_transports.TELEMETRY_RING_HEADER_SIZE, 2))
+        self.assertEqual(record_size, descriptor["ring"]["record_size"])
+        self.assertEqual(schema_id, descriptor["schema"]["schema_id"])
+        self.assertEqual(head, 3)
+        cycle_ids = [
+            runner_transports.BINARY_TELEMETRY_PREFIX.unpack_from(raw, header_size + slot * record_size)[1]
+            for slot in range(capacity)
+        ]
+        self.assertEqual(cycle_ids, [3, 2])
+
+        message_types = [msg_type for msg_type, _payload in events]
+        self.assertNotIn("telemetry", message_types)
+        self.assertNotIn("telemetry_schema", message_types)
+        heads = [payload["head"] for msg_type, payload in events if msg_type == "telemetry_head"]
+        self.assertEqual(heads[:3], [1, 2, 3])
+        with self.assertRaisesRegex(RuntimeError, "processo Rust"):
+            runner_engine.normalize_runtime_telemetry({"transport": "ring"})
+
+    def test_ring_transport_warns_when_ring_file_cannot_be_removed(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bootstrap = self.with_runtime_telemetry(self.build_bootstrap(Path(tmp_dir)), transport="ring")
+            engine = runner_engine.PlantRuntimeEngine(bootstrap)
+            events: list[tuple[str, Any]] = []
+            with (
+                FakeClock().patch_runner(),
+                patch_runtime("emit", lambda msg_type, payload=None: events.append((msg_type, payload))),
+            ):
+                try:
+                    engine.start()
+                    engine.run_cycle()
+                finally:
+                    with patch.object(Path, "unlink", side_effect=PermissionError("em uso")):
+                        engine.stop()
+
+        warnings = [payload["message"] for msg_type, payload in events if msg_type == "warning"]
+        self.assertEqual(len(warnings), 1)
+        self.assertIn("em uso", warnings[0])
+
+    def test_display_rate_replaces_cycle_telemetry_with_min_max_last_buckets(self) -> None:
+        decimator = runner_transports.TelemetryDisplayDecimator(10.0)
+        self.assertIsNone(decimator.add({"cycle_id": 1, "sensors": {"sensor_1": 2.0}}, 0.0))
+        self.assertIsNone(decimator.add({"cycle_id": 2, "sensors": {"sensor_1": 90.0}}, 0.05))
+        bucket = decimator.add({"cycle_id": 3, "sensors": {"sensor_1": 5.0}}, 0.1)
+        self.assertIsNotNone(bucket)
+        self.assertEqual(bucket["sensors"]["sensor_1"], {"min": 2.0, "max": 90.0, "last": 5.0})
+        self.assertEqual((bucket["first_cycle_id"], bucket["cycle_id"], bucket["cycles"]), (1, 3, 3))
+        self.assertIsNone(decimator.take())
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bootstrap = self.with_runtime_telemetry(self.build_bootstrap(Path(tmp_dir)), display_rate_hz=5.0)
+            bootstrap = dataclasses.replace(
+                bootstrap,
+                runtime=dataclasses.replace(bootstrap.runtime, recorder=runner_engine.RuntimeRecorder(enabled=True)),
+            )
+            engine = runner_engine.PlantRuntimeEngine(bootstrap)
+            fake_clock = FakeClock()
+            events: list[tuple[str, Any]] = []
+            with (
+                fake_clock.patch_runner(),
+                patch_runtime("emit", lambda msg_type, payload=None: events.append((msg_type, payload))),
+            ):
+                self.assertEqual(engine.describe_telemetry()["display_rate_hz"], 5.0)
+                try:
+                    engine.start()
+                    for _ in range(5):
+                        engine.run_cycle()
+                        fake_clock.monotonic_now += 0.1
+                finally:
+                    engine.stop()
+
+        message_types = [msg_type for msg_type, _payload in events]
+        self.assertNotIn("telemetry", message_types)
+        displays = [payload for msg_type, payload in events if msg_type == "telemetry_display"]
+        self.assertEqual([display["cycles"] for display in displays], [3, 2])
+        self.assertEqual(displays[-1]["cycle_id"], 5)
+        self.assertEqual(displays[0]["sensors"]["sensor_1"], {"min": 1.0, "max": 1.0, "last": 1.0})
+        self.assertEqual(displays[0]["uptime_s"]["min"], 0.0)
+
+    def test_display_rate_keeps_full_rate_telemetry_without_recorder(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bootstrap = self.with_runtime_telemetry(self.build_bootstrap(Path(tmp_dir)), display_rate_hz=5.0)
+            engine = runner_engine.PlantRuntimeEngine(bootstrap)
+            fake_clock = FakeClock()
+            events: list[tuple[str, Any]] = []
+            with (
+                fake_clock.patch_runner(),
+                patch_runtime("emit", lambda msg_type, payload=None: events.append((msg_type, payload))),
+            ):
+                try:
+                    engine.start()
+                    for _ in range(3):
+                        engine.run_cycle()
+                        fake_clock.monotonic_now += 0.1
+                finally:
+                    engine.stop()
+
+        telemetry = [payload["cycle_id"] for msg_type, payload in events if msg_type == "telemetry"]
+        displays = [payload["cycles"] for msg_type, payload in events if msg_type == "telemetry_display"]
+        self.assertEqual(telemetry, [1, 2, 3])
+        self.assertEqual(displays, [3])
+        with self.assertRaisesRegex(RuntimeError, "processo Rust"):
+            runner_engine.normalize_runtime_telemetry({"display_rate_hz": 30})
+
+    def test_display_decimator_copies_vector_groups(self) -> None:
+        decimator = runner_transports.TelemetryDisplayDecimator(rate_hz=1.0)
+        buffer = array("d", [1.0])
+        sensors = runner_engine.IndexedValues(["sensor_1"], {"sensor_1": 0}, buffer)
+        decimator.add({"cycle_id": 1, "sensors": sensors}, 0.0)
+        buffer[0] = 3.0
+        decimator.add({"cycle_id": 2, "sensors": sensors}, 0.1)
+        buffer[0] = 9.0
+
+        display = decimator.take() or {}
+        self.assertEqual(display["sensors"]["sensor_1"], {"min": 1.0, "max": 3.0, "last": 3.0})
+
+    def test_delta_encoding_sends_keyframes_and_changed_keys_only(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bootstrap = self.with_runtime_telemetry(
+                self.build_bootstrap(Path(tmp_dir)),
+                encoding="delta",
+                keyframe_cycles=3,
+            )
+            engine = runner_engine.PlantRuntimeEngine(bootstrap)
+            fake_clock = FakeClock()
+            events: list[tuple[str, Any]] = []
+            with (
+                fake_clock.patch_runner(),
+                patch_runtime("emit", lambda msg_type, payload=None: events.append((msg_type, payload))),
+            ):
+                descriptor = engine.describe_telemetry()
+                try:
+                    engine.start()
+                    for _ in range(4):
+                        engine.run_cycle()
+                        fake_clock.monotonic_now += 0.1
+                finally:
+                    engine.stop()
+
+        keys = descriptor["schema"]["keys"]
+        frames = [payload for msg_type, payload in events if msg_type == "telemetry_delta"]
+        self.assertNotIn("telemetry", [msg_type for msg_type, _payload in events])
+        self.assertNotIn("telemetry_schema", [msg_type for msg_type, _payload in events])
+        self.assertEqual([frame["cycle_id"] for frame in frames], [1, 2, 3, 4])
+        self.assertEqual(["keyframe" in frame for frame in frames], [True, False, False, True])
+
+        state = list(frames[0]["keyframe"])
+        self.assertEqual(len(state), len(keys))
+        changed = {keys[index] for index in frames[1]["changes"][::2]}
+        self.assertIn("timestamp", changed)
+        self.assertNotIn("sensors.sensor_1", changed)
+        self.assertNotIn("setpoints.sensor_1", changed)
+        for frame in frames[1:3]:
+            changes = frame["changes"]
+            for index, value in zip(changes[::2], changes[1::2]):
+                state[index] = value
+        self.assertAlmostEqual(state[keys.index("uptime_s")], 0.2)
+        self.assertEqual(state[keys.index("sensors.sensor_1")], 1.0)
+        self.assertLess(len(json.dumps(frames[1])), len(json.dumps(frames[0])))
+
+    def test_delta_encoding_skips_unchanged_nan_and_rejects_batching(self) -> None:
+        schema = runner_engine.TelemetrySchema(1, ["sensor_1"], [], [], [])
+        encoder = runner_transports.DeltaTelemetryEncoder(schema, keyframe_cycles=10)
+        encoder.encode({"cycle_id": 1, "sensors": {"sensor_1": math.nan}})
+        frame = encoder.encode({"cycle_id": 2, "sensors": {"sensor_1": math.nan}})
+        self.assertNotIn(encoder.keys.index("sensors.sensor_1"), frame["changes"][::2])
+
+        with self.assertRaisesRegex(RuntimeError, "batch_max_cycles"):
+            runner_engine.normalize_runtime_telemetry({"encoding": "delta", "batch_max_cycles": 4})
+        with self.assertRaisesRegex(RuntimeError, "processo Rust"):
+            runner_engine.normalize_runtime_telemetry({"encoding": "delta"})
+
+
+if __name__ == "__main__":
+    unittest.main()
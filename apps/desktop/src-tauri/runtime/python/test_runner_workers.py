@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any, BinaryIO, cast
+from unittest.mock import patch
+
+import runner_engine
+import runner_workers
+from runner_testing import RUNNER_PATH, RunnerTestCase, patch_runtime
+
+
+class ProcessControllerWorkerTests(RunnerTestCase):
+    def test_process_controllers_apply_fallback_when_worker_misses_deadline(self) -> None:
+        controller_source = """
+            import time
+
+
+            class ProcessController:
+                def __init__(self, context):
+                    self.context = context
+
+                def compute(self, snapshot):
+                    if self.context.controller.id == "ctrl_2":
+                        time.sleep(0.5)
+                    sensor_id = self.context.controller.input_variable_ids[0]
+                    error = snapshot["setpoints"][sensor_id] - snapshot["sensors"][sensor_id]
+                    return {self.context.controller.output_variable_ids[0]: error}
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bootstrap = self.build_multi_loop_bootstrap(Path(tmp_dir), 2, controller_source, "ProcessController")
+            bootstrap = dataclasses.replace(
+                bootstrap,
+                controllers=[
+                    dataclasses.replace(
+                        controller,
+                        execution=runner_engine.ControllerExecution(mode="process", deadline_ms=100.0, fallback="zero"),
+                    )
+                    for controller in bootstrap.controllers
+                ],
+            )
+            engine = runner_engine.PlantRuntimeEngine(bootstrap)
+            events: list[tuple[str, Any]] = []
+            with (
+                patch.object(runner_workers, "CONTROLLER_WORKER_START_METHOD", "fork"),
+                patch_runtime("emit", lambda msg_type, payload=None: events.append((msg_type, payload))),
+                patch_runtime("log_error", lambda _message: None),
+            ):
+                try:
+                    engine.start()
+                    engine.run_cycle()
+                    engine.update_setpoints({"sensor_1": 50.0, "sensor_2": 20.0})
+                    engine.run_cycle()
+                    written = engine.driver_instance.written
+                    worker = engine.controllers[1].process_worker
+                    missed_deadlines = worker.missed_deadlines
+                finally:
+                    engine.stop()
+
+            self.assertEqual(written[0], {"actuator_1": 9.0, "actuator_2": 0.0})
+            self.assertEqual(written[1], {"actuator_1": 49.0, "actuator_2": 0.0})
+            self.assertEqual(missed_deadlines, 2)
+            telemetry = [payload for msg_type, payload in events if msg_type == "telemetry"]
+            self.assertEqual(
+                [payload["controller_missed_deadlines"] for payload in telemetry],
+                [{"ctrl_1": 0, "ctrl_2": 1}, {"ctrl_1": 0, "ctrl_2": 2}],
+            )
+            warnings = [payload["message"] for msg_type, payload in events if msg_type == "warning"]
+            self.assertEqual(len(warnings), 1)
+            self.assertIn("excedeu o prazo", warnings[0])
+            self.assertFalse(worker.process.is_alive())
+
+    def test_process_controllers_run_with_the_spawn_start_method_from_the_runner_script(self) -> None:
+        controller_source = """
+            class ProcessController:
+                def __init__(self, context):
+                    self.context = context
+
+                def compute(self, snapshot):
+                    sensor_id = self.context.controller.input_variable_ids[0]
+                    error = snapshot["setpoints"][sensor_id] - snapshot["sensors"][sensor_id]
+                    return {self.context.controller.output_variable_ids[0]: error}
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            bootstrap = self.build_multi_loop_bootstrap(root, 2, controller_source, "ProcessController")
+            bootstrap = dataclasses.replace(
+                bootstrap,
+                controllers=[
+                    dataclasses.replace(
+                        controller,
+                        execution=runner_engine.ControllerExecution(mode="process", deadline_ms=1000.0),
+                    )
+                    for controller in bootstrap.controllers
+                ],
+            )
+            bootstrap_path = root / "bootstrap.json"
+            bootstrap_path.write_text(json.dumps(dataclasses.asdict(bootstrap)), encoding="utf-8")
+            process = subprocess.Popen(
+                [sys.executable, str(RUNNER_PATH), "--runtime-dir", str(root / "runtime"), "--bootstrap", str(bootstrap_path)],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+            stdin = cast(BinaryIO, process.stdin)
+            stdout = cast(BinaryIO, process.stdout)
+            telemetry: list[dict[str, Any]] = []
+            try:
+                stdin.write(b'{"type": "start"}\n')
+                stdin.flush()
+                for line in stdout:
+                    message = json.loads(line)
+                    self.assertNotEqual(message["type"], "error", message)
+                    if message["type"] == "telemetry":
+                        telemetry.append(message["payload"])
+                        if len(telemetry) == 2:
+                            break
+                stdin.write(b'{"type": "stop"}\n')
+                stdin.flush()
+                self.assertEqual(process.wait(timeout=30), 0)
+            finally:
+                if process.poll() is None:
+                    process.kill()
+                    process.wait()
+                stdin.close()
+                stdout.close()
+
+        self.assertEqual(runner_workers.CONTROLLER_WORKER_START_METHOD, "spawn")
+        self.assertEqual(
+            [payload["written_outputs"] for payload in telemetry],
+            [{"actuator_1": 9.0, "actuator_2": 18.0}] * 2,
+        )
+        self.assertEqual(
+            [payload["controller_missed_deadlines"] for payload in telemetry],
+            [{"ctrl_1": 0, "ctrl_2": 0}] * 2,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
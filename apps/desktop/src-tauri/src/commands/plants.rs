@@ -146,6 +146,11 @@ pub fn resume_plant(state: State<'_, AppState>, id: String) -> Result<PlantRespo
     )
 }
 
+#[tauri::command]
+pub fn reset_plant_stats(state: State<'_, AppState>, id: String) -> Result<(), ErrorDto> {
+    state.runtimes().reset_stats(&id).map_err(ErrorDto::from)
+}
+
 #[tauri::command]
 pub fn save_controller(
     state: State<'_, AppState>,
@@ -40,7 +40,44 @@ use std::time::Duration;
 use tauri::{AppHandle, Runtime};
 use uuid::Uuid;
 
-const RUNNER_SCRIPT: &str = include_str!("../../../runtime/python/runner.py");
+const RUNNER_MODULES: &[(&str, &str)] = &[
+    (
+        "runner.py",
+        include_str!("../../../runtime/python/runner.py"),
+    ),
+    (
+        "runner_protocol.py",
+        include_str!("../../../runtime/python/runner_protocol.py"),
+    ),
+    (
+        "runner_engine.py",
+        include_str!("../../../runtime/python/runner_engine.py"),
+    ),
+    (
+        "runner_transports.py",
+        include_str!("../../../runtime/python/runner_transports.py"),
+    ),
+    (
+        "runner_recorder.py",
+        include_str!("../../../runtime/python/runner_recorder.py"),
+    ),
+    (
+        "runner_profiler.py",
+        include_str!("../../../runtime/python/runner_profiler.py"),
+    ),
+    (
+        "runner_workers.py",
+        include_str!("../../../runtime/python/runner_workers.py"),
+    ),
+    (
+        "runner_event_loop.py",
+        include_str!("../../../runtime/python/runner_event_loop.py"),
+    ),
+    (
+        "runner_multiplex.py",
+        include_str!("../../../runtime/python/runner_multiplex.py"),
+    ),
+];
 const PYTHON_SYNTAX_CHECK_SCRIPT: &str = r#"
 import sys
 import tokenize
@@ -120,6 +157,7 @@ if missing:
 "#;
 const STARTUP_TIMEOUT: Duration = Duration::from_secs(12);
 const SHUTDOWN_TIMEOUT: Duration = Duration::from_secs(4);
+const RUNTIME_STATS_INTERVAL: Duration = Duration::from_secs(1);
 
 #[derive(Debug, Clone, Copy, Default, PartialEq, Eq, Serialize, Deserialize)]
 #[serde(rename_all = "snake_case")]
@@ -316,6 +354,11 @@ struct DriverBootstrapRuntimeSupervision {
     shutdown_timeout_ms: u64,
 }
 
+#[derive(Debug, Serialize, Clone)]
+struct DriverBootstrapRuntimeStats {
+    interval_ms: u64,
+}
+
 #[derive(Debug, Serialize, Clone)]
 struct DriverBootstrapRuntimePaths {
     runtime_dir: String,
@@ -329,6 +372,7 @@ struct DriverBootstrapRuntime {
     id: String,
     timing: DriverBootstrapRuntimeTiming,
     supervision: DriverBootstrapRuntimeSupervision,
+    stats: DriverBootstrapRuntimeStats,
     paths: DriverBootstrapRuntimePaths,
 }
 
@@ -488,6 +532,7 @@ impl PlantRuntimeManager {
                 &bootstrap_path,
                 duration_millis_u64(STARTUP_TIMEOUT),
                 duration_millis_u64(SHUTDOWN_TIMEOUT),
+                duration_millis_u64(RUNTIME_STATS_INTERVAL),
             )?;
             write_bootstrap_files(&bootstrap, &bootstrap_path)?;
 
@@ -632,6 +677,10 @@ impl PlantRuntimeManager {
         self.send_runtime_command_with_payload(plant_id, "update_setpoints", payload)
     }
 
+    pub fn reset_stats(&self, plant_id: &str) -> AppResult<()> {
+        self.send_runtime_command_with_payload(plant_id, "reset_stats", Value::Null)
+    }
+
     fn update_controllers(
         &self,
         plant_id: &str,
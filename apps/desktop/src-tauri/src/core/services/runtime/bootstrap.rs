@@ -1,7 +1,8 @@
 use super::{
     DriverBootstrapController, DriverBootstrapDriver, DriverBootstrapPayload, DriverBootstrapPlant,
-    DriverBootstrapRuntime, DriverBootstrapRuntimePaths, DriverBootstrapRuntimeSupervision,
-    DriverBootstrapRuntimeTiming, DriverBootstrapVariable, ResolvedRuntimeController,
+    DriverBootstrapRuntime, DriverBootstrapRuntimePaths, DriverBootstrapRuntimeStats,
+    DriverBootstrapRuntimeSupervision, DriverBootstrapRuntimeTiming, DriverBootstrapVariable,
+    ResolvedRuntimeController,
 };
 use crate::core::error::{AppError, AppResult};
 use crate::core::models::plant::{Plant, VariableType};
@@ -178,6 +179,7 @@ pub(super) fn build_bootstrap_payload(
     bootstrap_path: &Path,
     startup_timeout_ms: u64,
     shutdown_timeout_ms: u64,
+    stats_interval_ms: u64,
 ) -> AppResult<DriverBootstrapPayload> {
     let mut variables = Vec::new();
     let mut sensor_ids = Vec::new();
@@ -236,6 +238,9 @@ pub(super) fn build_bootstrap_payload(
                 startup_timeout_ms,
                 shutdown_timeout_ms,
             },
+            stats: DriverBootstrapRuntimeStats {
+                interval_ms: stats_interval_ms,
+            },
             paths: DriverBootstrapRuntimePaths {
                 runtime_dir: runtime_dir.display().to_string(),
                 venv_python_path: venv_python_path.display().to_string(),
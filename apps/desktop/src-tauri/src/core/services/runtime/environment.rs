@@ -1,4 +1,4 @@
-use super::{DriverBootstrapPayload, RUNNER_SCRIPT};
+use super::{DriverBootstrapPayload, RUNNER_MODULES};
 use crate::core::error::{AppError, AppResult};
 use crate::core::models::plugin::PluginRegistry;
 use crate::core::services::workspace::WorkspaceService;
@@ -13,6 +13,7 @@ use std::process::Command;
 const PYTHON_ENV_VARS_TO_CLEAR: &[&str] = &[
     "PYTHONHOME",
     "PYTHONPATH",
+    "PYTHONSAFEPATH",
     "VIRTUAL_ENV",
     "__PYVENV_LAUNCHER__",
     "PYTHONEXECUTABLE",
@@ -69,16 +70,18 @@ pub(super) fn write_bootstrap_files(
 }
 
 pub(super) fn write_runner_script(runtime_root: &Path) -> AppResult<PathBuf> {
-    let runner_path = runtime_root.join("runner.py");
-    write_if_changed(
-        &runner_path,
-        RUNNER_SCRIPT,
-        &format!(
-            "Falha ao gravar runner Python em '{}'",
-            runner_path.display()
-        ),
-    )?;
-    Ok(runner_path)
+    for (file_name, contents) in RUNNER_MODULES {
+        let module_path = runtime_root.join(file_name);
+        write_if_changed(
+            &module_path,
+            contents,
+            &format!(
+                "Falha ao gravar runner Python em '{}'",
+                module_path.display()
+            ),
+        )?;
+    }
+    Ok(runtime_root.join("runner.py"))
 }
 
 pub(super) fn ensure_python_env(
@@ -387,6 +390,30 @@ mod tests {
         assert!(third_modified > second_modified);
     }
 
+    #[test]
+    fn write_runner_script_writes_every_runner_module() {
+        let test_dir = std::env::temp_dir().join("senamby-runtime-runner-modules-tests");
+        let _ = fs::remove_dir_all(&test_dir);
+        fs::create_dir_all(&test_dir).unwrap();
+
+        let runner_path = write_runner_script(&test_dir).unwrap();
+
+        assert_eq!(runner_path, test_dir.join("runner.py"));
+        for (file_name, _) in RUNNER_MODULES {
+            assert!(test_dir.join(file_name).is_file(), "{file_name} ausente");
+        }
+
+        let python = find_system_python().expect("python nao encontrado para teste");
+        let mut command = Command::new(&python);
+        prepare_python_command(command.arg(&runner_path).arg("--help"));
+        let output = command.output().expect("falha ao executar runner gravado");
+        assert!(
+            output.status.success(),
+            "stderr={}",
+            String::from_utf8_lossy(&output.stderr)
+        );
+    }
+
     #[test]
     fn prepare_python_command_ignores_invalid_pythonhome() {
         let python = find_system_python().expect("python nao encontrado para teste");
@@ -38,6 +38,11 @@ pub(super) fn spawn_driver_process(
         .stdin(Stdio::piped())
         .stdout(Stdio::piped())
         .stderr(Stdio::piped());
+    if let Ok(launched_at) = SystemTime::now().duration_since(UNIX_EPOCH) {
+        command
+            .arg("--launched-at-ns")
+            .arg(launched_at.as_nanos().to_string());
+    }
     command.spawn().map_err(|error| {
         AppError::IoError(format!(
             "Falha ao iniciar processo Python do driver '{}': {error}",
@@ -118,6 +123,15 @@ pub(super) fn spawn_stdout_task<R: Runtime + 'static>(
                     envelope.payload,
                     &metrics,
                 ),
+                "telemetry_batch" => process_telemetry_batch(
+                    &app,
+                    &plant_id,
+                    &runtime_id,
+                    configured_sample_time_ms,
+                    envelope.payload,
+                    &metrics,
+                ),
+                "stats" => emit_stats_event(&app, &plant_id, &runtime_id, envelope.payload),
                 "cycle_overrun" => {
                     let mut lock = metrics.lock();
                     lock.cycle_late = true;
@@ -276,6 +290,36 @@ fn handle_stopped_event<R: Runtime>(
     );
 }
 
+fn process_telemetry_batch<R: Runtime>(
+    app: &AppHandle<R>,
+    plant_id: &str,
+    runtime_id: &str,
+    configured_sample_time_ms: u64,
+    mut payload: Value,
+    metrics: &SharedMetrics,
+) {
+    let Some(Value::Array(items)) = payload.get_mut("items").map(Value::take) else {
+        let _ = emit_error_event(
+            app,
+            plant_id,
+            runtime_id,
+            "Payload de telemetria em lote inválido: campo 'items' ausente",
+        );
+        return;
+    };
+
+    for item in items {
+        process_telemetry(
+            app,
+            plant_id,
+            runtime_id,
+            configured_sample_time_ms,
+            item,
+            metrics,
+        );
+    }
+}
+
 fn process_telemetry<R: Runtime>(
     app: &AppHandle<R>,
     plant_id: &str,
@@ -425,6 +469,22 @@ pub(super) fn emit_status_event<R: Runtime>(app: &AppHandle<R>, event: RuntimeSt
     let _ = app.emit("plant://status", event);
 }
 
+fn emit_stats_event<R: Runtime>(
+    app: &AppHandle<R>,
+    plant_id: &str,
+    runtime_id: &str,
+    stats: Value,
+) {
+    let _ = app.emit(
+        "plant://stats",
+        json!({
+            "plant_id": plant_id,
+            "runtime_id": runtime_id,
+            "stats": stats,
+        }),
+    );
+}
+
 pub(super) fn emit_error_event<R: Runtime>(
     app: &AppHandle<R>,
     plant_id: &str,
@@ -5,8 +5,8 @@ mod state;
 
 use crate::commands::plants::{
     close_plant, connect_plant, create_plant, disconnect_plant, get_plant, import_plant_file,
-    list_plants, open_plant_file, pause_plant, remove_controller, remove_plant, resume_plant,
-    save_controller, save_export_file, save_setpoint, update_plant,
+    list_plants, open_plant_file, pause_plant, remove_controller, remove_plant, reset_plant_stats,
+    resume_plant, save_controller, save_export_file, save_setpoint, update_plant,
 };
 use crate::commands::plugins::{
     create_plugin, delete_plugin, get_plugin, import_plugin_file, list_plugins,
@@ -38,6 +38,7 @@ pub fn run() {
             disconnect_plant,
             pause_plant,
             resume_plant,
+            reset_plant_stats,
             save_controller,
             remove_controller,
             save_setpoint,
@@ -9,6 +9,7 @@ export {
   disconnectPlant,
   pausePlant,
   resumePlant,
+  resetPlantStats,
   openPlant,
   applyPlantTelemetryPacket,
   buildTelemetryPacketFromRuntimeEvent,
@@ -33,6 +34,7 @@ export type {
   RemoveControllerInstanceRequest,
   SavePlantSetpointRequest,
   PlantRuntimeErrorEvent,
+  PlantRuntimeStatsEvent,
   PlantRuntimeStatusEvent,
   PlantRuntimeTelemetryEvent,
 } from './types';
@@ -24,6 +24,7 @@ import type {
   PlantControllerDto,
   PlantDriverDto,
   PlantRuntimeErrorEvent,
+  PlantRuntimeStatsEvent,
   PlantRuntimeStatusEvent,
   PlantRuntimeTelemetryEvent,
   PlantTelemetryPacket,
@@ -312,6 +313,7 @@ export async function subscribePlantRuntimeEvents(handlers: {
   onTelemetry?: (event: PlantRuntimeTelemetryEvent) => void;
   onStatus?: (event: PlantRuntimeStatusEvent) => void;
   onError?: (event: PlantRuntimeErrorEvent) => void;
+  onStats?: (event: PlantRuntimeStatsEvent) => void;
 }): Promise<() => void> {
   const unlisteners: UnlistenFn[] = [];
 
@@ -339,6 +341,14 @@ export async function subscribePlantRuntimeEvents(handlers: {
     );
   }
 
+  if (handlers.onStats) {
+    unlisteners.push(
+      await listen<PlantRuntimeStatsEvent>('plant://stats', (event) => {
+        handlers.onStats?.(event.payload);
+      })
+    );
+  }
+
   return () => {
     for (const unlisten of unlisteners) {
       unlisten();
@@ -618,6 +628,16 @@ export async function resumePlant(id: string): Promise<PlantActionResponse> {
   return invokePlantAction('resume_plant', id, mergeBackendRuntimeState);
 }
 
+export async function resetPlantStats(id: string): Promise<{ success: boolean; error?: string }> {
+  try {
+    await invoke('reset_plant_stats', { id });
+    return { success: true };
+  } catch (error) {
+    const message = extractServiceErrorMessage(error, 'Erro ao zerar estatísticas da planta');
+    return { success: false, error: message };
+  }
+}
+
 export async function openPlant(request: OpenPlantRequest): Promise<OpenPlantResponse> {
   if (!request.file) {
     return {
@@ -253,6 +253,12 @@ export interface PlantRuntimeErrorEvent {
   message: string;
 }
 
+export interface PlantRuntimeStatsEvent {
+  plant_id: string;
+  runtime_id: string;
+  stats: Record<string, unknown>;
+}
+
 export interface GetPlantRequest {
   id: string;
 }